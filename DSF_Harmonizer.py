@@ -5,78 +5,46 @@
 
 import sys
 import os
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter import font as tkfont
-import pandas as pd
 import numpy as np
+import pandas as pd
 import matplotlib
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from matplotlib import gridspec
 
-# try Savitzky–Golay; fallback to simple moving average if not available
-try:
-    from scipy.signal import savgol_filter as _savgol
-except Exception:
-    _savgol = None
+from dsf_core import (
+    smooth_signal, derivative_strength, well_sortkey,
+    compute_tm_for_xy, compute_tm_batch, TmCache,
+    jump_stats_batch, JumpIndex, single_jump_steps, auto_trim_proposal,
+    ENGINES, CURVE_ENGINES,
+    build_corrected_df, build_smoothed_df, build_tm_table,
+)
+from dsf_io import load_plate, load_sidecar, save_sidecar, source_key, write_gdsf, write_tm_table
+from dsf_exec import BACKENDS, BackgroundJob, WellExecutor, stream_job
+from dsf_history import UNDO_BUDGET_BYTES, UndoLog, WellState
+from dsf_journal import SYNC_INTERVAL_S, SessionJournal, encode_state, decode_steps
+from dsf_listview import VirtualListbox
+from dsf_plot import CurvePlot, PlateGrid, PlateMap
 
 APP_TITLE = "DSF Harmonizer"
+ANIM_FRAME_MS = 16                 # intervalo entre frames de la animación de corrección
+RENDER_FRAME_MS = 33               # como mucho un redibujado de la vista por intervalo (~30 fps)
+JOB_POLL_MS = 50                   # cada cuánto se recogen los resultados del trabajo en segundo plano
+JOB_TM_CHUNK = 128                 # pozos por bloque en el recálculo de Tm / tabla de Tm en segundo plano
+TM_JOB = "Recomputing Tm"
 
-
-# ------------------------ helpers (robust stats & smoothing) ------------------------
-def robust_mad_sigma(diffs):
-    if len(diffs) == 0:
-        return 0.0
-    diffs = np.asarray(diffs, dtype=float)
-    med = np.nanmedian(diffs)
-    mad = np.nanmedian(np.abs(diffs - med))
-    return 1.4826 * mad
-
-
-def _odd(n):
-    n = int(max(3, n))
-    return n if n % 2 == 1 else n + 1
-
-
-def smooth_signal(y, strength=0):
-    """Smooth y with Savitzky–Golay if available; else symmetric moving average.
-    strength: 0..100 (0 = off). Higher => wider window.
-    """
-    y = np.asarray(y, dtype=float)
-    n = len(y)
-    if n < 3 or strength <= 0:
-        return y.copy()
-
-    # Map 0..100 -> window fraction ~0.03..0.25 of n (clamped & odd)
-    frac = max(0.0, min(1.0, float(strength) / 100.0))
-    w_target = int(round(0.03 * n + 0.22 * frac * n))
-    w = _odd(max(5, min(w_target, 101, n - (1 - n % 2))))  # clamp
-    if w >= n:
-        w = _odd(max(5, n - 1))
-    if w < 5:
-        return y.copy()
-
-    if _savgol is not None and w >= 5:
-        poly = min(3, max(2, w - 2))
-        try:
-            return _savgol(y, window_length=w, polyorder=poly, mode="interp")
-        except Exception:
-            pass
-
-    # Fallback: symmetric moving average with edge reflection
-    k = max(5, min(w, n - 1))
-    kernel = np.ones(k) / k
-    ypad = np.r_[y[k-1:0:-1], y, y[-2:-k-1:-1]]
-    ys = np.convolve(ypad, kernel, mode="valid")
-    start = (len(ys) - n) // 2
-    return ys[start:start+n]
-
-
-def smooth_derivative(d, strength=20):
-    """Light smoothing for derivative trace; strength is 0..100 like smooth_signal."""
-    return smooth_signal(d, strength=max(0, int(strength)))
+# colores del mapa de placa en modo QC (versiones saturadas de los de la lista de pozos)
+PLATE_QC_COLORS = {
+    "ok": "#dfe6f0", "suspected": "#f2c230", "corrected": "#4caf50",
+    "outlier": "#d32f2f", "deleted": "#9e9e9e",
+}
+# en la vista de placa (curvas) los pozos normales necesitan un color con contraste
+PLATE_GRID_COLORS = dict(PLATE_QC_COLORS, ok="#37474f", deleted="#bdbdbd")
 
 
 # ------------------------ main app ------------------------
@@ -87,11 +55,8 @@ class DSF_Harmonizer(tk.Tk):
         self.geometry("1380x980")
 
         # data / state
-        self.df_orig = None
-        self.df_work = None
+        self.store = None                   # PlateStore (curvas original + trabajo)
         self.wells = []
-        self.per_well_orig = {}
-        self.per_well_work = {}
         self.current_well = None
         self.selected_idx = None
         self.max_idx = 0
@@ -101,6 +66,14 @@ class DSF_Harmonizer(tk.Tk):
 
         # per-well Tm cache & Tm-outlier list
         self.tm_values = {}
+        self._tm_arr = np.empty(0)          # Tm por fila de self.wells (NaN = sin Tm / eliminado)
+        self.well_version = {}              # w -> nº de cambios de curva/trim/estado
+        self._tm_dirty = set()              # pozos cuya Tm hay que recalcular
+        self._data_version = 0              # sube con cualquier cambio de pozo (ver _mark_dirty)
+        self._exported_version = 0          # _data_version guardado en el último "Export corrected"
+        self._jump_stats = {}               # w -> (versión, jump_stats) de la curva visible
+        self._jump_index = None             # (data_version, JumpIndex) para escanear por umbrales
+        self._scan_live = False             # tras el primer scan, la lista sigue a los umbrales
         self.tm_outlier_wells = []
         self.tm_sorted_wells = []
 
@@ -115,10 +88,17 @@ class DSF_Harmonizer(tk.Tk):
         self.abs_thr_var = tk.StringVar(value="0")
         self.kdisp_var = tk.StringVar(value="6")
         self.disp_method = tk.StringVar(value="MAD")
+        for var in (self.abs_thr_var, self.kdisp_var, self.disp_method):
+            var.trace_add("write", self._on_scan_thr_change)
         self.iterative_var = tk.BooleanVar(value=False)
         self.show_deriv_var = tk.BooleanVar(value=True)
+        self.plate_map_var = tk.StringVar(value="tm")
+        self.plate_deriv_var = tk.BooleanVar(value=False)
         self.animate_var = tk.BooleanVar(value=True)
-        self.multi_jump_var = tk.BooleanVar(value=True)
+        self.engine_var = tk.StringVar(value="multi")  # multi / single / changepoint
+        self.sidecar_var = tk.BooleanVar(value=True)   # caché binaria <archivo>.gdsf.npz
+        self.backend_var = tk.StringVar(value="serial")  # serial / thread / process
+        self._executor = None
 
         # smoothing controls
         self.smooth_on_var = tk.BooleanVar(value=False)
@@ -139,22 +119,48 @@ class DSF_Harmonizer(tk.Tk):
         self.auto_trimmed_wells = set()     # pozos que han sufrido auto-trim
         self.auto_suspect_index = {}
 
-        # undo/redo per well (fluorescencia + trimming + flag auto-trim)
-        self.history = {}
-        self.redo_history = {}
-        self.trim_history = {}
-        self.trim_redo = {}
-        self.auto_trim_history = {}
-        self.auto_trim_redo = {}
-
-        # Cache para cálculos de Tm
-        self._tm_cache = {}
-        self._last_tm_params = None
+        # undo/redo per well (fluorescencia como saltos sobre la original + trimming + flag auto-trim)
+        self.undo_log = UndoLog(UNDO_BUDGET_BYTES)
+
+        # diario de sesión en disco (<archivo>.gdsf.journal) para recuperar tras un cierre inesperado
+        self.journal = None
+        self._journal_pending = set()       # pozos editados aún no escritos en el diario
+        self._journal_job = None
+        self._journal_sync_job = None
+
+        # animación de corrección en curso (frames con after, se puede interrumpir)
+        self._anim = None
+        self._anim_job = None
+
+        # planificador de redibujado: las peticiones se acumulan y se atienden una vez por frame
+        self._render_job = None
+        self._render_full = False           # hay que redibujar capas (curvas, derivada, Tm)
+        self._render_cursor = False         # sólo se ha movido el cursor del índice
+        self._render_before = []            # trabajo aplazado a hacer antes del dibujo
+        self._last_render = 0.0
+        self._idx_view = None               # (pozo, x visible, texto de Tm) del último label completo
+
+        # igual para el modelo de filas de "All wells" (+ mapa y vista de placa): una
+        # reconstrucción por edición, aunque la pidan varios refrescos de listas
+        self._rows_job = None
+        self._rows_full = False             # reformatear todas las etiquetas
+        self._rows_relabel = set()          # ...o sólo las de estos pozos
+
+        # Cache para cálculos de Tm: (well, versión, trim, smoothing) -> (tm, x, dplot)
+        self._tm_cache = TmCache()
         self._cached_smooth_value = 25
+        self._smooth_ctl = (self.smooth_on_var.get(), self._get_smooth_strength())  # controles de _cached_smooth_value
+
+        # trabajo largo en segundo plano (uno a la vez), con progreso y Cancel en la barra de estado
+        self._job = None
+        self._job_handlers = (None, None, None)  # (on_item, on_done, on_cancel)
+        self._job_poll = None
+        self._tm_job_before = None          # estado de Tm/smoothing previo al recálculo en curso
 
         # UI
         self._build_ui()
         self._bind_shortcuts()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # load file
         if path is not None and os.path.exists(path):
@@ -177,6 +183,11 @@ class DSF_Harmonizer(tk.Tk):
         self.redo_btn = ttk.Button(bar1, text="Redo (Ctrl+Y / Ctrl+Shift+Z)", command=self._redo_current_well, state="disabled")
         self.redo_btn.pack(side=tk.LEFT, padx=(0,6))
         ttk.Checkbutton(bar1, text="Animate correction", variable=self.animate_var).pack(side=tk.LEFT, padx=(8,0))
+        ttk.Checkbutton(bar1, text="Cache plate (.npz)", variable=self.sidecar_var).pack(side=tk.LEFT, padx=(8,0))
+        ttk.Label(bar1, text="Run on:").pack(side=tk.LEFT, padx=(12,4))
+        backend_box = ttk.Combobox(bar1, textvariable=self.backend_var, values=BACKENDS, width=8, state="readonly")
+        backend_box.pack(side=tk.LEFT)
+        backend_box.bind("<<ComboboxSelected>>", self._on_backend_change)
 
         # ===== Toolbar row 2 =====
         bar2 = ttk.Frame(self)
@@ -207,7 +218,8 @@ class DSF_Harmonizer(tk.Tk):
         self.scan_btn.pack(side=tk.LEFT)
         self.correct_all_btn = ttk.Button(bar2, text="Correct all suspects", command=self._correct_all_suspects, state="disabled")
         self.correct_all_btn.pack(side=tk.LEFT, padx=(6,0))
-        ttk.Checkbutton(bar2, text="Multi-jump", variable=self.multi_jump_var).pack(side=tk.LEFT, padx=(12,0))
+        ttk.Label(bar2, text="Engine:").pack(side=tk.LEFT, padx=(12,0))
+        ttk.Combobox(bar2, textvariable=self.engine_var, values=ENGINES, width=11, state="readonly").pack(side=tk.LEFT, padx=(4,0))
 
         # ===== Toolbar row 3 (Review mode) =====
         bar3 = ttk.Frame(self)
@@ -253,7 +265,7 @@ class DSF_Harmonizer(tk.Tk):
 
         all_frame = ttk.LabelFrame(left, text="All wells (with data)")
         all_frame.pack(fill=tk.BOTH, expand=True)
-        self.well_list = tk.Listbox(all_frame, exportselection=False)
+        self.well_list = VirtualListbox(all_frame)
         self.well_list.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
         self.well_list.bind("<<ListboxSelect>>", self._on_select_well)
         self.well_list.bind("<Double-1>", self._goto_selected_well)
@@ -261,7 +273,7 @@ class DSF_Harmonizer(tk.Tk):
         # Frame para Tm outliers con contador dinámico
         self.tm_outlier_frame = ttk.LabelFrame(left, text="Tm outliers (0)")
         self.tm_outlier_frame.pack(fill=tk.BOTH, expand=True, pady=(6,0))
-        self.tm_outlier_list = tk.Listbox(self.tm_outlier_frame, exportselection=False)
+        self.tm_outlier_list = VirtualListbox(self.tm_outlier_frame)
         self.tm_outlier_list.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
         self.tm_outlier_list.bind("<<ListboxSelect>>", self._on_select_tm_outlier)
         self.tm_outlier_list.bind("<Double-1>", self._goto_tm_outlier)
@@ -316,13 +328,13 @@ class DSF_Harmonizer(tk.Tk):
         mid.pack(side=tk.LEFT, fill=tk.Y, padx=(8,8))
         corr_frame = ttk.LabelFrame(mid, text="Corrected")
         corr_frame.pack(fill=tk.BOTH, expand=True)
-        self.corrected_list = tk.Listbox(corr_frame, exportselection=False)
+        self.corrected_list = VirtualListbox(corr_frame)
         self.corrected_list.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
         self.corrected_list.bind("<<ListboxSelect>>", self._on_select_corrected)
 
         susp_frame = ttk.LabelFrame(mid, text="Suspected")
         susp_frame.pack(fill=tk.BOTH, expand=True, pady=(8,0))
-        self.suspected_list = tk.Listbox(susp_frame, exportselection=False)
+        self.suspected_list = VirtualListbox(susp_frame)
         self.suspected_list.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
         self.suspected_list.bind("<<ListboxSelect>>", self._on_select_suspected)
 
@@ -334,6 +346,23 @@ class DSF_Harmonizer(tk.Tk):
         self.recover_well_btn = ttk.Button(btn_frame, text="Recover Well", command=self._recover_selected_well)
         self.recover_well_btn.pack(side=tk.LEFT, padx=(6,0))
 
+        # Mapa de la placa (Tm o estado QC); click en una celda = seleccionar pozo
+        self.plate_map_frame = ttk.LabelFrame(mid, text="Plate map")
+        self.plate_map_frame.pack(side=tk.TOP, fill=tk.X, pady=(8,0))
+        pm_bar = ttk.Frame(self.plate_map_frame)
+        pm_bar.pack(fill=tk.X, padx=4)
+        ttk.Radiobutton(pm_bar, text="Tm", variable=self.plate_map_var, value="tm",
+                        command=self._on_plate_map_mode).pack(side=tk.LEFT)
+        ttk.Radiobutton(pm_bar, text="QC", variable=self.plate_map_var, value="qc",
+                        command=self._on_plate_map_mode).pack(side=tk.LEFT, padx=(6,0))
+        self.plate_fig = Figure(figsize=(2.6, 1.9), dpi=100)
+        self.plate_fig.subplots_adjust(left=0.1, right=0.98, top=0.95, bottom=0.12)
+        self.plate_canvas = FigureCanvasTkAgg(self.plate_fig, master=self.plate_map_frame)
+        self.plate_canvas.get_tk_widget().pack(fill=tk.X, padx=4, pady=(0,4))
+        self.plate_canvas.mpl_connect("button_press_event", self._on_plate_click)
+        self.plate_map = PlateMap(self.plate_canvas, self.plate_fig.add_subplot(111), PLATE_QC_COLORS)
+        self._plate_map_wells = None        # lista de pozos para la que está hecho el layout
+
         # right: plots + per-well controls
         right = ttk.Frame(main)
         right.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -370,9 +399,32 @@ class DSF_Harmonizer(tk.Tk):
         self.ax = self.fig.add_subplot(gs[0])
         self.axd = self.fig.add_subplot(gs[1], sharex=self.ax)
 
-        self.canvas = FigureCanvasTkAgg(self.fig, master=right)
+        # pestañas: pozo actual / todas las curvas de la placa
+        self.view_tabs = ttk.Notebook(right)
+        self.view_tabs.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        well_tab = ttk.Frame(self.view_tabs)
+        self.view_tabs.add(well_tab, text="Well")
+        self.plate_tab = ttk.Frame(self.view_tabs)
+        self.view_tabs.add(self.plate_tab, text="Plate view")
+        self.view_tabs.bind("<<NotebookTabChanged>>", lambda e: self._refresh_plate_grid())
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=well_tab)
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         self.canvas.mpl_connect("button_press_event", self._on_plot_click)
+        self.plot = CurvePlot(self.canvas, self.ax, self.axd)
+
+        # Plate view: una celda por pozo (curva corregida y, opcional, derivada); click = abrir pozo
+        pg_bar = ttk.Frame(self.plate_tab)
+        pg_bar.pack(side=tk.TOP, fill=tk.X, padx=4, pady=(4,0))
+        ttk.Checkbutton(pg_bar, text="Show derivative", variable=self.plate_deriv_var,
+                        command=self._refresh_plate_grid).pack(side=tk.LEFT)
+        self.plate_grid_fig = Figure(figsize=(6,4), dpi=100)
+        self.plate_grid_fig.subplots_adjust(left=0.04, right=0.99, top=0.98, bottom=0.05)
+        self.plate_grid_canvas = FigureCanvasTkAgg(self.plate_grid_fig, master=self.plate_tab)
+        self.plate_grid_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.plate_grid_canvas.mpl_connect("button_press_event", self._on_plate_grid_click)
+        self.plate_grid = PlateGrid(self.plate_grid_canvas, self.plate_grid_fig.add_subplot(111), PLATE_GRID_COLORS)
+        self._plate_grid_wells = None
 
         # ===== T-range & Expected T controls (below derivative plot) =====
         range_frame = ttk.LabelFrame(right, text="Temperature ranges")
@@ -425,6 +477,13 @@ class DSF_Harmonizer(tk.Tk):
         status_bar = ttk.Frame(self)
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         ttk.Label(status_bar, textvariable=self.status_var, anchor="w").pack(side=tk.LEFT, fill=tk.X, expand=True, padx=8, pady=4)
+        # progreso del trabajo en segundo plano (sólo visible mientras hay uno)
+        self.job_frame = ttk.Frame(status_bar)
+        self.job_var = tk.StringVar(value="")
+        ttk.Label(self.job_frame, textvariable=self.job_var, anchor="e").pack(side=tk.LEFT, padx=(0, 6))
+        self.job_bar = ttk.Progressbar(self.job_frame, mode="determinate", length=160)
+        self.job_bar.pack(side=tk.LEFT, pady=4)
+        ttk.Button(self.job_frame, text="Cancel", command=self._cancel_job).pack(side=tk.LEFT, padx=(6, 0))
 
         # light theme defaults
         self._apply_light_theme()
@@ -466,7 +525,7 @@ class DSF_Harmonizer(tk.Tk):
                    getattr(self, "suspected_list", None),
                    getattr(self, "tm_outlier_list", None)]:
             if lb:
-                lb.config(bg="#ffffff", fg="#111111", highlightbackground="#f7f7f7",
+                lb.listbox.config(bg="#ffffff", fg="#111111", highlightbackground="#f7f7f7",
                           selectbackground="#c7d2fe", selectforeground="#000000")
         # matplotlib light
         face, grid, txt = "#ffffff", "#cccccc", "#111111"
@@ -515,15 +574,7 @@ class DSF_Harmonizer(tk.Tk):
     # ------------------------ helpers ------------------------
     @staticmethod
     def _well_sortkey(w):
-        w = (w or "").strip().upper()
-        if not w:
-            return ("Z", 999)
-        row = w[0]
-        try:
-            col = int("".join(ch for ch in w[1:] if ch.isdigit()))
-        except Exception:
-            col = 999
-        return (row, col)
+        return well_sortkey(w)
 
     def _clamp_index(self, i):
         if self.current_well is None:
@@ -543,12 +594,29 @@ class DSF_Harmonizer(tk.Tk):
             k = 0.0
         return max(0.0, abs_thr), max(0.0, k), self.disp_method.get()
 
+    def _on_backend_change(self, event=None):
+        # cambiar de backend cierra el pool (shutdown con espera): no mientras un trabajo lo usa
+        if self._executor is not None and self._job_busy():
+            self.backend_var.set(self._executor.backend)
+
+    def _get_executor(self):
+        """WellExecutor for the backend chosen in the toolbar (pool reused between calls).
+        While a background job runs, the executor it is using is kept."""
+        backend = self.backend_var.get()
+        if backend not in BACKENDS:
+            backend = "serial"
+        if self._job is not None and self._executor is not None:
+            return self._executor
+        if self._executor is None or self._executor.backend != backend:
+            if self._executor is not None:
+                self._executor.close()
+            self._executor = WellExecutor(backend)
+        return self._executor
+
     def _update_undo_redo_state(self):
         w = self.current_well
-        hist = self.history.get(w, []) if w else []
-        redo = self.redo_history.get(w, []) if w else []
-        self.undo_btn.config(state=("normal" if hist else "disabled"))
-        self.redo_btn.config(state=("normal" if redo else "disabled"))
+        self.undo_btn.config(state=("normal" if w and self.undo_log.can_undo(w) else "disabled"))
+        self.redo_btn.config(state=("normal" if w and self.undo_log.can_redo(w) else "disabled"))
 
     # ------------------------ smoothing helpers ------------------------
     def _get_smooth_strength(self):
@@ -559,14 +627,11 @@ class DSF_Harmonizer(tk.Tk):
 
     def _get_smoothing_for_derivative(self):
         """Smoothing para derivada: siempre base=25 + extra si smooth_on activado."""
-        SMOOTH_BASE = 25
-        if not self.smooth_on_var.get():
-            return SMOOTH_BASE
         try:
-            user = int(self.smooth_strength_var.get())
-            return max(SMOOTH_BASE, user)
-        except:
-            return SMOOTH_BASE
+            user = self.smooth_strength_var.get()
+        except Exception:
+            user = 0
+        return derivative_strength(self.smooth_on_var.get(), user)
 
     def _maybe_smooth(self, y):
         if self.smooth_on_var.get():
@@ -583,16 +648,45 @@ class DSF_Harmonizer(tk.Tk):
         self.smooth_entry.delete(0, tk.END)
         self.smooth_entry.insert(0, str(val))
 
+        # el recálculo de Tm de la placa se hace una vez por frame, no por cada tick del slider
+        self._request_draw(before=self._sync_smoothing_tm)
+
+    def _sync_smoothing_tm(self):
         # Invalidar cache de Tm solo si smoothing afecta derivada
         old_smooth = self._cached_smooth_value
         new_smooth = self._get_smoothing_for_derivative()
-        if old_smooth != new_smooth:
-            self._tm_cache.clear()
+        tm_job = self._job is not None and self._job.name == TM_JOB
+        if old_smooth == new_smooth:
+            if not tm_job:
+                self._smooth_ctl = (self.smooth_on_var.get(), self._get_smooth_strength())
+            return
+        if self.store is None:
             self._cached_smooth_value = new_smooth
+            return
+        if tm_job:
+            # se ha vuelto a mover antes de terminar: se relanza, y Cancel sigue volviendo al de antes
+            before = self._tm_job_before
+            self._cancel_job(roll_back=False)
+        elif self._job is not None:
+            # hay otro trabajo en marcha: el recálculo se hace aquí, como siempre
+            self._cached_smooth_value = new_smooth
+            self._smooth_ctl = (self.smooth_on_var.get(), self._get_smooth_strength())
             self._recompute_tm_all_wells()
             self._refresh_all_wells_with_tm() # refrescar también las Tm mostradas en "All wells"
-
-        self._draw_current()
+            return
+        else:
+            before = (self._smooth_ctl, old_smooth, dict(self.tm_values), self._tm_arr.copy(),
+                      dict(self.well_version))
+        self._cached_smooth_value = new_smooth
+        self._smooth_ctl = (self.smooth_on_var.get(), self._get_smooth_strength())
+        self._recompute_tm_in_background(before)
+
+    def _set_smoothing_controls(self, on, strength):
+        self.smooth_on_var.set(on)
+        self.smooth_strength_var.set(strength)
+        self.smooth_slider.set(strength)
+        self.smooth_entry.delete(0, tk.END)
+        self.smooth_entry.insert(0, str(strength))
 
     def _set_smooth_from_entry(self):
         try:
@@ -619,11 +713,11 @@ class DSF_Harmonizer(tk.Tk):
         """Initialize analysis T range sliders for current well."""
         if self.current_well is None:
             return
-        g = self.per_well_work[self.current_well]
-        if g.empty:
+        x = self.store.temp(self.current_well)
+        if len(x) == 0:
             return
-        tmin_data = float(g["Temperature"].min())
-        tmax_data = float(g["Temperature"].max())
+        tmin_data = float(x.min())
+        tmax_data = float(x.max())
         if not np.isfinite(tmin_data) or not np.isfinite(tmax_data) or tmin_data >= tmax_data:
             return
 
@@ -652,11 +746,11 @@ class DSF_Harmonizer(tk.Tk):
         """Return (tmin, tmax) from sliders/entries, clamped to data range."""
         if self.current_well is None:
             return (None, None)
-        g = self.per_well_work[self.current_well]
-        if g.empty:
+        x = self.store.temp(self.current_well)
+        if len(x) == 0:
             return (None, None)
-        tmin_data = float(g["Temperature"].min())
-        tmax_data = float(g["Temperature"].max())
+        tmin_data = float(x.min())
+        tmax_data = float(x.max())
         try:
             tmin = float(self.tmin_var.get())
         except Exception:
@@ -678,7 +772,7 @@ class DSF_Harmonizer(tk.Tk):
         self.tmin_var.set(val)
         self.tmin_entry.delete(0, tk.END)
         self.tmin_entry.insert(0, f"{val:.2f}")
-        self._draw_current()
+        self._request_draw()
 
     def _on_tmax_slider(self):
         if self.current_well is None:
@@ -687,60 +781,60 @@ class DSF_Harmonizer(tk.Tk):
         self.tmax_var.set(val)
         self.tmax_entry.delete(0, tk.END)
         self.tmax_entry.insert(0, f"{val:.2f}")
-        self._draw_current()
+        self._request_draw()
 
     def _set_tmin_from_entry(self):
         if self.current_well is None:
             return
-        g = self.per_well_work[self.current_well]
-        if g.empty:
+        x = self.store.temp(self.current_well)
+        if len(x) == 0:
             return
         try:
             val = float(self.tmin_entry.get())
         except Exception:
             return
-        tmin_data = float(g["Temperature"].min())
-        tmax_data = float(g["Temperature"].max())
+        tmin_data = float(x.min())
+        tmax_data = float(x.max())
         val = max(tmin_data, min(val, tmax_data))
         self.tmin_var.set(val)
         self.tmin_scale.configure(from_=tmin_data, to=tmax_data)
         self.tmin_scale.set(val)
         self.tmin_entry.delete(0, tk.END)
         self.tmin_entry.insert(0, f"{val:.2f}")
-        self._draw_current()
+        self._request_draw()
 
     def _set_tmax_from_entry(self):
         if self.current_well is None:
             return
-        g = self.per_well_work[self.current_well]
-        if g.empty:
+        x = self.store.temp(self.current_well)
+        if len(x) == 0:
             return
         try:
             val = float(self.tmax_entry.get())
         except Exception:
             return
-        tmin_data = float(g["Temperature"].min())
-        tmax_data = float(g["Temperature"].max())
+        tmin_data = float(x.min())
+        tmax_data = float(x.max())
         val = max(tmin_data, min(val, tmax_data))
         self.tmax_var.set(val)
         self.tmax_scale.configure(from_=tmin_data, to=tmax_data)
         self.tmax_scale.set(val)
         self.tmax_entry.delete(0, tk.END)
         self.tmax_entry.insert(0, f"{val:.2f}")
-        self._draw_current()
+        self._request_draw()
 
     def _remove_data_outside_range(self):
         """Store analysis T range [tmin, tmax] for current well (reversible via undo)."""
         if self.current_well is None:
             return
-        g = self.per_well_work[self.current_well].copy()
-        if g.empty:
+        x = self.store.temp(self.current_well)
+        if len(x) == 0:
             return
         tmin, tmax = self._get_current_t_range()
         if tmin is None or tmax is None or tmin >= tmax:
             messagebox.showinfo("Invalid range", "Set a valid analysis T range first.")
             return
-        mask = (g["Temperature"] >= tmin) & (g["Temperature"] <= tmax)
+        mask = (x >= tmin) & (x <= tmax)
         if mask.sum() < 3:
             messagebox.showinfo("Too few points", "Range would leave fewer than 3 points.")
             return
@@ -749,32 +843,23 @@ class DSF_Harmonizer(tk.Tk):
         self._push_history(self.current_well)
         self.trim_ranges[self.current_well] = (tmin, tmax)
 
-        # Invalidar cache de Tm para este pozo
-        self._tm_cache.pop(self.current_well, None)
-        self._recompute_tm_all_wells()
-        self._refresh_all_wells_with_tm()
+        # Sólo este pozo cambia: recalcular su Tm (media/outliers incrementales)
+        self._mark_dirty(self.current_well)
+        self._refresh_well_labels(self._update_dirty_tm())
         self._draw_current()
         self.status_var.set(f"{self.current_well}: analysis restricted to [{tmin:.2f}, {tmax:.2f}] °C (reversible).")
 
     # ------------------------ trimming helpers ------------------------
-    def _get_visible_df(self, well):
-        """Return dataframe for well after applying any trim range."""
-        if well in self.deleted_wells:
-            # Si está eliminado, devolver DataFrame vacío para que no se exporte ni se calcule
-            return pd.DataFrame(columns=["Well","Temperature","Fluorescence"])
+    _EMPTY_XY = (np.empty(0), np.empty(0))
 
-        g = self.per_well_work.get(well)
-        if g is None:
+    def _get_visible_xy(self, well):
+        """Return (x, y) views of the working curve after applying any trim range."""
+        if well in self.deleted_wells:
+            # Si está eliminado, devolver curva vacía para que no se exporte ni se calcule
+            return self._EMPTY_XY
+        if self.store is None or well not in self.store:
             return None
-        if well not in self.trim_ranges:
-            return g
-        tmin, tmax = self.trim_ranges[well]
-        mask = (g["Temperature"] >= tmin) & (g["Temperature"] <= tmax)
-        g2 = g.loc[mask].reset_index(drop=True)
-        if len(g2) < 3:
-            # Fall back to full data if overly aggressive trim
-            return g
-        return g2
+        return self.store.visible(well, self.trim_ranges.get(well))
 
     # ------------------------ file I/O ------------------------
     def _ask_and_load(self):
@@ -786,61 +871,62 @@ class DSF_Harmonizer(tk.Tk):
             self._load_gdsf(fpath)
 
     def _load_gdsf(self, path):
+        use_cache = self.sidecar_var.get()
         try:
-            df = pd.read_csv(path, sep="\t", header=None, names=["Well","Temperature","Fluorescence"])
+            key = source_key(path) if use_cache else None
+            store = load_sidecar(path, key) if use_cache else None
+            from_cache = store is not None
+            if store is None:
+                store = load_plate(path)
+        except ValueError as e:
+            messagebox.showerror("Invalid format", str(e))
+            return
         except Exception as e:
             messagebox.showerror("Read error", "Could not read file:\n" + str(e))
             return
-        for col in ["Well","Temperature","Fluorescence"]:
-            if col not in df.columns:
-                messagebox.showerror("Invalid format", "The .gdsf must have 3 columns: Well, Temperature, Fluorescence")
-                return
-        df["Well"] = df["Well"].astype(str).str.upper().str.strip()
-        df["Temperature"] = pd.to_numeric(df["Temperature"], errors="coerce")
-        df["Fluorescence"] = pd.to_numeric(df["Fluorescence"], errors="coerce")
-        df = df.dropna(subset=["Temperature","Fluorescence"])
-
-        self.df_orig = df.copy()
-        self.df_work = df.copy()
-
-        # Elegimos wells que tengan alguna fluorescencia distinta de 0
-        wells_sorted = sorted(
-            [w for w, g in df.groupby("Well") if (g["Fluorescence"] != 0).any()],
-            key=self._well_sortkey
-        )
 
-        self.per_well_orig = {
-            w: self.df_orig[self.df_orig["Well"]==w].copy().sort_values("Temperature").reset_index(drop=True)
-            for w in wells_sorted
-        }
-        self.per_well_work = {
-            w: self.df_work[self.df_work["Well"]==w].copy().sort_values("Temperature").reset_index(drop=True)
-            for w in wells_sorted
-        }
+        self._cancel_job()                  # lo aplicado a medias se deshace antes de cerrar el diario
+        # lo pendiente de la placa anterior va a su diario (se borra si ya estaba todo exportado)
+        self._close_journal(clean=not self._has_unexported_edits())
+        self.store = store
+        wells_sorted = list(self.store.wells)
 
         self.wells = wells_sorted
         self.suspected_wells = []
         self.corrected_wells = []
         self.deleted_wells = set()
         self.auto_suspect_index = {}
-        self.history = {w: [] for w in self.wells}
-        self.redo_history = {w: [] for w in self.wells}
-        self.trim_history = {w: [] for w in self.wells}
-        self.trim_redo = {w: [] for w in self.wells}
-        self.auto_trim_history = {w: [] for w in self.wells}
-        self.auto_trim_redo = {w: [] for w in self.wells}
+        self.undo_log.clear()
+        self.plot.forget_decimated()
         self.trim_ranges = {}
         self.tm_values = {}
+        self._tm_arr = np.full(len(self.wells), np.nan)
+        self.well_version = {w: 0 for w in self.wells}
+        self._tm_dirty = set()
+        self._data_version = 0
+        self._exported_version = 0
+        self._jump_stats = {}
+        self._jump_index = None
+        self._scan_live = False
         self.tm_outlier_wells = []
-        self._tm_cache = {}
+        self._tm_cache = TmCache()
         self.auto_trimmed_wells = set()
-        self._last_tm_params = None
         self._cached_smooth_value = 25
+        self._smooth_ctl = (self.smooth_on_var.get(), self._get_smooth_strength())
 
+        # Tm del sidecar sólo vale si se calculó con el mismo smoothing de derivada
+        strength = self._get_smoothing_for_derivative()
+        tm_fresh = store.tm_orig is None or store.tm_orig[0] != strength
         self._populate_lists()
-        self.status_var.set(f"Loaded: {os.path.basename(path)} | Wells with data: {len(self.wells)}")
+        if use_cache and tm_fresh:
+            store.tm_orig = (strength, dict(self.tm_values))
+            save_sidecar(path, store, key)
+        cached = " (cached)" if from_cache else ""
+        self.status_var.set(f"Loaded: {os.path.basename(path)}{cached} | Wells with data: {len(self.wells)}")
+        self._open_journal(path, key)
 
         if self.wells:
+            self._flush_well_rows()         # las filas de la placa nueva, antes de seleccionar por índice
             self.well_list.selection_clear(0, tk.END)
             self.well_list.selection_set(0)
             self._on_select_well()
@@ -849,21 +935,60 @@ class DSF_Harmonizer(tk.Tk):
         self.correct_all_btn.config(state="normal")
         self._update_undo_redo_state()
 
-    def _build_export_df_corrected(self):
-        """Build corrected dataframe, respecting trims and deleted wells."""
-        frames = []
+    def _iter_export_curves(self):
+        """Yield (well, x, y) of every exportable well (trimmed; deleted wells skipped)."""
         for w in self.wells:
-            g = self._get_visible_df(w)
-            if len(g) > 0:  # Solo exportar si no está vacío (no eliminado)
-                frames.append(g[["Well","Temperature","Fluorescence"]])
-        out_df = pd.concat(frames, ignore_index=True)[["Well","Temperature","Fluorescence"]]
-        return out_df
+            x, y = self._get_visible_xy(w)
+            if len(x) > 0:  # Solo exportar si no está vacío (no eliminado)
+                yield w, x, y
+
+    def _export_in_background(self, name, build, write, fpath, saved_msg, saves_edits=False):
+        """Build and write an export as a background job.
+
+        The curves are copied here; build(curves, job) runs on the worker and should
+        count its progress on `job` (total = number of curves). The file is written
+        next to fpath and renamed at the end, so a cancelled export leaves no file.
+        saves_edits: the file keeps every edit, so once written they count as saved.
+        """
+        curves = [(w, np.array(x), np.array(y)) for w, x, y in self._iter_export_curves()]
+        version = self._data_version
+        root, ext = os.path.splitext(fpath)
+        part = f"{root}.part{ext}"
+
+        def work(job):
+            df = build(curves, job)
+            if job.cancelled:
+                return
+            try:
+                write(df, part)
+                if job.cancelled:
+                    os.remove(part)
+                else:
+                    os.replace(part, fpath)
+            except BaseException:
+                if os.path.exists(part):
+                    os.remove(part)
+                raise
+
+        def finish(job):
+            if saves_edits:
+                self._exported_version = version
+            self.status_var.set(saved_msg)
+
+        def cancelled(job):
+            if job.error is not None:
+                messagebox.showerror("Save error", "Could not save:\n" + str(job.error))
+            else:
+                self.status_var.set(f"{name} cancelled: nothing written.")
+
+        self._start_job(BackgroundJob(work, len(curves), name), None, finish, cancelled)
 
     def _export_corrected(self):
-        if self.df_work is None:
+        if self.store is None:
             messagebox.showinfo("Nothing to save", "Load a .gdsf first.")
             return
-        out_df = self._build_export_df_corrected()
+        if self._job_busy():
+            return
         fpath = filedialog.asksaveasfilename(
             title="Export corrected .gdsf",
             defaultextension=".gdsf",
@@ -871,27 +996,18 @@ class DSF_Harmonizer(tk.Tk):
         )
         if not fpath:
             return
-        try:
-            out_df.to_csv(fpath, sep="\t", header=False, index=False, float_format="%.10g")
-            self.status_var.set(f"Saved corrected: {os.path.basename(fpath)}")
-        except Exception as e:
-            messagebox.showerror("Save error", "Could not save:\n" + str(e))
+        self._export_in_background(
+            "Export corrected", lambda curves, job: build_corrected_df(job.iterate(curves)),
+            write_gdsf, fpath, f"Saved corrected: {os.path.basename(fpath)}", saves_edits=True
+        )
 
     def _export_corrected_smoothed(self):
-        if self.df_work is None:
+        if self.store is None:
             messagebox.showinfo("Nothing to save", "Load a .gdsf first.")
             return
+        if self._job_busy():
+            return
         strength = self._get_smooth_strength()
-        frames = []
-        for w in self.wells:
-            g = self._get_visible_df(w)
-            if len(g) > 0:  # Solo exportar si no está vacío
-                g = g.copy().sort_values("Temperature").reset_index(drop=True)
-                y = g["Fluorescence"].values.astype(float)
-                ys = smooth_signal(y, strength)
-                g["Fluorescence"] = ys
-                frames.append(g[["Well","Temperature","Fluorescence"]])
-        out_df = pd.concat(frames, ignore_index=True)
         fpath = filedialog.asksaveasfilename(
             title="Export corrected+smoothed .gdsf",
             defaultextension=".gdsf",
@@ -899,11 +1015,10 @@ class DSF_Harmonizer(tk.Tk):
         )
         if not fpath:
             return
-        try:
-            out_df.to_csv(fpath, sep="\t", header=False, index=False, float_format="%.10g")
-            self.status_var.set(f"Saved corrected+smoothed: {os.path.basename(fpath)} (strength={strength})")
-        except Exception as e:
-            messagebox.showerror("Save error", "Could not save:\n" + str(e))
+        self._export_in_background(
+            "Export corrected+smoothed", lambda curves, job: build_smoothed_df(job.iterate(curves), strength),
+            write_gdsf, fpath, f"Saved corrected+smoothed: {os.path.basename(fpath)} (strength={strength})"
+        )
 
     # ------------------------ Tm helpers ------------------------
     def _get_tm_window(self):
@@ -929,8 +1044,8 @@ class DSF_Harmonizer(tk.Tk):
                 return float(ref_str)
             except:
                 pass
-        valid_tms = [tm for tm in self.tm_values.values() if tm is not None and np.isfinite(tm)]
-        return np.mean(valid_tms) if valid_tms else 0.0
+        valid_tms = self._tm_arr[np.isfinite(self._tm_arr)]
+        return np.mean(valid_tms) if len(valid_tms) else 0.0
 
     def _get_tm_threshold(self):
         """Obtiene umbral de outlier."""
@@ -971,106 +1086,33 @@ class DSF_Harmonizer(tk.Tk):
         i_tm = int(np.nanargmax(d_oriented))
         return float(x[i_tm]) if np.isfinite(d_oriented[i_tm]) else None
 
-    def _compute_tm_for_xy(self, x, y):
-        """Internal helper: compute Tm and normalized derivative for arbitrary x,y.
-        IMPORTANTE: Tm siempre se calcula globalmente (no se restringe por Expected Tm range).
-        """
-        # Verificar si está en cache
-        cache_key = f"{len(x)}_{hash(x.tobytes())}_{hash(y.tobytes())}"
-        current_params = (self._get_smoothing_for_derivative(), None)  # ventana ya no se usa
-
-        if cache_key in self._tm_cache and self._last_tm_params == current_params:
-            return self._tm_cache[cache_key]
-
-        # Parámetros de smoothing
-        s = self._get_smoothing_for_derivative()
-
-        # convertir datos
-        x = np.asarray(x, dtype=float)
-        y = np.asarray(y, dtype=float)
-        if x.size < 3:
-            result = (None, x, None)
-            self._tm_cache[cache_key] = result
-            return result
-
-        # ordenar por temperatura
-        order = np.argsort(x)
-        x = x[order]
-        y = y[order]
-
-        # evitar duplicados exactos
-        if np.any(np.diff(x) == 0):
-            eps = np.linspace(0, 1e-9, num=len(x))
-            x = x + eps
-
-        # aplicar smoothing para derivada
-        ys = smooth_signal(y, s)
-        d = np.gradient(ys, x)
-        if d.size == 0 or not np.isfinite(d).any():
-            result = (None, x, None)
-            self._tm_cache[cache_key] = result
-            return result
-
-        max_abs = np.nanmax(np.abs(d))
-        if not np.isfinite(max_abs) or max_abs <= 0:
-            result = (None, x, None)
-            self._tm_cache[cache_key] = result
-            return result
-
-        # orientar derivada hacia arriba
-        i_dom = int(np.nanargmax(np.abs(d)))
-        orient = 1.0 if d[i_dom] > 0 else -1.0
-        d_up = d * orient
-
-        # Tm = máximo global de la derivada orientada
-        i_tm = int(np.nanargmax(d_up))
-        tm = float(x[i_tm]) if np.isfinite(d_up[i_tm]) else None
-
-        # derivada normalizada para el plot
-        maxpos = np.nanmax(d_up) if np.isfinite(d_up).any() else 0.0
-        dplot = d_up / maxpos if maxpos > 0 else d_up
-
-        result = (tm, x, dplot)
-        self._tm_cache[cache_key] = result
-        self._last_tm_params = current_params
-        return result
+    def _tm_key(self, well, smoothing=None):
+        if smoothing is None:
+            smoothing = self._get_smoothing_for_derivative()
+        return (well, self.well_version.get(well, 0), self.trim_ranges.get(well), smoothing)
 
     def _compute_tm(self, well):
-        g = self._get_visible_df(well)
-        if g is None or len(g) < 3:
+        """(tm, x_sorted, dplot) of the visible curve, through the Tm cache.
+        IMPORTANTE: Tm siempre se calcula globalmente (no se restringe por Expected Tm range).
+        """
+        xy = self._get_visible_xy(well)
+        if xy is None or len(xy[0]) < 3:
             return (None, None, None)
-        return self._compute_tm_for_xy(
-            g["Temperature"].values,
-            g["Fluorescence"].values
-        )
+        key = self._tm_key(well)
+        result = self._tm_cache.get(key)
+        if result is None:
+            result = compute_tm_for_xy(*xy, self._get_smoothing_for_derivative())
+            self._tm_cache.put(key, result)
+        return result
 
     def _export_tm_table(self):
-        if self.df_work is None:
+        if self.store is None:
             messagebox.showinfo("Nothing to export", "Load a .gdsf first.")
             return
+        if self._job_busy():
+            return
         strength = self._get_smooth_strength()
-        rows = []
-        for w in self.wells:
-            g = self._get_visible_df(w)
-            if len(g) > 0:  # Solo incluir si no está eliminado
-                g = g.copy().sort_values("Temperature").reset_index(drop=True)
-                x = g["Temperature"].values
-                y = g["Fluorescence"].values.astype(float)
-                
-                tm_raw, _, _ = self._compute_tm_for_xy(x, y)  # como ahora
-
-                # si quisieras un Tm con smoothing más fuerte, algo así:
-                tm_smooth, _, _ = self._compute_tm_for_xy(
-                    x, smooth_signal(y, max(25, int(strength)))
-                )
-
-                rows.append({
-                    "Well": w,
-                    "Tm_corrected": tm_raw,
-                    "Tm_smoothed": tm_smooth,
-                    "Smooth_strength": max(25, int(strength))
-                })
-        out = pd.DataFrame(rows, columns=["Well","Tm_corrected","Tm_smoothed","Smooth_strength"])
+        deriv_strength = self._get_smoothing_for_derivative()
         fpath = filedialog.asksaveasfilename(
             title="Export Tm table (.tsv)",
             defaultextension=".tsv",
@@ -1078,47 +1120,359 @@ class DSF_Harmonizer(tk.Tk):
         )
         if not fpath:
             return
-        try:
-            sep = "\t" if fpath.lower().endswith(".tsv") else ","
-            out.to_csv(fpath, sep=sep, index=False, float_format="%.6g")
-            self.status_var.set(f"Saved Tm table: {os.path.basename(fpath)}")
-        except Exception as e:
-            messagebox.showerror("Save error", "Could not save:\n" + str(e))
+
+        def build(curves, job):
+            # por bloques de pozos, para poder dar progreso y parar entre uno y otro
+            parts = []
+            for i in range(0, len(curves), JOB_TM_CHUNK):
+                if job.cancelled:
+                    break
+                parts.append(build_tm_table(curves[i:i + JOB_TM_CHUNK], deriv_strength, strength))
+                job.advance(len(curves[i:i + JOB_TM_CHUNK]))
+            if len(parts) == 1:
+                return parts[0]
+            return pd.concat(parts, ignore_index=True) if parts else build_tm_table([], deriv_strength, strength)
+
+        self._export_in_background("Export Tm table", build, write_tm_table, fpath,
+                                   f"Saved Tm table: {os.path.basename(fpath)}")
 
     def _on_tm_thr_change(self):
         """Se llama cuando el usuario cambia el umbral o la Tm de referencia."""
-        self._recompute_tm_all_wells()
-        self._refresh_all_wells_with_tm()
+        self._update_tm_stats()
+        self._paint_all_wells_list()
+
+    # ------------------------ session journal ------------------------
+    def _journal_record(self, w):
+        return encode_state(w, self.store.get_steps(w), self.trim_ranges.get(w), w in self.auto_trimmed_wells,
+                            w in self.deleted_wells, w in self.corrected_wells)
+
+    def _edited_wells(self):
+        corrected = set(self.corrected_wells)
+        return [w for w in self.wells
+                if w in self.trim_ranges or w in self.deleted_wells or w in corrected
+                or w in self.auto_trimmed_wells or not self.store.is_original(w)]
+
+    def _open_journal(self, path, key=None):
+        """Offer to replay a previous session of this file, then keep journaling edits."""
+        try:
+            size, _, digest = key or source_key(path)
+        except OSError:
+            return
+        self.journal = SessionJournal(path, (size, digest))
+        records = self.journal.read()
+        if records:
+            if messagebox.askyesno(
+                "Recover session",
+                f"Found edits for {len(records)} wells from a previous session of this file.\n"
+                "Replay them?\n\n(If not, the old journal is kept as a .bak file next to it.)"
+            ):
+                self._replay_journal(records)
+            else:
+                # no se pierde: el diario nuevo empieza de cero y el anterior queda como .bak
+                self.journal.backup()
+        # diario compacto: sólo el estado actual de los pozos editados
+        self.journal.start([self._journal_record(w) for w in self._edited_wells()])
+
+    def _replay_journal(self, records):
+        replayed = []
+        for rec in records:
+            w = rec.get("w")
+            if w not in self.store:
+                continue
+            n = self.store.n_points(w)
+            steps = decode_steps(rec, n)
+            if (len(steps.idx) and int(steps.idx.max()) >= n) or (len(steps.fix_idx) and int(steps.fix_idx.max()) >= n):
+                continue    # registro que no corresponde a esta curva
+            self._push_history(w)           # Undo vuelve a la curva tal como se cargó
+            self.store.set_steps(w, steps)
+            if rec["trim"] is None:
+                self.trim_ranges.pop(w, None)
+            else:
+                self.trim_ranges[w] = tuple(rec["trim"])
+            for flag, target in ((rec["auto"], self.auto_trimmed_wells), (rec["del"], self.deleted_wells)):
+                if flag:
+                    target.add(w)
+                else:
+                    target.discard(w)
+            if rec["corr"] and w not in self.corrected_wells:
+                self.corrected_wells.append(w)
+            self._mark_dirty(w)
+            replayed.append(w)
+        self._journal_pending.clear()       # ya están en el diario
+        self._refresh_well_labels(self._update_dirty_tm())
+        self._refresh_corrected_list()
+        self._refresh_suspected_list()
+        self._update_undo_redo_state()
+        self.status_var.set(f"{self.status_var.get()} | Recovered edits of {len(replayed)} wells from the session journal")
+
+    def _flush_journal(self):
+        self._journal_job = None
+        if self.journal is None or self.store is None:
+            self._journal_pending.clear()
+            return
+        for w in sorted(self._journal_pending, key=self._well_sortkey):
+            if w in self.store:
+                self.journal.append(self._journal_record(w))
+        self._journal_pending.clear()
+        # fsync por lotes: lo que no haya sincronizado append() se sincroniza en un rato
+        if self._journal_sync_job is None:
+            self._journal_sync_job = self.after(int(SYNC_INTERVAL_S * 1000), self._sync_journal)
+
+    def _sync_journal(self):
+        self._journal_sync_job = None
+        if self.journal is not None:
+            self.journal.sync()
+
+    def _has_unexported_edits(self):
+        return self.store is not None and self._data_version != self._exported_version
+
+    def _close_journal(self, clean=False):
+        """Flush and close the journal; clean=True (edits exported or knowingly discarded)
+        deletes it, so the next open of the file does not offer to replay anything."""
+        if self.journal is None:
+            return
+        self._flush_journal()
+        if clean:
+            self.journal.discard()
+        else:
+            self.journal.close()
+        self.journal = None
+
+    def _on_close(self):
+        clean = True
+        if self._has_unexported_edits():
+            answer = messagebox.askyesnocancel(
+                "Unsaved edits",
+                "The corrected curves have changed since the last \"Export corrected\".\n\n"
+                "Yes: discard these edits.\n"
+                "No: keep them in the session journal; opening this plate again offers to replay them.\n"
+                "Cancel: go back."
+            )
+            if answer is None:
+                return
+            clean = answer
+        self._cancel_job()
+        self._close_journal(clean=clean)
+        self.destroy()
+
+    # ------------------------ background jobs ------------------------
+    def _start_job(self, job, on_item=None, on_done=None, on_cancel=None):
+        """Start a BackgroundJob with progress, ETA and Cancel in the status bar.
+
+        on_item(item) runs on the Tk thread for each item the job posts. When it ends,
+        on_done(job) runs, or on_cancel(job) if it was cancelled or raised (job.error),
+        which must undo whatever on_item already applied. One job at a time: callers
+        check _job_busy() first.
+        """
+        self._job = job
+        self._job_handlers = (on_item, on_done, on_cancel)
+        self.job_bar.config(maximum=max(1, job.total), value=0)
+        self.job_var.set(f"{job.name}…")
+        self.job_frame.pack(side=tk.RIGHT, padx=(0, 8))
+        job.start()
+        self._job_poll = self.after(JOB_POLL_MS, self._poll_job)
+
+    def _job_busy(self):
+        """True (and says so in the status bar) while a background job is running."""
+        if self._job is None:
+            return False
+        self.status_var.set(f"Busy: {self._job.name} is still running (wait or press Cancel).")
+        return True
+
+    def _poll_job(self):
+        self._job_poll = None
+        job = self._job
+        if job is None:
+            return
+        on_item, on_done, on_cancel = self._job_handlers
+        for item in job.poll():
+            if on_item is not None:
+                on_item(item)
+        if job.finished:
+            self._end_job(job, on_cancel if job.error is not None else on_done)
+            return
+        self.job_bar.config(value=job.done)
+        self.job_var.set(f"{job.name}: {job.done} / {job.total} · {self._format_eta(job.eta())}")
+        self._job_poll = self.after(JOB_POLL_MS, self._poll_job)
+
+    def _cancel_job(self, roll_back=True):
+        """Stop the running job; its on_cancel rolls back what was already applied
+        (roll_back=False just drops it, for a job that is about to be replaced)."""
+        job = self._job
+        if job is None:
+            return
+        job.cancel()
+        self._end_job(job, self._job_handlers[2] if roll_back else None)
+
+    def _end_job(self, job, handler):
+        self._job = None
+        self._job_handlers = (None, None, None)
+        if self._job_poll is not None:
+            self.after_cancel(self._job_poll)
+            self._job_poll = None
+        self.job_frame.pack_forget()
+        if handler is not None:
+            handler(job)
+
+    @staticmethod
+    def _format_eta(seconds):
+        if seconds is None:
+            return "ETA --"
+        s = int(round(seconds))
+        return f"ETA {s // 60} min {s % 60:02d} s" if s >= 60 else f"ETA {s} s"
 
     # ------------------------ Tm cache & outliers ------------------------
+    def _original_tms(self):
+        """Tm of the untouched curves (from the sidecar) if valid for the current smoothing."""
+        tm_orig = self.store.tm_orig if self.store is not None else None
+        if tm_orig is None or tm_orig[0] != self._get_smoothing_for_derivative():
+            return {}
+        return tm_orig[1]
+
+    def _mark_dirty(self, well):
+        """Record a change of the curve, trim or deleted state of one well."""
+        self.well_version[well] = self.well_version.get(well, 0) + 1
+        self._data_version += 1
+        self._queue_journal(well)
+        self._tm_dirty.add(well)
+        self._tm_cache.invalidate(well)
+
+    def _queue_journal(self, well):
+        """Schedule a journal record of the current state of `well`."""
+        if self.journal is not None:
+            # se escribe al quedar la GUI ociosa, con el estado ya completo (listas incluidas)
+            self._journal_pending.add(well)
+            if self._journal_job is None:
+                self._journal_job = self.after_idle(self._flush_journal)
+
     def _recompute_tm_all_wells(self):
         """Calcula Tm para cada pozo, IGNORANDO los eliminados."""
-        self.tm_values = {}
-        valid = []  # (well, tm) con Tm finita
+        self._tm_dirty.update(self.wells)
+        self._compute_dirty_tm()
+        self._update_tm_stats()
 
-        for w in self.wells:
+    def _update_dirty_tm(self):
+        """Recalcula Tm sólo de los pozos modificados; media y outliers se actualizan después.
+        Returns the list of wells whose Tm was refreshed (plate order).
+        """
+        changed = self._compute_dirty_tm()
+        self._update_tm_stats()
+        return changed
+
+    def _compute_dirty_tm(self):
+        dirty, todo = self._take_dirty_tm()
+        curves = [self._get_visible_xy(w) or self._EMPTY_XY for w in todo]
+        tms = self._get_executor().map_batches(compute_tm_batch, curves, self._get_smoothing_for_derivative())
+        self.tm_values.update(zip(todo, tms))
+        self._sync_tm_arr(dirty)
+        return dirty
+
+    def _take_dirty_tm(self):
+        """Clear the dirty set and resolve what needs no computing (deleted wells, Tm
+        from the sidecar, Tm cache). Returns (dirty, todo): all dirty wells and those
+        whose Tm still has to be computed, both in plate order."""
+        dirty = [w for w in self.wells if w in self._tm_dirty]
+        self._tm_dirty.clear()
+        known = self._original_tms()
+
+        # Ignorar pocillos eliminados; el resto se calcula de una vez (matriz pozos × puntos)
+        todo = []
+        for w in dirty:
             if w in self.deleted_wells:
-                continue  # Ignorar pocillos eliminados
-            g = self._get_visible_df(w)
-            if g is None or len(g) < 3:
-                tm = None
+                self.tm_values.pop(w, None)
+            elif w in known and w not in self.trim_ranges and self.store.is_original(w):
+                self.tm_values[w] = known[w]
+            else:
+                cached = self._tm_cache.get(self._tm_key(w))
+                if cached is not None:
+                    self.tm_values[w] = cached[0]
+                else:
+                    todo.append(w)
+        return dirty, todo
+
+    def _sync_tm_arr(self, wells):
+        for w in wells:
+            tm = self.tm_values.get(w)
+            self._tm_arr[self.store.index[w]] = tm if tm is not None else np.nan
+
+    def _recompute_tm_in_background(self, before):
+        """Plate-wide Tm after a smoothing change, as a background job.
+
+        `before` = (controls, derivative smoothing, tm_values, _tm_arr, well_version)
+        from before the change: Cancel puts the smoothing controls and those Tm back.
+        Wells edited meanwhile get their Tm from the edit itself and are skipped here.
+        """
+        self._tm_dirty.update(self.wells)
+        dirty, todo = self._take_dirty_tm()
+        pending = set(todo)
+        self._sync_tm_arr([w for w in dirty if w not in pending])
+        # copias: las vistas del store se pueden modificar mientras el trabajo las lee
+        curves = [tuple(np.array(a) for a in (self._get_visible_xy(w) or self._EMPTY_XY)) for w in todo]
+        version = {w: self.well_version.get(w, 0) for w in todo}
+        strength = self._get_smoothing_for_derivative()
+        executor = self._get_executor()
+
+        def work(job):
+            for i in range(0, len(todo), JOB_TM_CHUNK):
+                if job.cancelled:
+                    return
+                job.post((todo[i:i + JOB_TM_CHUNK],
+                          executor.map_batches(compute_tm_batch, curves[i:i + JOB_TM_CHUNK], strength)))
+                job.advance(len(curves[i:i + JOB_TM_CHUNK]))
+
+        def apply(item):
+            fresh = [(w, tm) for w, tm in zip(*item) if self.well_version.get(w, 0) == version[w]]
+            self.tm_values.update(fresh)
+            self._sync_tm_arr(w for w, _ in fresh)
+
+        def finish(job):
+            self._tm_job_before = None
+            self._update_tm_stats()
+            self._refresh_all_wells_with_tm() # refrescar también las Tm mostradas en "All wells"
+
+        def revert(job):
+            self._tm_job_before = None
+            ctl, smooth, tm_values, tm_arr, versions = before
+            self._cached_smooth_value = smooth
+            self._smooth_ctl = ctl
+            self._set_smoothing_controls(*ctl)
+            for w in self.wells:
+                if self.well_version.get(w, 0) != versions.get(w, 0):
+                    self._tm_dirty.add(w)   # editado entretanto: se recalcula con el smoothing de antes
+                elif w in tm_values:
+                    self.tm_values[w] = tm_values[w]
+                else:
+                    self.tm_values.pop(w, None)
+            edited = self._tm_dirty.copy()
+            self._tm_arr = tm_arr
+            self._sync_tm_arr(edited)
+            self._compute_dirty_tm()
+            self._update_tm_stats()
+            self._refresh_all_wells_with_tm()
+            self._request_draw()
+            if job.error is not None:
+                messagebox.showerror("Tm error", "Could not recompute Tm:\n" + str(job.error))
             else:
-                tm = self._compute_tm(w)[0]
-            self.tm_values[w] = tm
-            if tm is not None and np.isfinite(tm):
-                valid.append((w, tm))
+                self.status_var.set("Smoothing change cancelled: previous smoothing and Tm restored.")
+
+        self._tm_job_before = before
+        self._start_job(BackgroundJob(work, len(todo), TM_JOB), apply, finish, revert)
+
+    def _update_tm_stats(self):
+        """Media de la placa, Tm de referencia y outliers a partir del array de Tm."""
+        valid = np.isfinite(self._tm_arr)
 
         # reset listas
         self.tm_outlier_wells = []
         self.tm_sorted_wells = []
 
-        if not valid:
+        if not valid.any():
             self.tm_mean_var.set("Current mean Tm: n/a")
             self._refresh_tm_outlier_list()
             return
 
         # media de Tm de todos los pozos válidos
-        arr = np.asarray([tm for _, tm in valid], dtype=float)
+        arr = self._tm_arr[valid]
         mean = float(np.mean(arr))
         self.tm_mean_var.set(f"Current mean Tm: {mean:.2f} °C (n={len(arr)})")
 
@@ -1126,15 +1480,12 @@ class DSF_Harmonizer(tk.Tk):
         thr = self._get_tm_threshold()
         ref_tm = self._get_tm_reference()
 
-        # Calcular desviaciones y ordenar
-        outliers_with_dev = []
-        for w, tm in valid:
-            dev = abs(tm - ref_tm)
-            if dev >= thr:
-                outliers_with_dev.append((w, tm, dev))
-
-        # Ordenar por nombre de pocillo (A1, A2, A3... B1, B2, etc.)
-        outliers_with_dev.sort(key=lambda x: self._well_sortkey(x[0]))
+        # Desviaciones; self.wells ya está en orden de pocillo (A1, A2, ... B1 ...)
+        dev = np.abs(self._tm_arr - ref_tm)
+        outliers_with_dev = [
+            (self.wells[i], self.tm_values[self.wells[i]], float(dev[i]))
+            for i in np.flatnonzero(valid & (dev >= thr))
+        ]
         self.tm_outlier_wells = [w for w, _, _ in outliers_with_dev]
         self.tm_sorted_wells = self.tm_outlier_wells.copy()
 
@@ -1166,32 +1517,14 @@ class DSF_Harmonizer(tk.Tk):
 
     def _refresh_all_wells_with_tm(self):
         """Refresh All wells list text (with Tm) while preserving selection & scroll."""
-        if not self.wells:
-            self.well_list.delete(0, tk.END)
-            return
-
-        sel = self.well_list.curselection()
-        sel_index = sel[0] if sel else None
-        try:
-            first_visible = self.well_list.nearest(0)
-        except Exception:
-            first_visible = 0
+        self._sync_well_rows()
 
-        self.well_list.delete(0, tk.END)
-        for w in self.wells:
-            self.well_list.insert(tk.END, self._format_well_label(w))
-
-        if sel_index is not None and 0 <= sel_index < len(self.wells):
-            self.well_list.selection_set(sel_index)
-            self.well_list.see(sel_index)
-        else:
-            self.well_list.see(first_visible)
-
-        self._paint_all_wells_list()
+    def _refresh_well_labels(self, wells):
+        """Rewrite only the 'All wells' labels of `wells` (Tm / ✂ / DELETED), keeping selection."""
+        self._sync_well_rows(relabel=wells)
 
     def _refresh_tm_outlier_list(self, outliers_with_dev=None):
         """Rellena la lista 'Tm outliers' SOLO con los pozos marcados, mostrando desviación."""
-        self.tm_outlier_list.delete(0, tk.END)
         count = len(self.tm_outlier_wells)
         self.tm_outlier_frame.config(text=f"Tm outliers ({count})" if count > 0 else "Tm outliers")
 
@@ -1204,24 +1537,21 @@ class DSF_Harmonizer(tk.Tk):
                     dev = abs(tm - ref_tm)
                     outliers_with_dev.append((w, tm, dev))
 
+        rows = []
         for w, tm, dev in outliers_with_dev:
             if w not in self.deleted_wells:  # No mostrar outliers eliminados
                 trim_mark = " ✂" if self._well_is_trimmed(w) else ""
-                label = f"{w} — Tm={tm:.2f}°C (Δ={dev:.1f}){trim_mark}"
-                self.tm_outlier_list.insert(tk.END, label)
+                rows.append((f"{w} — Tm={tm:.2f}°C (Δ={dev:.1f}){trim_mark}", None, None))
+        self.tm_outlier_list.set_rows(rows, keep_selection=False)
 
     # ------------------------ lists & color mapping ------------------------
     def _populate_lists(self):
         self._recompute_tm_all_wells()
-        self.well_list.delete(0, tk.END)
-        for w in self.wells:
-            self.well_list.insert(tk.END, self._format_well_label(w))
+        self._sync_well_rows()
         self._refresh_corrected_list()
         self._refresh_suspected_list()
-        self._paint_all_wells_list()
 
     def _refresh_corrected_list(self):
-        self.corrected_list.delete(0, tk.END)
         uniq, seen = [], set()
         for w in self.corrected_wells:
             if w not in self.deleted_wells and w not in seen:  # No mostrar eliminados
@@ -1231,14 +1561,13 @@ class DSF_Harmonizer(tk.Tk):
         # 🔹 Ordenar siempre por orden de pozo (A1, A2, ... B1...)
         self.corrected_wells = sorted(uniq, key=self._well_sortkey)
 
-        for w in self.corrected_wells:
-            label = f"{w} ✂" if self._well_is_trimmed(w) else w
-            self.corrected_list.insert(tk.END, label)
-
+        self.corrected_list.set_rows(
+            [(f"{w} ✂" if self._well_is_trimmed(w) else w, None, None) for w in self.corrected_wells],
+            keep_selection=False,
+        )
         self._paint_all_wells_list()
 
     def _refresh_suspected_list(self):
-        self.suspected_list.delete(0, tk.END)
         filtered = [
             w for w in self.suspected_wells
             if w not in set(self.corrected_wells) and w not in self.deleted_wells
@@ -1247,14 +1576,44 @@ class DSF_Harmonizer(tk.Tk):
         # 🔹 Ordenar también por orden de pozo
         self.suspected_wells = sorted(filtered, key=self._well_sortkey)
 
-        for w in self.suspected_wells:
-            self.suspected_list.insert(tk.END, w)
+        self.suspected_list.set_rows([(w, None, None) for w in self.suspected_wells], keep_selection=False)
         self._paint_all_wells_list()
 
     def _paint_all_wells_list(self):
         """Color mapping en main well list (light theme)."""
+        self._sync_well_rows(relabel=())
+
+    def _sync_well_rows(self, relabel=None):
+        """Rebuild the 'All wells' row model (label + colours), plate map and plate view.
+        Labels are reformatted only for `relabel` (None = every well). The rebuild runs
+        once when the GUI goes idle, however many refreshes one edit asks for."""
+        if relabel is None:
+            self._rows_full = True
+        else:
+            self._rows_relabel.update(relabel)
+        if self._rows_job is None:
+            self._rows_job = self.after_idle(self._apply_well_rows)
+
+    def _flush_well_rows(self):
+        """Do a pending _sync_well_rows now (for code that needs the new rows in place)."""
+        if self._rows_job is not None:
+            self.after_cancel(self._rows_job)
+            self._apply_well_rows()
+
+    def _apply_well_rows(self):
+        self._rows_job = None
+        relabel = None if self._rows_full else self._rows_relabel
+        self._rows_full, self._rows_relabel = False, set()
         if not self.wells:
+            self.well_list.set_rows([])
             return
+        old = self.well_list.rows
+        if relabel is None or len(old) != len(self.wells):
+            labels = [self._format_well_label(w) for w in self.wells]
+        else:
+            labels = [r[0] for r in old]
+            for w in relabel:
+                labels[self.store.index[w]] = self._format_well_label(w)
 
         # Colores
         col_norm_bg = "#ffffff"
@@ -1272,8 +1631,8 @@ class DSF_Harmonizer(tk.Tk):
         out = set(self.tm_outlier_wells)
         deleted = self.deleted_wells
 
-        self.well_list.update_idletasks()
-        for i, w in enumerate(self.wells):
+        rows = []
+        for w, label in zip(self.wells, labels):
             bg = col_norm_bg
             fg = col_norm_fg
             if w in deleted:
@@ -1284,79 +1643,171 @@ class DSF_Harmonizer(tk.Tk):
                 bg, fg = col_susp_bg, col_susp_fg
             if w in out and w not in deleted:
                 fg = col_out_fg
-            self.well_list.itemconfig(i, bg=bg, fg=fg)
+            rows.append((label, bg, fg))
+        self.well_list.set_rows(rows)
+        self._sync_plate_map(rescale=relabel is None)
+
+    # ------------------------ plate map ------------------------
+    def _well_qc_state(self, w, susp, corr, out):
+        if w in self.deleted_wells:
+            return "deleted"
+        if w in out:
+            return "outlier"
+        if w in corr:
+            return "corrected"
+        return "suspected" if w in susp else "ok"
+
+    def _sync_plate_map(self, rescale=False):
+        """Push Tm/QC state to the plate map; only cells that changed are repainted.
+        The Tm colour scale is only re-fitted on plate-wide updates (rescale)."""
+        if self._plate_map_wells is not self.wells:
+            self.plate_map.set_wells(self.wells)
+            self._plate_map_wells = self.wells
+            rescale = True
+        if rescale:
+            tms = np.array([self.tm_values.get(w) for w in self.wells if w not in self.deleted_wells], dtype=float)
+            tms = tms[np.isfinite(tms)]
+            lo, hi = np.percentile(tms, [2, 98]) if len(tms) else (np.nan, np.nan)
+            self.plate_map.set_tm_range(float(lo), float(hi))
+        susp, corr, out = set(self.suspected_wells), set(self.corrected_wells), set(self.tm_outlier_wells)
+        self.plate_map.update({w: (self.tm_values.get(w), self._well_qc_state(w, susp, corr, out))
+                               for w in self.wells})
+        self._refresh_plate_grid()
+        norm = self.plate_map.norm
+        if self.plate_map.mode == "tm" and self.wells:
+            self.plate_map_frame.config(text=f"Plate map (Tm {norm.vmin:.1f}–{norm.vmax:.1f} °C)")
+        else:
+            self.plate_map_frame.config(text="Plate map")
+
+    def _plate_grid_visible(self):
+        return str(self.view_tabs.select()) == str(self.plate_tab)
+
+    def _refresh_plate_grid(self):
+        """Update the Plate view tab (only while it is shown; cells of unchanged wells are kept)."""
+        if not self.wells or not self._plate_grid_visible():
+            return
+        if self._plate_grid_wells is not self.wells:
+            t = self.store.temperature
+            self.plate_grid.set_wells(self.wells, (float(t.min()), float(t.max())) if len(t) else (0.0, 1.0))
+            self._plate_grid_wells = self.wells
+        self.plate_grid.set_show_deriv(self.plate_deriv_var.get())
+        susp, corr, out = set(self.suspected_wells), set(self.corrected_wells), set(self.tm_outlier_wells)
+        smoothing = self._get_smoothing_for_derivative()    # una lectura de las variables Tk, no una por pozo
+        cells = {}
+        for w in self.wells:
+            trim = self.trim_ranges.get(w)
+            cells[w] = ((self.well_version.get(w, 0), trim), self._tm_key(w, smoothing),
+                        self._well_qc_state(w, susp, corr, out))
+        self.plate_grid.update(cells, self._plate_grid_curve, self._plate_grid_deriv)
+
+    def _plate_grid_curve(self, w):
+        # los eliminados se siguen viendo (en gris), así que no se usa _get_visible_xy
+        return self.store.visible(w, self.trim_ranges.get(w))
+
+    def _plate_grid_deriv(self, w):
+        if w in self.deleted_wells:
+            return None
+        _, xd, dplot = self._compute_tm(w)
+        return None if xd is None or dplot is None else (xd, dplot)
+
+    def _on_plate_grid_click(self, event):
+        w = self.plate_grid.well_at(event.xdata, event.ydata) if event.inaxes is self.plate_grid.ax else None
+        if w is None or self.store is None or w not in self.store:
+            return
+        self.view_tabs.select(0)
+        self._select_well_in_list(w)
+
+    def _on_plate_map_mode(self):
+        self.plate_map.set_mode(self.plate_map_var.get())
+        self._sync_plate_map()
+
+    def _on_plate_click(self, event):
+        w = self.plate_map.well_at(event.xdata, event.ydata) if event.inaxes is self.plate_map.ax else None
+        if w is None or self.store is None or w not in self.store:
+            return
+        self._select_well_in_list(w)
+
+    def _select_well_in_list(self, w):
+        idx = self.store.index[w]
+        self.well_list.selection_clear(0, tk.END)
+        self.well_list.selection_set(idx)
+        self.well_list.see(idx)
+        self._on_select_well()
 
     # ------------------------ suspects / auto ------------------------
+    def _current_jump_index(self):
+        """JumpIndex over the visible curves, rebuilt only when some well changed."""
+        if self._jump_index is not None and self._jump_index[0] == self._data_version:
+            return self._jump_index[1]
+        rows = np.full((len(self.wells), 4), np.nan)
+        todo = []
+        for i, w in enumerate(self.wells):
+            ver = self.well_version.get(w, 0)
+            cached = self._jump_stats.get(w)
+            if cached is not None and cached[0] == ver:
+                st = cached[1]
+            elif w not in self.trim_ranges and self.store.is_original(w):
+                # curva sin tocar: estadísticas precalculadas (sidecar)
+                st = self.store.original_jump_stats(w)
+            else:
+                xy = self._get_visible_xy(w)
+                if xy is not None and len(xy[1]) >= 2:
+                    todo.append((i, w, ver, xy[1]))
+                continue
+            self._jump_stats[w] = (ver, st)
+            if st is not None:
+                rows[i] = st
+        # el resto (corregidos / recortados) en una sola pasada vectorizada
+        stats = self._get_executor().map_batches(jump_stats_batch, [y for *_, y in todo])
+        for (i, w, ver, _), st in zip(todo, stats):
+            self._jump_stats[w] = (ver, st)
+            if st is not None:
+                rows[i] = st
+        index = JumpIndex(rows)
+        self._jump_index = (self._data_version, index)
+        return index
+
     def _scan_suspects(self):
         abs_thr, k, method = self._get_thresholds()
         suspects, auto_idx = [], {}
         corrected_set = set(self.corrected_wells)
-        for w in self.wells:
+        index = self._current_jump_index()
+        for i in index.query(abs_thr, k, method):
+            w = self.wells[i]
             if w in corrected_set or w in self.deleted_wells:  # No escanear eliminados
                 continue
-            g = self._get_visible_df(w)
-            if g is None or len(g) < 2:
-                continue
-            y = g["Fluorescence"].values.astype(float)
-            diffs = np.diff(y)
-            if len(diffs) == 0:
-                continue
-            disp = robust_mad_sigma(diffs) if method == "MAD" else (np.std(diffs, ddof=1) if len(diffs) > 1 else 0.0)
-            i_star = int(np.argmax(np.abs(diffs)))
-            maxjump = float(np.abs(diffs[i_star]))
-            cond_abs = maxjump > abs_thr if abs_thr > 0 else False
-            cond_k = (disp > 0) and (maxjump > k * disp) if k > 0 else False
-            if cond_abs or cond_k:
-                suspects.append(w)
-                auto_idx[w] = i_star
-        self.suspected_wells = sorted(list(set(suspects) - corrected_set), key=self._well_sortkey)
+            suspects.append(w)
+            auto_idx[w] = int(index.i_star[i])
+        self.suspected_wells = sorted(suspects, key=self._well_sortkey)
         self.auto_suspect_index = auto_idx
+        self._scan_live = True
         self._refresh_suspected_list()
         self.status_var.set(f"Suspected: {len(self.suspected_wells)} wells (method={method}, abs>{abs_thr}, k={k})")
 
-    # ------------------------ multi-jump correction engine ------------------------
-    def _find_step_indices(self, y, abs_thr, k, method):
-        diffs = np.diff(y)
-        if diffs.size == 0:
-            return []
-        disp = robust_mad_sigma(diffs) if method == "MAD" else (np.std(diffs, ddof=1) if len(diffs) > 1 else 0.0)
-        thr_rel = (k * disp) if k > 0 and disp > 0 else -np.inf
-        thr_abs = abs_thr if abs_thr > 0 else -np.inf
-        thr = max(thr_rel, thr_abs)
-        if not np.isfinite(thr) or thr <= 0:
-            return []
-        idx = np.where(np.abs(diffs) > thr)[0]
-        return idx.tolist()
-
-    def _apply_multi_jump(self, well, iterative=False):
+    def _on_scan_thr_change(self, *_):
+        """Threshold typed/changed: requery the jump index (no rescan of the curves)."""
+        if not self._scan_live or self.store is None:
+            return
+        try:
+            float(self.abs_thr_var.get())
+            float(self.kdisp_var.get())
+        except ValueError:
+            return      # entrada a medio escribir ("", ".", ...): se deja la lista como está
+        self._scan_suspects()
+
+    # ------------------------ whole-curve correction engines (multi-jump / change-point) ------------------------
+    def _apply_multi_jump(self, well, iterative=False, engine="multi"):
         abs_thr, k, method = self._get_thresholds()
-        g = self.per_well_work[well].copy()
-        y0 = g["Fluorescence"].values.astype(float)
-        changed = False
-        max_loops = 20 if iterative else 1
-        y = y0.copy()
-        for _ in range(max_loops):
-            idxs = self._find_step_indices(y, abs_thr, k, method)
-            if not idxs:
-                break
-            changed = True
-            diffs = np.diff(y)
-            deltas = diffs[idxs]
-            n = len(y)
-            adjust = np.zeros(n, dtype=float)
-            for i, dlt in zip(idxs, deltas):
-                adjust[i+1] -= dlt
-            adjust = np.cumsum(adjust)
-            y = y + adjust
-            if not iterative:
-                break
+        y, changed = CURVE_ENGINES[engine](self.store.work(well), abs_thr, k, method, iterative=iterative)
         if changed:
-            g["Fluorescence"] = y
-            self.per_well_work[well] = g
+            self.store.set_work(well, y)
+            self._mark_dirty(well)
         return changed
 
     # ------------------------ batch correct ------------------------
     def _correct_all_suspects(self):
+        if self._job_busy():
+            return
         if not self.suspected_wells:
             self._scan_suspects()
             if not self.suspected_wells:
@@ -1365,69 +1816,80 @@ class DSF_Harmonizer(tk.Tk):
 
         iterative = self.iterative_var.get()
         op = self.op_var.get()
-        use_multi = self.multi_jump_var.get()
+        engine = self.engine_var.get()
+        use_multi = engine in CURVE_ENGINES
 
-        corrected_now = []
-        for w in list(self.suspected_wells):
-            if w in self.deleted_wells:  # Saltar eliminados
-                continue
-            if use_multi:
+        # Las correcciones se calculan en segundo plano (en el backend elegido) y se aplican
+        # aquí según llegan, cada una con su entrada de undo; Cancel las deshace con esas mismas
+        abs_thr, k, method = self._get_thresholds()
+        todo = [w for w in self.suspected_wells if w not in self.deleted_wells]  # Saltar eliminados
+        # copias: las vistas del store se pueden modificar mientras el trabajo las lee
+        if use_multi:
+            fn, extra = CURVE_ENGINES[engine], (abs_thr, k, method, iterative)
+            jobs = [(w, (self.store.work(w).copy(),)) for w in todo]
+        else:
+            fn, extra = single_jump_steps, (abs_thr, k, method, op, iterative)
+            jobs = [(w, (self.store.work(w).copy(), self.store.visible_slice(w, self.trim_ranges.get(w))))
+                    for w in todo]
+        version = {w: self.well_version.get(w, 0) for w in todo}
+        applied = {}        # w -> (estado previo, entradas de undo añadidas, versión tras aplicar)
+        skipped = []        # editados a mano mientras tanto: no se pisan
+
+        def apply(item):
+            w, res = item
+            if self.well_version.get(w, 0) != version[w]:
+                skipped.append(w)
+                return
+            # una entrada de undo por paso aplicado (ninguna si la curva no cambia)
+            steps = ([res[0]] if res[1] else []) if use_multi else res
+            prev = self._well_state(w)
+            for y_new in steps:
                 self._push_history(w)
-                changed = self._apply_multi_jump(w, iterative=iterative)
-            else:
-                changed = False
-                while True:
-                    g_vis = self._get_visible_df(w)
-                    y = g_vis["Fluorescence"].values.astype(float)
-                    diffs = np.diff(y)
-                    if len(diffs) == 0:
-                        break
-                    abs_thr, k, method = self._get_thresholds()
-                    disp = robust_mad_sigma(diffs) if method == "MAD" else (np.std(diffs, ddof=1) if len(diffs) > 1 else 0.0)
-                    i_star = int(np.argmax(np.abs(diffs)))
-                    maxjump = float(np.abs(diffs[i_star]))
-                    cond_abs = maxjump > abs_thr if abs_thr > 0 else False
-                    cond_k = (disp > 0) and (maxjump > k * disp) if k > 0 else False
-                    if not (cond_abs or cond_k):
-                        break
-
-                    # Map index in visible data to full dataframe index
-                    g_full = self.per_well_work[w].copy()
-                    # visible mask
-                    if w in self.trim_ranges:
-                        tmin, tmax = self.trim_ranges[w]
-                        mask = (g_full["Temperature"] >= tmin) & (g_full["Temperature"] <= tmax)
-                        idxs = np.where(mask)[0]
-                        if len(idxs) <= i_star:
-                            break
-                        full_idx = idxs[i_star]
-                    else:
-                        full_idx = i_star
-
-                    self._push_history(w)
-                    y_full = g_full["Fluorescence"].values.astype(float)
-                    delta = float(y_full[full_idx+1] - y_full[full_idx])
-                    adj = -delta if op in ("auto","sub") else +delta
-                    y_full[full_idx+1:] = y_full[full_idx+1:] + adj
-                    g_full["Fluorescence"] = y_full
-                    self.per_well_work[w] = g_full
-                    changed = True
-                    if not iterative:
-                        break
-            if changed:
-                corrected_now.append(w)
-
-        for w in corrected_now:
-            if w not in self.corrected_wells:
-                self.corrected_wells.append(w)
+                self.store.set_work(w, y_new)
+                self._mark_dirty(w)
+            applied[w] = (prev, len(steps), self.well_version.get(w, 0))
+            if steps and w == self.current_well:
+                self._request_draw()
+
+        def finish(job):
+            corrected_now = [w for w in todo if w in applied and applied[w][2] != version[w]]
+            for w in corrected_now:
+                if w not in self.corrected_wells:
+                    self.corrected_wells.append(w)
+                    self._queue_journal(w)  # el registro ya escrito al aplicar no lo tenía como corregido
+
+            self._refresh_well_labels(self._update_dirty_tm())
+            self._refresh_corrected_list()
+            self._scan_suspects()
+            self._update_undo_redo_state()
+            kept = f" ({len(skipped)} wells edited meanwhile were skipped)" if skipped else ""
+            self.status_var.set(f"Corrected {len(corrected_now)} wells. Remaining suspects: {len(self.suspected_wells)}{kept}")
+            self._draw_current()
+
+        def roll_back(job):
+            restored = kept = 0
+            for w, (prev, n_undo, ver) in reversed(list(applied.items())):
+                if self.well_version.get(w, 0) != ver:
+                    kept += 1           # el usuario ya lo ha vuelto a tocar: se queda como está
+                    continue
+                for _ in range(n_undo):
+                    self.undo_log.discard(w)
+                if ver != version[w]:
+                    self._restore_well_state(w, prev, animate=False)
+                    self._mark_dirty(w)
+                    restored += 1
+
+            self._refresh_well_labels(self._update_dirty_tm())
+            self._scan_suspects()
+            self._update_undo_redo_state()
+            if job.error is not None:
+                messagebox.showerror("Correction error", "Could not correct all suspects:\n" + str(job.error))
+            msg = f"Correct all cancelled: {restored} corrected wells rolled back."
+            self.status_var.set(msg + (f" {kept} edited meanwhile were kept." if kept else ""))
+            self._draw_current()
 
-        self._recompute_tm_all_wells()
-        self._refresh_all_wells_with_tm()
-        self._refresh_corrected_list()
-        self._scan_suspects()
-        self._update_undo_redo_state()
-        self.status_var.set(f"Corrected {len(corrected_now)} wells. Remaining suspects: {len(self.suspected_wells)}")
-        self._draw_current()
+        stream = self._get_executor().stream_wells(fn, jobs, *extra)
+        self._start_job(stream_job(stream, "Correcting suspects"), apply, finish, roll_back)
 
     # ------------------------ AUTO-TRIM TO EXPECTED RANGE ------------------------
     def _restore_main_focus(self):
@@ -1453,106 +1915,6 @@ class DSF_Harmonizer(tk.Tk):
         except Exception:
             pass
 
-    def _auto_trim_single_well(self, w, tm_lo, tm_hi):
-        """
-        Devuelve una propuesta de trimming para el pozo w:
-        - Sólo actúa si la Tm actual está fuera del rango [tm_lo, tm_hi].
-        - Quita puntos de un lado u otro, de uno en uno, hasta meter la Tm en el rango.
-        - Minimiza el número de puntos eliminados y respeta mínimo 3 puntos.
-        """
-        if w in self.deleted_wells:
-            return None
-
-        g = self._get_visible_df(w)
-        if g is None or len(g) < 3:
-            return None
-
-        x = g["Temperature"].values.astype(float)
-        y = g["Fluorescence"].values.astype(float)
-
-        tm0, _, _ = self._compute_tm_for_xy(x, y)
-        if tm0 is None or not np.isfinite(tm0):
-            return None
-
-        # Si ya está dentro del rango, no se toca
-        if tm_lo <= tm0 <= tm_hi:
-            return None
-
-        n = len(x)
-        left = 0
-        right = n - 1
-        removed_low = 0
-        removed_high = 0
-        tm_current = tm0
-
-        max_remove = n - 3  # mínimo 3 puntos
-
-        last_good = None
-        orig_min = float(x[0])
-        orig_max = float(x[-1])
-
-        while (removed_low + removed_high) < max_remove:
-            if tm_current is None or not np.isfinite(tm_current):
-                break
-            if tm_lo <= tm_current <= tm_hi:
-                last_good = (left, right, tm_current, removed_low, removed_high)
-                break
-
-            if tm_current < tm_lo:
-                # Tm demasiado baja -> quitar puntos por abajo
-                if left >= right:
-                    break
-                left += 1
-                removed_low += 1
-            elif tm_current > tm_hi:
-                # Tm demasiado alta -> quitar puntos por arriba
-                if right <= left:
-                    break
-                right -= 1
-                removed_high += 1
-            else:
-                # Ya estaría dentro, pero lo habríamos capturado arriba
-                break
-
-            if (right - left + 1) < 3:
-                break
-
-            x_seg = x[left:right+1]
-            y_seg = y[left:right+1]
-            tm_new, _, _ = self._compute_tm_for_xy(x_seg, y_seg)
-            tm_current = tm_new
-
-            if tm_current is not None and np.isfinite(tm_current) and tm_lo <= tm_current <= tm_hi:
-                last_good = (left, right, tm_current, removed_low, removed_high)
-                break
-
-        if last_good is None:
-            return None
-
-        left, right, tm_final, removed_low, removed_high = last_good
-        total_removed = removed_low + removed_high
-        if total_removed == 0:
-            return None
-
-        new_tmin = float(x[left])
-        new_tmax = float(x[right])
-
-        # grados eliminados por abajo y por arriba
-        deg_low = max(0.0, new_tmin - orig_min)
-        deg_high = max(0.0, orig_max - new_tmax)
-
-        return {
-            "tm_before": float(tm0),
-            "tm_after": float(tm_final),
-            "removed_low": int(removed_low),
-            "removed_high": int(removed_high),
-            "removed_total": int(total_removed),
-            "new_tmin": new_tmin,
-            "new_tmax": new_tmax,
-            "deg_low": float(deg_low),
-            "deg_high": float(deg_high),
-        }
-
     def _auto_trim_to_expected_range(self):
         """
         Botón 'Auto-trim to expected range' con diálogo tipo tabla y checkboxes.
@@ -1560,9 +1922,11 @@ class DSF_Harmonizer(tk.Tk):
         IMPORTANTE:
         - El Expected Tm range NO restringe el cálculo de Tm; sólo se usa para decidir el recorte.
         - Aquí sí metemos el auto-trim en el flujo de undo/redo:
-          * Antes de aplicar el recorte a un pozo, guardamos su estado en history (self._push_history).
-          * El recorte se hace sobre self.per_well_work[w], de modo que Undo/Redo lo pueda revertir.
+          * Antes de aplicar el recorte a un pozo, guardamos su estado en el undo log (self._push_history).
+          * El recorte es lógico (trim_ranges[w]), de modo que Undo/Redo lo pueda revertir.
         """
+        if self._job_busy():
+            return
         tm_win = self._get_tm_window()
         if tm_win is None:
             messagebox.showinfo(
@@ -1574,20 +1938,21 @@ class DSF_Harmonizer(tk.Tk):
         lo, hi = tm_win
 
         try:
-            changes = {}
+            jobs = []
             for w in self.wells:
                 if w in self.deleted_wells:
                     continue
-                res = self._auto_trim_single_well(w, lo, hi)
-                if res is not None:
-                    changes[w] = res
-
-            if not changes:
-                messagebox.showinfo(
-                    "Auto-trim",
-                    "No wells required trimming or no valid auto-trim solution was found."
-                )
-                return
+                xy = self._get_visible_xy(w)
+                if xy is not None and len(xy[0]) >= 3:
+                    # copias: las vistas del store se pueden modificar mientras el trabajo las lee
+                    jobs.append((w, (np.array(xy[0]), np.array(xy[1]))))
+            # Las propuestas se calculan en el backend elegido, desde un hilo aparte, y llegan
+            # por bloques: el diálogo se abre ya y va rellenando la tabla (orden de placa).
+            stream = stream_job(self._get_executor().stream_wells(
+                auto_trim_proposal, jobs, lo, hi, self._get_smoothing_for_derivative()
+            ), "Auto-trim").start()
+            plate_row = {w: r for r, (w, _) in enumerate(sorted(jobs, key=lambda j: self._well_sortkey(j[0])), start=1)}
+            changes = {}
 
             # ------- Crear diálogo con tabla + checkboxes -------
             dlg = tk.Toplevel(self)
@@ -1601,6 +1966,16 @@ class DSF_Harmonizer(tk.Tk):
             )
             ttk.Label(dlg, text=info_txt, justify="left").pack(fill=tk.X, padx=8, pady=(8, 4))
 
+            # ---------- Progreso del cálculo ----------
+            prog_frame = ttk.Frame(dlg)
+            prog_frame.pack(fill=tk.X, padx=8, pady=(0, 4))
+            progress = ttk.Progressbar(prog_frame, mode="determinate", maximum=max(1, stream.total))
+            progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
+            progress_var = tk.StringVar(value=f"Computing proposals… 0 / {stream.total} wells")
+            ttk.Label(prog_frame, textvariable=progress_var, width=36).pack(side=tk.LEFT, padx=(6, 4))
+            stop_btn = ttk.Button(prog_frame, text="Cancel remaining")
+            stop_btn.pack(side=tk.LEFT)
+
             container = ttk.Frame(dlg)
             container.pack(fill=tk.BOTH, expand=True, padx=8, pady=4)
 
@@ -1632,11 +2007,11 @@ class DSF_Harmonizer(tk.Tk):
                 lbl = ttk.Label(inner, text=h, font=("TkDefaultFont", 9, "bold"))
                 lbl.grid(row=0, column=col, padx=4, pady=2, sticky="w")
 
-            # ---------- Filas por pozo ----------
+            # ---------- Filas por pozo (en su fila de placa; las vacías no ocupan sitio) ----------
             check_vars = {}
-            sorted_wells = sorted(changes.keys(), key=self._well_sortkey)
-            for r, w in enumerate(sorted_wells, start=1):
-                res = changes[w]
+
+            def add_row(w, res):
+                r = plate_row[w]
                 var = tk.BooleanVar(value=True)
                 check_vars[w] = var
 
@@ -1665,6 +2040,49 @@ class DSF_Harmonizer(tk.Tk):
                 txt_dtm = f"{dtm:+.2f}" if dtm is not None else "n/a"
                 ttk.Label(inner, text=txt_dtm).grid(row=r, column=6, padx=4, pady=2, sticky="w")
 
+            def close_dialog():
+                stream.cancel()
+                try:
+                    dlg.grab_release()
+                except Exception:
+                    pass
+                dlg.destroy()
+                self._restore_main_focus()
+
+            def on_stream_end():
+                stop_btn.config(state="disabled")
+                n = len(changes)
+                if stream.cancelled:
+                    progress_var.set(f"Cancelled: {stream.done} / {stream.total} wells, {n} proposals")
+                else:
+                    progress_var.set(f"Done: {n} proposals")
+                if not changes and not stream.cancelled:
+                    close_dialog()
+                    messagebox.showinfo(
+                        "Auto-trim",
+                        "No wells required trimming or no valid auto-trim solution was found."
+                    )
+
+            def poll_stream():
+                if not dlg.winfo_exists() or stream.cancelled:
+                    return
+                for w, res in stream.poll():
+                    if res is not None:
+                        changes[w] = res
+                        add_row(w, res)
+                progress["value"] = stream.done
+                progress_var.set(f"Computing proposals… {stream.done} / {stream.total} wells")
+                if stream.finished:
+                    on_stream_end()
+                else:
+                    dlg.after(30, poll_stream)
+
+            def on_stop():
+                stream.cancel()
+                on_stream_end()
+
+            stop_btn.config(command=on_stop)
+
             # ---------- Botones inferior ----------
             btn_frame = ttk.Frame(dlg)
             btn_frame.pack(fill=tk.X, padx=8, pady=(4, 8))
@@ -1678,8 +2096,10 @@ class DSF_Harmonizer(tk.Tk):
                     v.set(True)
 
             def on_apply():
+                # Lo que quede por calcular se descarta; las propuestas ya listas se pueden aplicar
+                stream.cancel()
                 applied = 0
-                for w in sorted_wells:
+                for w in sorted(changes, key=self._well_sortkey):
                     if not check_vars[w].get():
                         continue
 
@@ -1687,8 +2107,7 @@ class DSF_Harmonizer(tk.Tk):
                     tmin_new = float(res.get("new_tmin"))
                     tmax_new = float(res.get("new_tmax"))
                     
-                    g_full = self.per_well_work[w].copy().sort_values("Temperature").reset_index(drop=True)
-                    x_full = g_full["Temperature"].values.astype(float)
+                    x_full = self.store.temp(w)
                     
                     mask = (x_full >= tmin_new) & (x_full <= tmax_new)
                     if mask.sum() < 3:
@@ -1697,7 +2116,7 @@ class DSF_Harmonizer(tk.Tk):
                     # Guardar estado anterior (DF + trim + flag auto-trim) para Undo/Redo
                     self._push_history(w)
                     
-                    # 🔹 NO tocamos per_well_work: mantenemos todos los puntos
+                    # 🔹 NO tocamos la curva de trabajo: mantenemos todos los puntos
                     # Solo guardamos el rango de análisis como trimming lógico
                     self.trim_ranges[w] = (tmin_new, tmax_new)
                     
@@ -1707,13 +2126,11 @@ class DSF_Harmonizer(tk.Tk):
                     if w not in self.corrected_wells:
                         self.corrected_wells.append(w)
                     
-                    # Invalidar cache de Tm para este pozo
-                    self._tm_cache.pop(w, None)
+                    self._mark_dirty(w)
                     applied += 1
 
                 if applied > 0:
-                    self._recompute_tm_all_wells()
-                    self._refresh_all_wells_with_tm()
+                    self._refresh_well_labels(self._update_dirty_tm())
                     self._refresh_corrected_list()
                     self._refresh_suspected_list()
                 
@@ -1727,22 +2144,12 @@ class DSF_Harmonizer(tk.Tk):
                     self.status_var.set("Auto-trim: no changes applied.")
 
                 # 🔹 SOLUCIÓN: liberar el grab y devolver foco a la ventana principal
-                try:
-                    dlg.grab_release()
-                except Exception:
-                    pass
-                dlg.destroy()
-                self._restore_main_focus()
+                close_dialog()
 
             def on_cancel():
                 self.status_var.set("Auto-trim cancelled.")
-                # 🔹 Igual que en apply: liberar grab, destruir y restaurar foco
-                try:
-                    dlg.grab_release()
-                except Exception:
-                    pass
-                dlg.destroy()
-                self._restore_main_focus()
+                # 🔹 Igual que en apply: parar el cálculo, liberar grab, destruir y restaurar foco
+                close_dialog()
 
             ttk.Button(btn_frame, text="Select none", command=on_select_none).pack(side=tk.LEFT, padx=(0, 4))
             ttk.Button(btn_frame, text="Select all", command=on_select_all).pack(side=tk.LEFT, padx=(0, 4))
@@ -1751,6 +2158,8 @@ class DSF_Harmonizer(tk.Tk):
 
             dlg.bind("<Return>", lambda e: on_apply())
             dlg.bind("<Escape>", lambda e: on_cancel())
+            dlg.protocol("WM_DELETE_WINDOW", on_cancel)
+            poll_stream()
 
         finally:
             # Aseguramos que los entries se quedan normales
@@ -1777,6 +2186,7 @@ class DSF_Harmonizer(tk.Tk):
         sel = self.well_list.curselection()
         if not sel:
             self.current_well = None
+            self.plate_map.mark(None)
             self._clear_plot()
             self.apply_btn.config(state="disabled")
             self.undo_btn.config(state="disabled")
@@ -1786,11 +2196,9 @@ class DSF_Harmonizer(tk.Tk):
         label = self.well_list.get(sel[0])
         w = self._parse_well_label_to_name(label)
         self.current_well = w
+        self.plate_map.mark(w)
 
-        g_work = self.per_well_work[w].sort_values("Temperature").reset_index(drop=True)
-        self.per_well_work[w] = g_work
-
-        n = len(g_work)
+        n = self.store.n_points(w)
         if n < 2:
             self.idx_slider.configure(from_=0, to=0)
             self.idx_slider.set(0)
@@ -1810,8 +2218,7 @@ class DSF_Harmonizer(tk.Tk):
         self.idx_entry.insert(0, str(int(round(self.idx_slider.get()))))
 
         self._init_t_range_for_well()
-        self._update_selected_idx_label()
-        self._draw_current()
+        self._request_draw()
         self._update_undo_redo_state()
 
     def _on_select_corrected(self, event=None):
@@ -1871,8 +2278,7 @@ class DSF_Harmonizer(tk.Tk):
         self.selected_idx = i
         self.idx_entry.delete(0, tk.END)
         self.idx_entry.insert(0, str(i))
-        self._update_selected_idx_label()
-        self._draw_current()
+        self._request_draw(cursor_only=True)
 
     def _nudge_index(self, step):
         if self.current_well is None:
@@ -1886,8 +2292,7 @@ class DSF_Harmonizer(tk.Tk):
         self.selected_idx = i
         self.idx_entry.delete(0, tk.END)
         self.idx_entry.insert(0, str(i))
-        self._update_selected_idx_label()
-        self._draw_current()
+        self._request_draw(cursor_only=True)
 
     def _move_well_selection(self, step):
         """Mueve la selección en la lista de All wells con las flechas ↑ / ↓."""
@@ -1917,142 +2322,127 @@ class DSF_Harmonizer(tk.Tk):
         i = self._clamp_index(i)
         self.idx_slider.set(i)
         self.selected_idx = i
-        self._update_selected_idx_label()
-        self._draw_current()
+        self._request_draw(cursor_only=True)
 
     def _on_plot_click(self, event):
         if self.current_well is None or event.xdata is None:
             return
-        g = self.per_well_work[self.current_well].sort_values("Temperature").reset_index(drop=True)
-        x = g["Temperature"].values
+        x = self.store.temp(self.current_well)
         i = int(np.argmin(np.abs(x - event.xdata)))
         i = self._clamp_index(i)
         self.idx_slider.set(i)
         self.selected_idx = i
-        self._update_selected_idx_label()
-        self._draw_current()
+        self._request_draw(cursor_only=True)
 
     # ------------------------ correction / undo / redo / animation ------------------------
+    def _well_state(self, well):
+        """Estado deshacible del pozo: curva (SparseSteps), trim_ranges[well] y flag de auto-trim."""
+        return WellState(self.store.get_steps(well), self.trim_ranges.get(well, None),
+                         well in self.auto_trimmed_wells)
+
     def _push_history(self, well):
         """
         Guarda en la pila de undo el estado actual del pozo:
-        - DataFrame de trabajo (per_well_work[well])
+        - curva de fluorescencia de trabajo, como saltos (índice, offset) sobre la original
         - trim_ranges[well] (o None si no tiene)
         - flag de auto_trim (si el pozo está en auto_trimmed_wells)
-        Y limpia las pilas de redo correspondientes.
+        Y limpia el redo del pozo (al hacer un cambio nuevo, el redo previo ya no tiene sentido).
         """
-        if not well or well not in self.per_well_work:
-            return
-
-        # Aseguramos estructuras
-        if well not in self.history:
-            self.history[well] = []
-        if well not in self.redo_history:
-            self.redo_history[well] = []
-        if well not in self.trim_history:
-            self.trim_history[well] = []
-        if well not in self.trim_redo:
-            self.trim_redo[well] = []
-        if well not in self.auto_trim_history:
-            self.auto_trim_history[well] = []
-        if well not in self.auto_trim_redo:
-            self.auto_trim_redo[well] = []
-
-        # Guardar snapshot del DF de trabajo
-        self.history[well].append(self.per_well_work[well].copy())
-        # Guardar snapshot del trimming actual (o None)
-        self.trim_history[well].append(self.trim_ranges.get(well, None))
-        # Guardar si estaba auto-trimmeado
-        self.auto_trim_history[well].append(well in self.auto_trimmed_wells)
-
-        # Borrar las pilas de redo (al hacer un cambio nuevo, el redo previo ya no tiene sentido)
-        self.redo_history[well].clear()
-        self.trim_redo[well].clear()
-        self.auto_trim_redo[well].clear()
-
-    def _animate_transition(self, x, y_from, y_to, steps=12, duration_ms=240):
-        if not self.animate_var.get():
+        if not well or self.store is None or well not in self.store:
             return
-        steps = max(3, int(steps))
-        delay = max(10, int(duration_ms // steps))
-        for k in range(1, steps + 1):
-            alpha = k / steps
-            yk = y_from * (1 - alpha) + y_to * alpha
-            self._draw_current_override(x, yk)
-            self.update_idletasks()
-            self.after(delay)
+        self.undo_log.push(well, self._well_state(well))
 
-    def _draw_current_override(self, x_override, y_override):
-        self.ax.clear()
-        self.axd.clear()
-        w = self.current_well
-        if w is None:
-            self.canvas.draw_idle()
-            return
-        g0 = self.per_well_orig[w]
-        x0, y0 = g0["Temperature"].values, g0["Fluorescence"].values
-        self.ax.plot(x0, y0, alpha=0.4, linewidth=1, label="Original")
+    def _restore_well_state(self, w, state, animate=True):
+        """Aplica un WellState de undo/redo (con animación si las longitudes coinciden)."""
+        y_new = state.steps.decode(self.store.orig(w))
 
-        # visible / trimmed data
-        g_vis = self._get_visible_df(w)
-        x_vis = g_vis["Temperature"].values
-        y_plot = self._maybe_smooth(y_override)
-        self.ax.plot(x_vis, y_plot, linewidth=1.6, label="Corrected")
+        # Animación SEGURA (solo si longitudes coinciden)
+        if animate and self.animate_var.get():
+            x_cur = self.store.temp(w)
+            y_from = self.store.work(w).copy()
+            if y_from.shape == y_new.shape:
+                self._animate_transition(x_cur, y_from, y_new)
 
-        tm, xd, dplot = self._compute_tm(w)
+        # Restaurar curva
+        self.store.set_work(w, y_new)
 
-        if tm is not None:
-            self.ax.axvline(tm, linestyle=":", alpha=0.4)
-        if self.show_deriv_var.get() and (xd is not None) and (dplot is not None):
-            self.axd.plot(xd, dplot, linewidth=1)
-            if tm is not None:
-                self.axd.axvline(tm, linestyle=":", alpha=0.8)
+        # Restaurar trimming
+        if state.trim is None:
+            self.trim_ranges.pop(w, None)
+        else:
+            self.trim_ranges[w] = state.trim
 
-        tmin, tmax = self._get_current_t_range()
-        if tmin is not None and tmax is not None and tmin < tmax:
-            self.ax.axvline(tmin, linestyle="--", alpha=0.3)
-            self.ax.axvline(tmax, linestyle="--", alpha=0.3)
-            self.axd.axvline(tmin, linestyle="--", alpha=0.3)
-            self.axd.axvline(tmax, linestyle="--", alpha=0.3)
-
-        if tm is not None and np.isfinite(tm):
-            is_out = (w in self.tm_outlier_wells)
-            txt_color = "#b00000" if is_out else "#111111"
-            self.ax.text(
-                0.02,
-                0.95,
-                f"Tm = {tm:.2f} °C",
-                transform=self.ax.transAxes,
-                ha="left",
-                va="top",
-                fontsize=10,
-                color=txt_color,
-                bbox=dict(boxstyle="round,pad=0.25", fc="#ffffff", ec="none", alpha=0.75),
-            )
+        # Restaurar flag de auto-trim
+        if state.auto_trimmed:
+            self.auto_trimmed_wells.add(w)
+        else:
+            self.auto_trimmed_wells.discard(w)
 
-        self.ax.set_ylabel("Fluorescence")
-        self.axd.set_xlabel("Temperature")
-        self.axd.set_ylabel("-dF/dT (oriented up)")
-        self.ax.legend(loc="upper right")
-        self.canvas.draw_idle()
+    def _animate_transition(self, x, y_from, y_to, duration_ms=240):
+        """Start (or restart) the correction animation; frames run from the Tk loop.
+        x / y_* are full curves: each frame shows the visible (trimmed) part, like the
+        static line, and the final state is drawn once the animation ends."""
+        if not self.animate_var.get():
+            return
+        self._stop_animation(redraw=False)
+        self._anim = {"well": self.current_well, "x": x, "y_from": y_from, "y_to": y_to,
+                      "t0": None, "duration": max(0.001, duration_ms / 1000.0)}
+        self.plot.start_transition()
+        self._anim_job = self.after(ANIM_FRAME_MS, self._animation_frame)
+
+    def _animation_frame(self):
+        self._anim_job = None
+        a = self._anim
+        if a is None:
+            return
+        w = self.current_well
+        if w != a["well"] or w is None or w in self.deleted_wells:
+            self._stop_animation()          # otro pozo / pozo eliminado: se corta
+            return
+        # el progreso sale del reloj: si el dibujo va lento se saltan frames, no se alarga
+        now = time.monotonic()
+        if a["t0"] is None:
+            a["t0"] = now
+        alpha = min(1.0, (now - a["t0"]) / a["duration"])
+        if alpha >= 1.0:
+            self._stop_animation()
+            return
+        # el mismo tramo que la línea estática (el trim puede cambiar con undo/redo)
+        sl = self.store.visible_slice(w, self.trim_ranges.get(w))
+        yk = a["y_from"][sl] * (1 - alpha) + a["y_to"][sl] * alpha
+        self.plot.transition_frame((a["x"][sl], self._maybe_smooth(yk)))
+        self._anim_job = self.after(ANIM_FRAME_MS, self._animation_frame)
+
+    def _stop_animation(self, redraw=True):
+        """End the running animation (if any) and show the current state."""
+        if self._anim_job is not None:
+            self.after_cancel(self._anim_job)
+            self._anim_job = None
+        if self._anim is None:
+            return
+        self._anim = None
+        self.plot.end_transition()
+        if redraw:
+            self._draw_current()
 
     def _apply_correction(self):
         if self.current_well is None or self.current_well in self.deleted_wells:
             return
-        g_full = self.per_well_work[self.current_well].copy()
-        n = len(g_full)
+        x_full = self.store.temp(self.current_well)
+        n = len(x_full)
         if n < 2:
             return
         i = self._clamp_index(int(round(self.idx_slider.get())))
-        y_full = g_full["Fluorescence"].values.astype(float)
+        y_full = self.store.work(self.current_well).copy()
 
-        if self.multi_jump_var.get():
+        engine = self.engine_var.get()
+        if engine in CURVE_ENGINES:
             self._push_history(self.current_well)
-            y_from = y_full.copy()
-            changed = self._apply_multi_jump(self.current_well, iterative=self.iterative_var.get())
-            y_to = self.per_well_work[self.current_well]["Fluorescence"].values.astype(float)
+            y_from = y_full
+            changed = self._apply_multi_jump(self.current_well, iterative=self.iterative_var.get(), engine=engine)
+            y_to = self.store.work(self.current_well)
             if changed and self.animate_var.get():
-                self._animate_transition(g_full["Temperature"].values, y_from, y_to)
+                self._animate_transition(x_full, y_from, y_to)
         else:
             diffs = np.diff(y_full)
             if len(diffs) == 0:
@@ -2063,20 +2453,17 @@ class DSF_Harmonizer(tk.Tk):
             self._push_history(self.current_well)
             y_from = y_full.copy()
             y_full[i + 1 :] = y_full[i + 1 :] + adj
-            g_full["Fluorescence"] = y_full
-            self.per_well_work[self.current_well] = g_full
+            self.store.set_work(self.current_well, y_full)
+            self._mark_dirty(self.current_well)
             if self.animate_var.get():
-                self._animate_transition(g_full["Temperature"].values, y_from, y_full)
+                self._animate_transition(x_full, y_from, y_full)
 
         if self.current_well not in self.corrected_wells:
             self.corrected_wells.append(self.current_well)
         if self.current_well in self.suspected_wells:
             self.suspected_wells.remove(self.current_well)
 
-        # Invalidar cache de Tm para este pozo
-        self._tm_cache.pop(self.current_well, None)
-        self._recompute_tm_all_wells()
-        self._refresh_all_wells_with_tm()
+        self._refresh_well_labels(self._update_dirty_tm())
         self._refresh_corrected_list()
         self._refresh_suspected_list()
         self._update_undo_redo_state()
@@ -2085,67 +2472,19 @@ class DSF_Harmonizer(tk.Tk):
 
     def _undo_current_well(self):
         w = self.current_well
-        if not w or w not in self.history or not self.history[w]:
-            return
-
-        # Asegurar estructuras de redo para este pozo
-        if w not in self.redo_history:
-            self.redo_history[w] = []
-        if w not in self.trim_redo:
-            self.trim_redo[w] = []
-        if w not in self.auto_trim_redo:
-            self.auto_trim_redo[w] = []
-
-        # Guardar estado actual en redo
-        self.redo_history[w].append(self.per_well_work[w].copy())
-        self.trim_redo[w].append(self.trim_ranges.get(w, None))
-        self.auto_trim_redo[w].append(w in self.auto_trimmed_wells)
-
-        # Recuperar último estado de undo
-        prev_df = self.history[w].pop()
-        prev_trim = None
-        if w in self.trim_history and self.trim_history[w]:
-            prev_trim = self.trim_history[w].pop()
-        prev_auto_flag = None
-        if w in self.auto_trim_history and self.auto_trim_history[w]:
-            prev_auto_flag = self.auto_trim_history[w].pop()
-
-        # Animación SEGURA (solo si longitudes coinciden)
-        if self.animate_var.get():
-            x_cur = self.per_well_work[w]["Temperature"].values
-            y_from = self.per_well_work[w]["Fluorescence"].values.astype(float)
-            y_to = prev_df["Fluorescence"].values.astype(float)
-            if y_from.shape == y_to.shape:
-                self._animate_transition(x_cur, y_from, y_to)
-
-        # Restaurar DF
-        self.per_well_work[w] = prev_df
-
-        # Restaurar trimming
-        if prev_trim is None:
-            self.trim_ranges.pop(w, None)
-        else:
-            self.trim_ranges[w] = prev_trim
+        if not w or not self.undo_log.can_undo(w):
+            return
 
-        # Restaurar flag de auto-trim
-        if prev_auto_flag is not None:
-            if prev_auto_flag:
-                self.auto_trimmed_wells.add(w)
-            else:
-                self.auto_trimmed_wells.discard(w)
+        # El estado actual pasa a redo y recuperamos el último de undo
+        self._restore_well_state(w, self.undo_log.undo(w, self._well_state(w)))
 
-        # Ver si el DF es igual al original -> sacar de corrected_wells
-        try:
-            is_original = prev_df.equals(self.per_well_orig[w])
-        except Exception:
-            is_original = False
+        # Ver si la curva es igual a la original -> sacar de corrected_wells
+        is_original = self.store.is_original(w)
         if is_original and w in self.corrected_wells:
             self.corrected_wells.remove(w)
 
-        # Invalidar cache de Tm para este pozo y refrescar todo
-        self._tm_cache.pop(w, None)
-        self._recompute_tm_all_wells()
-        self._refresh_all_wells_with_tm()
+        self._mark_dirty(w)
+        self._refresh_well_labels(self._update_dirty_tm())
         self._refresh_corrected_list()
         self._scan_suspects()
         self._update_undo_redo_state()
@@ -2154,60 +2493,14 @@ class DSF_Harmonizer(tk.Tk):
 
     def _redo_current_well(self):
         w = self.current_well
-        if not w or w not in self.redo_history or not self.redo_history[w]:
-            return
-
-        # Asegurar estructuras de undo para este pozo
-        if w not in self.history:
-            self.history[w] = []
-        if w not in self.trim_history:
-            self.trim_history[w] = []
-        if w not in self.auto_trim_history:
-            self.auto_trim_history[w] = []
-
-        # Guardar estado actual en undo
-        self.history[w].append(self.per_well_work[w].copy())
-        self.trim_history[w].append(self.trim_ranges.get(w, None))
-        self.auto_trim_history[w].append(w in self.auto_trimmed_wells)
-
-        # Recuperar estado desde redo
-        next_df = self.redo_history[w].pop()
-        next_trim = None
-        if w in self.trim_redo and self.trim_redo[w]:
-            next_trim = self.trim_redo[w].pop()
-        next_auto_flag = None
-        if w in self.auto_trim_redo and self.auto_trim_redo[w]:
-            next_auto_flag = self.auto_trim_redo[w].pop()
-
-        # Animación SEGURA (solo si longitudes coinciden)
-        if self.animate_var.get():
-            x_cur = self.per_well_work[w]["Temperature"].values
-            y_from = self.per_well_work[w]["Fluorescence"].values.astype(float)
-            y_to = next_df["Fluorescence"].values.astype(float)
-            if y_from.shape == y_to.shape:
-                self._animate_transition(x_cur, y_from, y_to)
-
-        # Restaurar DF
-        self.per_well_work[w] = next_df
+        if not w or not self.undo_log.can_redo(w):
+            return
 
-        # Restaurar trimming
-        if next_trim is None:
-            self.trim_ranges.pop(w, None)
-        else:
-            self.trim_ranges[w] = next_trim
-
-        # Restaurar flag de auto-trim
-        if next_auto_flag is not None:
-            if next_auto_flag:
-                self.auto_trimmed_wells.add(w)
-            else:
-                self.auto_trimmed_wells.discard(w)
+        # El estado actual vuelve a undo y recuperamos el de redo
+        self._restore_well_state(w, self.undo_log.redo(w, self._well_state(w)))
 
         # Si hay redo es que ha habido alguna corrección -> aseguramos que está en corrected
-        try:
-            is_original = next_df.equals(self.per_well_orig[w])
-        except Exception:
-            is_original = False
+        is_original = self.store.is_original(w)
         if is_original:
             if w in self.corrected_wells:
                 self.corrected_wells.remove(w)
@@ -2215,10 +2508,8 @@ class DSF_Harmonizer(tk.Tk):
             if w not in self.corrected_wells:
                 self.corrected_wells.append(w)
 
-        # Invalidar cache de Tm para este pozo y refrescar todo
-        self._tm_cache.pop(w, None)
-        self._recompute_tm_all_wells()
-        self._refresh_all_wells_with_tm()
+        self._mark_dirty(w)
+        self._refresh_well_labels(self._update_dirty_tm())
         self._refresh_corrected_list()
         self._scan_suspects()
         self._update_undo_redo_state()
@@ -2228,83 +2519,99 @@ class DSF_Harmonizer(tk.Tk):
 
     # ------------------------ plotting & Tm ------------------------
     def _clear_plot(self):
-        self.ax.clear()
-        self.axd.clear()
-        self.canvas.draw_idle()
+        self.plot.clear()
 
-    def _draw_current(self):
-        self.ax.clear()
-        self.axd.clear()
+    def _cursor_index(self, n):
+        i = self._clamp_index(int(round(self.idx_slider.get())))
+        return max(0, min(i, n - 1))
 
-        if self.current_well is None:
-            self.canvas.draw_idle()
-            return
+    def _request_draw(self, cursor_only=False, before=None):
+        """Mark the view dirty. Requests are coalesced into at most one render per
+        RENDER_FRAME_MS; `before` (e.g. a plate-wide Tm update) runs once before it."""
+        if cursor_only:
+            self._render_cursor = True
+        else:
+            self._render_full = True
+        if before is not None and before not in self._render_before:
+            self._render_before.append(before)
+        if self._render_job is None:
+            wait = RENDER_FRAME_MS - (time.monotonic() - self._last_render) * 1000.0
+            self._render_job = self.after(max(0, int(wait)), self._render)
+
+    def _render(self):
+        self._render_job = None
+        tasks, self._render_before = self._render_before, []
+        for fn in tasks:
+            fn()
+        if self._render_full or tasks:
+            self._draw_current()
+        elif self._render_cursor:
+            self._update_selected_idx_label(cursor_only=True)
+            self._draw_cursor()
+        self._render_cursor = False
+        self._last_render = time.monotonic()
 
-        g0 = self.per_well_orig[self.current_well]
-        x0, y0 = g0["Temperature"].values, g0["Fluorescence"].values
-        self.ax.plot(x0, y0, alpha=0.5, linewidth=1, label="Original")
+    def _draw_current(self):
+        self._render_full = self._render_cursor = False    # lo pendiente queda cubierto
+        w = self.current_well
+        if w is None:
+            self.plot.clear()
+            return
+        if self._anim is not None and self._anim["well"] == w:
+            return      # la animación termina con un _draw_current; dibujar ya mostraría el estado final
 
+        corrected = deriv = tm = cursor = None
+        live = w not in self.deleted_wells
         # Si NO está eliminado, dibujar el trazo corregido
-        if self.current_well not in self.deleted_wells:
-            g1 = self._get_visible_df(self.current_well)
-            x1, y1 = g1["Temperature"].values, g1["Fluorescence"].values
-            y1_plot = self._maybe_smooth(y1)
-            self.ax.plot(x1, y1_plot, linewidth=1.6, label="Corrected")
-
+        if live:
+            x1, y1 = self._get_visible_xy(w)
+            corrected = (x1, self._maybe_smooth(y1))
             if len(x1) >= 2:
-                i = self._clamp_index(int(round(self.idx_slider.get())))
-                i = max(0, min(i, len(x1) - 1))
-                self.ax.axvline(x1[i], linestyle="--", alpha=0.6)
-                y_marker = y1_plot[i] if i < len(y1_plot) else y1[i]
-                self.ax.scatter([x1[i]], [y_marker], s=40, zorder=5, label=f"i={i}")
-
-        tm, xd, dplot = (None, None, None)
-        if self.show_deriv_var.get() and self.current_well not in self.deleted_wells:
-            tm, xd, dplot = self._compute_tm(self.current_well)
+                cursor = self._cursor_index(len(x1))
+
+        show_d = self.show_deriv_var.get() and live
+        if show_d:
+            tm, xd, dplot = self._compute_tm(w)
             if xd is not None and dplot is not None:
-                self.axd.plot(xd, dplot, linewidth=1)
-            if tm is not None:
-                self.axd.axvline(tm, linestyle=":", alpha=0.8)
-                self.ax.axvline(tm, linestyle=":", alpha=0.4)
+                deriv = (xd, dplot)
 
-        tmin, tmax = self._get_current_t_range()
-        if tmin is not None and tmax is not None and tmin < tmax:
-            self.ax.axvline(tmin, linestyle="--", alpha=0.3)
-            self.ax.axvline(tmax, linestyle="--", alpha=0.3)
-            if self.show_deriv_var.get() and self.current_well not in self.deleted_wells:
-                self.axd.axvline(tmin, linestyle="--", alpha=0.3)
-                self.axd.axvline(tmax, linestyle="--", alpha=0.3)
-
-        if tm is not None and np.isfinite(tm):
+        self.plot.update(
+            (self.store.temp(w), self.store.orig(w)),
+            corrected=corrected, deriv=deriv, tm=tm, t_range=self._get_current_t_range(),
+            range_on_deriv=show_d, cursor=cursor,
             # Tm en rojo si el pozo actual es outlier y no está eliminado
-            is_out = (self.current_well in self.tm_outlier_wells)
-            txt_color = "#b00000" if is_out else "#111111"
-            self.ax.text(
-                0.02,
-                0.95,
-                f"Tm = {tm:.2f} °C",
-                transform=self.ax.transAxes,
-                ha="left",
-                va="top",
-                fontsize=10,
-                color=txt_color,
-                bbox=dict(boxstyle="round,pad=0.25", fc="#ffffff", ec="none", alpha=0.75),
-            )
-
-        self.ax.set_ylabel("Fluorescence")
-        self.axd.set_xlabel("Temperature")
-        self.axd.set_ylabel("-dF/dT (oriented up)")
-        self.ax.legend(loc="upper right")
-        self.canvas.draw_idle()
+            tm_color="#b00000" if w in self.tm_outlier_wells else "#111111",
+            # las trazas diezmadas se reutilizan mientras no cambie el pozo / sus datos
+            keys={"orig": w,
+                  "corrected": (w, self.well_version.get(w, 0), self.trim_ranges.get(w),
+                                self.smooth_on_var.get() and self._get_smooth_strength()),
+                  "deriv": self._tm_key(w)},
+        )
         self._update_undo_redo_state()
         self._update_selected_idx_label()
 
-    def _update_selected_idx_label(self):
-        if self.current_well is None:
+    def _draw_cursor(self):
+        """Only the breakpoint index changed: move the cursor (blitted), keep the rest."""
+        n = self.plot.cursor_span
+        if self.current_well is None or n < 2:
+            return
+        self.plot.move_cursor(self._cursor_index(n))
+
+    def _update_selected_idx_label(self, cursor_only=False):
+        """Index/Temp/Tm label. With cursor_only the curve and Tm of the last full update
+        are reused (the derivative is not touched when only the index moved)."""
+        w = self.current_well
+        if w is None:
+            self._idx_view = None
             self.idx_label.config(text="Index: –/–   |   Temp: –   |   Tm: –")
             return
-        g = self._get_visible_df(self.current_well)
-        n = len(g)
+        view = self._idx_view
+        if not cursor_only or view is None or view[0] != w:
+            x, _ = self._get_visible_xy(w)
+            tm_val = self._compute_tm(w)[0] if w not in self.deleted_wells and len(x) >= 2 else None
+            view = self._idx_view = (w, x, f"{tm_val:.2f} °C" if tm_val is not None else "–")
+        _, x, tm_txt = view
+        n = len(x)
         if n < 2:
             self.idx_label.config(text="(Curve too short)")
             return
@@ -2313,9 +2620,7 @@ class DSF_Harmonizer(tk.Tk):
         except Exception:
             i = 0
         i = max(0, min(i, n - 1))
-        t = g.loc[i, "Temperature"]
-        tm_val = self._compute_tm(self.current_well)[0] if self.current_well not in self.deleted_wells else None
-        tm_txt = f"{tm_val:.2f} °C" if tm_val is not None else "–"
+        t = x[i]
         self.idx_label.config(text=f"Index: {i}/{n-2}   |   Temp: {t:.2f} °C   |   Tm: {tm_txt}")
 
     # ------------------------ Delete / Recover well ------------------------
@@ -2343,17 +2648,15 @@ class DSF_Harmonizer(tk.Tk):
         if not w:
             messagebox.showinfo("No well selected", "Select a well in any list first.")
             return
-        if w not in self.per_well_work:
+        if self.store is None or w not in self.store:
             messagebox.showinfo("Unknown well", f"Well {w} not found.")
             return
 
         self.deleted_wells.add(w)  # Marcar como eliminado
         self.status_var.set(f"{w}: well deleted (will not be exported).")
 
-        # Invalidar caché y recalcular
-        self._tm_cache.clear()
-        self._recompute_tm_all_wells()
-        self._refresh_all_wells_with_tm()
+        self._mark_dirty(w)
+        self._refresh_well_labels(self._update_dirty_tm())
         self._refresh_corrected_list()
         self._refresh_suspected_list()
         self._draw_current()
@@ -2370,10 +2673,8 @@ class DSF_Harmonizer(tk.Tk):
         self.deleted_wells.remove(w)  # Recuperar
         self.status_var.set(f"{w}: well recovered.")
 
-        # Recalcular todo
-        self._tm_cache.clear()
-        self._recompute_tm_all_wells()
-        self._refresh_all_wells_with_tm()
+        self._mark_dirty(w)
+        self._refresh_well_labels(self._update_dirty_tm())
         self._refresh_corrected_list()
         self._refresh_suspected_list()
         self._draw_current()
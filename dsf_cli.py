@@ -0,0 +1,302 @@
+# Modo batch (sin tkinter) para procesar muchas placas .gdsf de una vez:
+#
+#   > > > python3 dsf_cli.py batch *.gdsf --kdisp 6 --disp MAD --tm-range 50 65 -j 8 < < <
+#
+# Para cada placa: scan suspects -> correct -> Tm (-> auto-trim) -> 3 exports.
+#
+# Y en línea, mientras el instrumento escribe la rampa (ver dsf_stream.py):
+#
+#   > > > python3 dsf_cli.py watch run.gdsf --follow --wells 384 --abort-fraction 0.3 < < <
+
+import sys
+import os
+import time
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dsf_core import (
+    derivative_strength, compute_tm_batch, scan_from_stats, single_jump_steps,
+    ENGINES, CURVE_ENGINES, auto_trim_proposal, build_corrected_df, build_smoothed_df, build_tm_table,
+)
+from dsf_io import open_plate, write_gdsf, write_tm_table
+from dsf_exec import BACKENDS, WellExecutor
+from dsf_stream import PlateMonitor, follow_gdsf
+
+
+def expand_inputs(patterns):
+    """Expand globs (for shells that do not) and drop duplicates, keeping order."""
+    paths, seen = [], set()
+    for pat in patterns:
+        matches = sorted(glob.glob(pat)) if glob.has_magic(pat) else [pat]
+        for p in matches:
+            if p not in seen:
+                seen.add(p)
+                paths.append(p)
+    return paths
+
+
+def output_paths(path, outdir=None):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    folder = outdir or os.path.dirname(os.path.abspath(path))
+    return {
+        "corrected": os.path.join(folder, f"{stem}_corrected.gdsf"),
+        "smoothed": os.path.join(folder, f"{stem}_corrected_smoothed.gdsf"),
+        "tm_table": os.path.join(folder, f"{stem}_tm.tsv"),
+    }
+
+
+def process_plate(path, params):
+    """Run scan -> correct -> Tm -> (auto-trim) -> export for one plate.
+    params is a plain dict (see _params_from_args) so it can cross process boundaries.
+    Per-well work runs on the params["backend"] executor. Returns a summary dict.
+    """
+    with WellExecutor(params["backend"], params["workers"]) as executor:
+        return _process_plate(path, params, executor)
+
+
+def _process_plate(path, params, executor):
+    abs_thr = params["abs_thr"]
+    k = params["kdisp"]
+    method = params["disp"]
+    deriv_s = derivative_strength(params["smooth_on"], params["smooth"])
+
+    store, _ = open_plate(path, cache=params["cache"])
+    wells = store.wells
+    trim_ranges = {}
+
+    def visible(w):
+        return store.visible(w, trim_ranges.get(w))
+
+    # 1) scan suspects (curvas aún originales y sin trim: vale la tabla de saltos de la placa)
+    suspects = [w for w in wells
+                if scan_from_stats(store.original_jump_stats(w), abs_thr, k, method) is not None]
+
+    # 2) correct suspects
+    if params["engine"] in CURVE_ENGINES:
+        results = executor.map_wells(
+            CURVE_ENGINES[params["engine"]], [(w, (store.work(w),)) for w in suspects],
+            abs_thr, k, method, params["iterative"]
+        )
+        final = {w: y_new for w, (y_new, changed) in results if changed}
+    else:
+        jobs = [(w, (store.work(w), store.visible_slice(w, trim_ranges.get(w)))) for w in suspects]
+        results = executor.map_wells(single_jump_steps, jobs, abs_thr, k, method, "auto", params["iterative"])
+        final = {w: steps[-1] for w, steps in results if steps}
+    corrected = [w for w in suspects if w in final]
+    for w in corrected:
+        store.set_work(w, final[w])
+
+    # 3) auto-trim to expected Tm range (all proposals are accepted)
+    auto_trimmed = []
+    if params["tm_range"] is not None:
+        lo, hi = params["tm_range"]
+        proposals = executor.map_wells(auto_trim_proposal, [(w, visible(w)) for w in wells], lo, hi, deriv_s)
+        for w, res in proposals:
+            if res is None:
+                continue
+            x_full = store.temp(w)
+            mask = (x_full >= res["new_tmin"]) & (x_full <= res["new_tmax"])
+            if mask.sum() < 3:
+                continue
+            trim_ranges[w] = (res["new_tmin"], res["new_tmax"])
+            auto_trimmed.append(w)
+
+    # 4) Tm + exports
+    curves = [(w,) + visible(w) for w in wells]
+    tms = executor.map_batches(compute_tm_batch, [(x, y) for _, x, y in curves], deriv_s)
+    outs = output_paths(path, params["outdir"])
+    write_gdsf(build_corrected_df(curves), outs["corrected"])
+    write_gdsf(build_smoothed_df(curves, params["smooth"]), outs["smoothed"])
+    write_tm_table(build_tm_table(curves, deriv_s, params["smooth"], tm_raw=tms), outs["tm_table"])
+
+    valid = [tm for tm in tms if tm is not None and np.isfinite(tm)]
+    return {
+        "path": path,
+        "wells": len(wells),
+        "suspected": len(suspects),
+        "corrected": len(corrected),
+        "auto_trimmed": len(auto_trimmed),
+        "mean_tm": float(np.mean(valid)) if valid else None,
+        "outputs": outs,
+    }
+
+
+def _process_plate_safe(args):
+    path, params = args
+    try:
+        return process_plate(path, params)
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+
+
+def _params_from_args(args):
+    return {
+        "abs_thr": max(0.0, args.abs_thr),
+        "kdisp": max(0.0, args.kdisp),
+        "disp": args.disp,
+        "engine": args.engine,
+        "iterative": args.iterative,
+        "smooth_on": args.smooth is not None,
+        "smooth": 35 if args.smooth is None else max(0, min(100, args.smooth)),
+        "tm_range": tuple(args.tm_range) if args.tm_range else None,
+        "outdir": args.outdir,
+        "cache": args.cache,
+        "backend": args.backend,
+        "workers": args.workers,
+    }
+
+
+def _format_summary(res):
+    if "error" in res:
+        return f"FAILED  {res['path']}: {res['error']}"
+    mean = "n/a" if res["mean_tm"] is None else f"{res['mean_tm']:.2f} °C"
+    return (
+        f"OK      {res['path']}: wells={res['wells']} suspected={res['suspected']} "
+        f"corrected={res['corrected']} auto_trimmed={res['auto_trimmed']} mean Tm={mean}"
+    )
+
+
+def run_batch(args):
+    paths = expand_inputs(args.files)
+    if not paths:
+        print("No input files.", file=sys.stderr)
+        return 2
+    if args.tm_range and args.tm_range[0] >= args.tm_range[1]:
+        print("--tm-range: min must be lower than max.", file=sys.stderr)
+        return 2
+    if args.outdir:
+        os.makedirs(args.outdir, exist_ok=True)
+
+    params = _params_from_args(args)
+    jobs = [(p, params) for p in paths]
+    if args.jobs == 1 or len(jobs) == 1:
+        results = map(_process_plate_safe, jobs)
+        failed = _report(results)
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            failed = _report(pool.map(_process_plate_safe, jobs))
+    print(f"Processed {len(paths)} plates ({failed} failed).")
+    return 1 if failed else 0
+
+
+def _report(results):
+    failed = 0
+    for res in results:
+        print(_format_summary(res), flush=True)
+        failed += "error" in res
+    return failed
+
+
+def _watch_status(monitor):
+    tms = [tm for tm in monitor.provisional_tm().values() if tm is not None]
+    mean = f"{sum(tms) / len(tms):.2f} °C" if tms else "n/a"
+    return (f"points={monitor.points()} wells={len(monitor.wells)} suspected={monitor.n_suspects} "
+            f"provisional mean Tm={mean}")
+
+
+def run_watch(args):
+    if not os.path.exists(args.file):
+        print(f"No such file: {args.file}", file=sys.stderr)
+        return 2
+    n_wells = args.wells
+    if args.abort_fraction is not None and n_wells is None:
+        if args.follow:
+            # con la placa a medio escribir no se sabe cuántos pozos tendrá
+            print("--abort-fraction with --follow needs --wells N (wells on the plate).", file=sys.stderr)
+            return 2
+        n_wells = len({well for well, _, _ in follow_gdsf(args.file)})
+    monitor = PlateMonitor(min_points=args.min_points, abs_thr=max(0.0, args.abs_thr), k=max(0.0, args.kdisp),
+                           method=args.disp, window=args.window, deriv_window=args.deriv_window)
+    last_report = time.monotonic()
+    rows = follow_gdsf(args.file, follow=args.follow, interval=args.interval, idle_timeout=args.idle_timeout)
+    for well, t, f in rows:
+        step = monitor.feed(well, t, f)
+        if step is not None:
+            _, idx, temp, jump = step
+            print(f"STEP    {well}: T={temp:.2f} °C jump={jump:+.6g} (point {idx})", flush=True)
+        if args.abort_fraction is not None:
+            # sólo se decide cuando todos los pozos de la placa llevan ya min-points puntos
+            frac = monitor.suspect_fraction(n_wells)
+            if frac is not None and frac >= args.abort_fraction:
+                print(f"ABORT   {frac:.0%} of wells have steps (limit {args.abort_fraction:.0%}); "
+                      + _watch_status(monitor), flush=True)
+                return 3
+        now = time.monotonic()
+        if args.follow and now - last_report >= args.report_every:
+            print("...     " + _watch_status(monitor), flush=True)
+            last_report = now
+    print("DONE    " + _watch_status(monitor))
+    tms = monitor.provisional_tm()
+    for w in monitor.suspects():
+        det = monitor.wells[w]
+        tm = "n/a" if tms[w] is None else f"{tms[w]:.2f} °C"
+        print(f"  {w}: {len(det.steps)} step(s) at " + ", ".join(f"{s[1]:.2f}" for s in det.steps)
+              + f" °C; provisional Tm={tm}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="dsf-harmonizer", description="DSF Harmonizer (headless).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("batch", help="scan, correct, compute Tm and export many .gdsf plates")
+    b.add_argument("files", nargs="+", help=".gdsf files or glob patterns")
+    b.add_argument("-o", "--outdir", default=None, help="output folder (default: next to each input)")
+    b.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all CPUs)")
+    b.add_argument("--abs-thr", type=float, default=0.0, help="absolute jump threshold (0 = off)")
+    b.add_argument("--kdisp", type=float, default=6.0, help="k in k·disp (0 = off)")
+    b.add_argument("--disp", choices=["MAD", "STD"], default="MAD", help="dispersion method")
+    b.add_argument("--engine", choices=ENGINES, default="multi",
+                   help="step correction engine: multi-jump, single jump or change-point segmentation")
+    b.add_argument("--iterative", action="store_true", help="repeat correction passes")
+    b.add_argument("--smooth", type=int, default=None, metavar="STRENGTH",
+                   help="turn smoothing on with this strength (0-100)")
+    b.add_argument("--tm-range", type=float, nargs=2, default=None, metavar=("MIN", "MAX"),
+                   help="expected Tm range; auto-trims wells whose Tm falls outside")
+    b.add_argument("--backend", choices=BACKENDS, default="serial",
+                   help="how per-well work inside each plate runs (default: serial)")
+    b.add_argument("--workers", type=int, default=None,
+                   help="threads/processes per plate for --backend thread|process (default: all CPUs)")
+    b.add_argument("--cache", action="store_true",
+                   help="read/write a binary sidecar (<file>.gdsf.npz) to skip parsing on later runs")
+    b.set_defaults(func=run_batch)
+
+    wt = sub.add_parser("watch", help="flag steps and provisional Tm while a .gdsf is still being written")
+    wt.add_argument("file", help=".gdsf file written by the instrument")
+    wt.add_argument("--follow", action="store_true", help="keep reading rows as they are appended")
+    wt.add_argument("--interval", type=float, default=1.0, help="seconds between polls with --follow")
+    wt.add_argument("--idle-timeout", type=float, default=None,
+                    help="with --follow, stop after this many seconds without new rows")
+    wt.add_argument("--report-every", type=float, default=30.0, help="seconds between status lines")
+    wt.add_argument("--abs-thr", type=float, default=0.0, help="absolute jump threshold (0 = off)")
+    wt.add_argument("--kdisp", type=float, default=6.0, help="k in k·disp (0 = off)")
+    wt.add_argument("--disp", choices=["MAD", "STD"], default="MAD", help="dispersion method")
+    wt.add_argument("--window", type=int, default=32, help="diffs in the running dispersion window")
+    wt.add_argument("--deriv-window", type=int, default=9, help="points in the provisional-Tm slope fit")
+    wt.add_argument("--abort-fraction", type=float, default=None, metavar="F",
+                    help="exit with code 3 as soon as this fraction of wells has steps")
+    wt.add_argument("--min-points", type=int, default=20,
+                    help="points every well needs before --abort-fraction is checked")
+    wt.add_argument("--wells", type=int, default=None, metavar="N",
+                    help="wells on the plate, for --abort-fraction (required with --follow; "
+                         "otherwise counted from the file)")
+    wt.set_defaults(func=run_watch)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # salida cortada (p. ej. `| head`): sin traza, y que Python no vuelva a fallar al cerrar stdout
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
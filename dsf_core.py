@@ -0,0 +1,865 @@
+# Núcleo de análisis de DSF Harmonizer, SIN tkinter.
+# Lo usan tanto la GUI (DSF_Harmonizer.py) como el modo batch (dsf_cli.py).
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# try Savitzky–Golay; fallback to simple moving average if not available
+try:
+    from scipy.signal import savgol_filter as _savgol
+except Exception:
+    _savgol = None
+
+GDSF_COLUMNS = ["Well", "Temperature", "Fluorescence"]
+
+# Smoothing mínimo que siempre se aplica antes de derivar
+SMOOTH_BASE = 25
+
+
+# ------------------------ helpers (robust stats & smoothing) ------------------------
+def robust_mad_sigma(diffs):
+    if len(diffs) == 0:
+        return 0.0
+    diffs = np.asarray(diffs, dtype=float)
+    med = np.nanmedian(diffs)
+    mad = np.nanmedian(np.abs(diffs - med))
+    return 1.4826 * mad
+
+
+def dispersion(diffs, method="MAD"):
+    """Dispersion of the point-to-point diffs: robust MAD sigma or sample STD."""
+    if method == "MAD":
+        return robust_mad_sigma(diffs)
+    return np.std(diffs, ddof=1) if len(diffs) > 1 else 0.0
+
+
+def _odd(n):
+    n = int(max(3, n))
+    return n if n % 2 == 1 else n + 1
+
+
+def _smooth_window(n, strength):
+    """Window length smooth_signal uses for n points, or None if it leaves y as is."""
+    if n < 3 or strength <= 0:
+        return None
+    # Map 0..100 -> window fraction ~0.03..0.25 of n (clamped & odd)
+    frac = max(0.0, min(1.0, float(strength) / 100.0))
+    w_target = int(round(0.03 * n + 0.22 * frac * n))
+    w = _odd(max(5, min(w_target, 101, n - (1 - n % 2))))  # clamp
+    if w >= n:
+        w = _odd(max(5, n - 1))
+    if w < 5:
+        return None
+    return w
+
+
+def _savgol_order(w):
+    return min(3, max(2, w - 2))
+
+
+def smooth_signal(y, strength=0):
+    """Smooth y with Savitzky–Golay if available; else symmetric moving average.
+    strength: 0..100 (0 = off). Higher => wider window.
+    A 2-D y (wells × points) is smoothed row by row along the last axis.
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.shape[-1]
+    w = _smooth_window(n, strength)
+    if w is None:
+        return y.copy()
+
+    if _savgol is not None and w >= 5:
+        try:
+            return _savgol(y, window_length=w, polyorder=_savgol_order(w), mode="interp", axis=-1)
+        except Exception:
+            pass
+    if y.ndim > 1:
+        return np.array([smooth_signal(row, strength) for row in y]).reshape(y.shape)
+
+    # Fallback: symmetric moving average with edge reflection
+    k = max(5, min(w, n - 1))
+    kernel = np.ones(k) / k
+    ypad = np.r_[y[k-1:0:-1], y, y[-2:-k-1:-1]]
+    ys = np.convolve(ypad, kernel, mode="valid")
+    start = (len(ys) - n) // 2
+    return ys[start:start+n]
+
+
+def smooth_derivative(d, strength=20):
+    """Light smoothing for derivative trace; strength is 0..100 like smooth_signal."""
+    return smooth_signal(d, strength=max(0, int(strength)))
+
+
+def derivative_strength(smooth_on, strength):
+    """Smoothing para derivada: siempre base=25 + extra si smooth_on activado."""
+    if not smooth_on:
+        return SMOOTH_BASE
+    try:
+        return max(SMOOTH_BASE, int(strength))
+    except (TypeError, ValueError):
+        return SMOOTH_BASE
+
+
+def well_sortkey(w):
+    w = (w or "").strip().upper()
+    if not w:
+        return ("Z", 999)
+    row = w[0]
+    try:
+        col = int("".join(ch for ch in w[1:] if ch.isdigit()))
+    except Exception:
+        col = 999
+    return (row, col)
+
+
+def well_position(w):
+    """Zero-based (row, col) of a well name on the plate (A1 -> (0, 0), AF48 -> (31, 47)),
+    or None if the name is not letters followed by a number."""
+    w = (w or "").strip().upper()
+    letters = len(w) - len(w.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    if letters == 0 or not w[letters:].isdigit():
+        return None
+    row = 0
+    for ch in w[:letters]:
+        row = row * 26 + (ord(ch) - ord("A") + 1)
+    return row - 1, int(w[letters:]) - 1
+
+
+# ------------------------ trimming ------------------------
+def visible_mask(x, trim_range):
+    """Boolean mask of points inside trim_range, or None if the whole curve is visible.
+    Overly aggressive trims (fewer than 3 points left) fall back to the full curve.
+    """
+    if trim_range is None:
+        return None
+    tmin, tmax = trim_range
+    mask = (x >= tmin) & (x <= tmax)
+    if mask.sum() < 3:
+        return None
+    return mask
+
+
+# ------------------------ Tm ------------------------
+def compute_tm_for_xy(x, y, strength=SMOOTH_BASE):
+    """Compute Tm and normalized derivative for arbitrary x,y.
+    Tm = global maximum of the upward-oriented derivative of the smoothed curve.
+    Returns (tm, x_sorted, dplot); tm/dplot are None when undefined.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.size < 3:
+        return (None, x, None)
+
+    # ordenar por temperatura
+    order = np.argsort(x)
+    x = x[order]
+    y = y[order]
+
+    # evitar duplicados exactos
+    if np.any(np.diff(x) == 0):
+        eps = np.linspace(0, 1e-9, num=len(x))
+        x = x + eps
+
+    # aplicar smoothing para derivada
+    ys = smooth_signal(y, strength)
+    d = np.gradient(ys, x)
+    if d.size == 0 or not np.isfinite(d).any():
+        return (None, x, None)
+
+    max_abs = np.nanmax(np.abs(d))
+    if not np.isfinite(max_abs) or max_abs <= 0:
+        return (None, x, None)
+
+    # orientar derivada hacia arriba
+    i_dom = int(np.nanargmax(np.abs(d)))
+    orient = 1.0 if d[i_dom] > 0 else -1.0
+    d_up = d * orient
+
+    # Tm = máximo global de la derivada orientada
+    i_tm = int(np.nanargmax(d_up))
+    tm = float(x[i_tm]) if np.isfinite(d_up[i_tm]) else None
+
+    # derivada normalizada para el plot
+    maxpos = np.nanmax(d_up) if np.isfinite(d_up).any() else 0.0
+    dplot = d_up / maxpos if maxpos > 0 else d_up
+    return (tm, x, dplot)
+
+
+class TmCache:
+    """LRU cache of compute_tm_for_xy results keyed by (well, version, trim_range, strength).
+
+    Bounded by the bytes of the cached arrays. invalidate(well) drops every entry of
+    one well; hits / misses / evictions are counted for tuning.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()       # key -> (result, nbytes)
+        self._by_well = {}                  # well -> set de claves
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _size(result):
+        return sum(a.nbytes for a in result[1:] if isinstance(a, np.ndarray))
+
+    def get(self, key):
+        """Cached result for key (and mark it recently used), or None."""
+        hit = self._entries.get(key)
+        if hit is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return hit[0]
+
+    def put(self, key, result):
+        if key in self._entries:
+            self._drop(key)
+        nbytes = self._size(result)
+        self._entries[key] = (result, nbytes)
+        self._by_well.setdefault(key[0], set()).add(key)
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key):
+        _, nbytes = self._entries.pop(key)
+        self.nbytes -= nbytes
+        keys = self._by_well.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_well[key[0]]
+
+    def invalidate(self, well):
+        for key in list(self._by_well.get(well, ())):
+            self._drop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_well.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.nbytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+def _nanargmax_rows(a):
+    """np.nanargmax along axis 1 (rows that are all-NaN give 0; callers mask them)."""
+    return np.argmax(np.where(np.isnan(a), -np.inf, a), axis=1)
+
+
+def _tm_rows(x, Y, strength):
+    """Tm of every row of Y (wells × points) over one shared, strictly increasing ramp x.
+    Same steps as compute_tm_for_xy, done for the whole block at once.
+    """
+    D = np.gradient(smooth_signal(Y, strength), x, axis=1)
+    rows = np.arange(len(Y))
+    absD = np.abs(D)
+    ok = np.isfinite(D).any(axis=1)
+    max_abs = np.where(ok, np.nanmax(np.where(ok[:, None], absD, 0.0), axis=1), np.nan)
+    ok &= np.isfinite(max_abs) & (max_abs > 0)
+
+    i_dom = _nanargmax_rows(absD)
+    orient = np.where(D[rows, i_dom] > 0, 1.0, -1.0)
+    D_up = D * orient[:, None]
+    i_tm = _nanargmax_rows(D_up)
+    ok &= np.isfinite(D_up[rows, i_tm])
+    return [float(x[i]) if good else None for i, good in zip(i_tm, ok)]
+
+
+def compute_tm_batch(curves, strength=SMOOTH_BASE):
+    """Tm for many (x, y) curves; same values as compute_tm_for_xy(x, y, strength)[0].
+    Curves sharing the same strictly increasing temperature ramp are stacked into a
+    wells × points matrix and solved together; any other curve (ragged length,
+    own ramp, unsorted or duplicated x) goes through the per-curve path.
+    """
+    curves = [(np.asarray(x, dtype=float), np.asarray(y, dtype=float)) for x, y in curves]
+    tms = [None] * len(curves)
+    groups = {}
+    for i, (x, y) in enumerate(curves):
+        if x.size < 3:
+            continue
+        groups.setdefault((x.size, x.tobytes()), []).append(i)
+
+    for members in groups.values():
+        x = curves[members[0]][0]
+        if len(members) == 1 or not np.all(np.diff(x) > 0):
+            for i in members:
+                tms[i] = compute_tm_for_xy(*curves[i], strength)[0]
+            continue
+        Y = np.vstack([curves[i][1] for i in members])
+        for i, tm in zip(members, _tm_rows(x, Y, strength)):
+            tms[i] = tm
+    return tms
+
+
+# ------------------------ suspects / step engines ------------------------
+def is_suspect_jump(maxjump, disp, abs_thr, k):
+    """True if a jump exceeds abs_thr or k·disp (a zero threshold turns its rule off)."""
+    cond_abs = maxjump > abs_thr if abs_thr > 0 else False
+    cond_k = (disp > 0) and (maxjump > k * disp) if k > 0 else False
+    return bool(cond_abs or cond_k)
+
+
+def scan_well(y, abs_thr, k, method):
+    """Return index of the largest jump if it exceeds abs_thr or k·disp, else None."""
+    diffs = np.diff(np.asarray(y, dtype=float))
+    if len(diffs) == 0:
+        return None
+    disp = dispersion(diffs, method)
+    i_star = int(np.argmax(np.abs(diffs)))
+    maxjump = float(np.abs(diffs[i_star]))
+    if is_suspect_jump(maxjump, disp, abs_thr, k):
+        return i_star
+    return None
+
+
+def jump_stats(y):
+    """Threshold-independent scan statistics of a curve:
+    (i_star, maxjump, disp_MAD, disp_STD), or None with fewer than 2 points.
+    """
+    diffs = np.diff(np.asarray(y, dtype=float))
+    if len(diffs) == 0:
+        return None
+    i_star = int(np.argmax(np.abs(diffs)))
+    return (i_star, float(np.abs(diffs[i_star])),
+            float(dispersion(diffs, "MAD")), float(dispersion(diffs, "STD")))
+
+
+def jump_stats_batch(curves):
+    """jump_stats for many curves at once: [(i_star, maxjump, disp_MAD, disp_STD) or None].
+
+    Curves are grouped by length and each group is scanned as one wells × diffs
+    matrix (row-wise argmax / median / std), so ragged or trimmed plates need no
+    padding and every row gives exactly the per-curve result.
+    """
+    out = [None] * len(curves)
+    groups = {}
+    for i, y in enumerate(curves):
+        if len(y) >= 2:
+            groups.setdefault(len(y), []).append(i)
+    for n, idx in groups.items():
+        D = np.diff(np.array([curves[i] for i in idx], dtype=float), axis=1)
+        A = np.abs(D)
+        i_star = np.argmax(A, axis=1)
+        maxjump = A[np.arange(len(idx)), i_star]
+        med = np.nanmedian(D, axis=1, keepdims=True)
+        mad = 1.4826 * np.nanmedian(np.abs(D - med), axis=1)
+        std = np.std(D, axis=1, ddof=1) if n > 2 else np.zeros(len(idx))
+        for j, i in enumerate(idx):
+            out[i] = (int(i_star[j]), float(maxjump[j]), float(mad[j]), float(std[j]))
+    return out
+
+
+def scan_from_stats(stats, abs_thr, k, method):
+    """Same decision as scan_well, from precomputed jump_stats."""
+    if stats is None:
+        return None
+    i_star, maxjump, disp_mad, disp_std = stats
+    disp = disp_mad if method == "MAD" else disp_std
+    if is_suspect_jump(maxjump, disp, abs_thr, k):
+        return i_star
+    return None
+
+
+class JumpIndex:
+    """Per-well jump statistics sorted for threshold queries.
+
+    rows[i] = jump_stats of well i (NaN row = not scannable). Wells are kept sorted by
+    max jump and by jump/dispersion ratio (MAD and STD), so "which wells exceed
+    abs_thr or k·disp" is a pair of binary searches. Ratios within rounding of k are
+    re-checked with the exact scan_from_stats comparison.
+    """
+
+    _RATIO_SLACK = 1e-9
+
+    def __init__(self, rows):
+        rows = np.asarray(rows, dtype=float).reshape(-1, 4)
+        self.n = len(rows)
+        self.i_star = rows[:, 0]
+        self.maxjump = rows[:, 1]
+        valid = ~np.isnan(self.maxjump)
+        idx = np.flatnonzero(valid)
+        order = np.argsort(self.maxjump[idx], kind="stable")
+        self._jump_wells, self._jump_sorted = idx[order], self.maxjump[idx][order]
+        self._ratio = {}
+        for method, col in (("MAD", 2), ("STD", 3)):
+            disp = rows[:, col]
+            idx = np.flatnonzero(valid & (disp > 0))
+            ratio = self.maxjump[idx] / disp[idx]
+            order = np.argsort(ratio, kind="stable")
+            self._ratio[method] = (idx[order], ratio[order], disp)
+
+    def query(self, abs_thr, k, method):
+        """Sorted indices of the wells scan_from_stats would flag."""
+        hit = np.zeros(self.n, dtype=bool)
+        if abs_thr > 0:
+            hit[self._jump_wells[np.searchsorted(self._jump_sorted, abs_thr, side="right"):]] = True
+        if k > 0:
+            idx, ratio, disp = self._ratio["MAD" if method == "MAD" else "STD"]
+            lo = np.searchsorted(ratio, k * (1 - self._RATIO_SLACK), side="left")
+            hi = np.searchsorted(ratio, k * (1 + self._RATIO_SLACK), side="right")
+            hit[idx[hi:]] = True
+            band = idx[lo:hi]
+            hit[band[self.maxjump[band] > k * disp[band]]] = True
+        return np.flatnonzero(hit)
+
+
+def _step_threshold(diffs, abs_thr, k, method):
+    """Jump size above which a diff is a step: max(abs_thr, k·disp), or None if off."""
+    disp = dispersion(diffs, method)
+    thr_rel = (k * disp) if k > 0 and disp > 0 else -np.inf
+    thr_abs = abs_thr if abs_thr > 0 else -np.inf
+    thr = max(thr_rel, thr_abs)
+    if not np.isfinite(thr) or thr <= 0:
+        return None
+    return thr
+
+
+def find_step_indices(y, abs_thr, k, method):
+    diffs = np.diff(y)
+    if diffs.size == 0:
+        return []
+    thr = _step_threshold(diffs, abs_thr, k, method)
+    if thr is None:
+        return []
+    idx = np.where(np.abs(diffs) > thr)[0]
+    return idx.tolist()
+
+
+def multi_jump(y, abs_thr, k, method, iterative=False):
+    """Remove every detected step at once (repeat up to 20 passes if iterative).
+    Returns (y_corrected, changed).
+    """
+    y = np.asarray(y, dtype=float).copy()
+    changed = False
+    max_loops = 20 if iterative else 1
+    for _ in range(max_loops):
+        idxs = find_step_indices(y, abs_thr, k, method)
+        if not idxs:
+            break
+        changed = True
+        diffs = np.diff(y)
+        deltas = diffs[idxs]
+        adjust = np.zeros(len(y), dtype=float)
+        for i, dlt in zip(idxs, deltas):
+            adjust[i+1] -= dlt
+        y = y + np.cumsum(adjust)
+        if not iterative:
+            break
+    return y, changed
+
+
+# ------------------------ change-point engine ------------------------
+def _linear_sums(y):
+    """Prefix sums (with a leading 0) of t, t², y, t·y, y² for O(1) line fits."""
+    t = np.arange(len(y), dtype=float)
+    cols = np.stack([t, t * t, y, t * y, y * y])
+    return np.concatenate([np.zeros((5, 1)), np.cumsum(cols, axis=1)], axis=1)
+
+
+def pelt_linear(y, penalty):
+    """Optimal partition of y into straight-line segments (PELT: SSE cost plus
+    `penalty` per segment). Returns the start index of every segment after the first.
+    Pruning keeps the candidate set small, so the run time is close to linear.
+    """
+    n = len(y)
+    if n < 2:
+        return []
+    St, Stt, Sy, Sty, Syy = _linear_sums(y)
+    F = np.empty(n + 1)
+    F[0] = -penalty
+    last = np.zeros(n + 1, dtype=int)
+    cands = np.zeros(1, dtype=int)
+    for t in range(1, n + 1):
+        m = t - cands
+        st = St[t] - St[cands]
+        sy = Sy[t] - Sy[cands]
+        cov = (Sty[t] - Sty[cands]) - st * sy / m
+        vt = (Stt[t] - Stt[cands]) - st * st / m
+        sse = (Syy[t] - Syy[cands]) - sy * sy / m
+        fit = (m >= 3) & (vt > 0)        # 1-2 puntos: nivel constante (una recta los ajusta sin error)
+        sse[fit] -= cov[fit] * cov[fit] / vt[fit]
+        total = F[cands] + np.maximum(sse, 0.0)
+        j = int(np.argmin(total))
+        F[t] = total[j] + penalty
+        last[t] = cands[j]
+        # PELT: un inicio que ya pierde contra F[t] no puede ganar más adelante
+        cands = np.append(cands[total <= F[t]], t)
+    starts, t = [], n
+    while t > 0:
+        t = int(last[t])
+        if t > 0:
+            starts.append(t)
+    return starts[::-1]
+
+
+def changepoint_jump(y, abs_thr, k, method, iterative=False):
+    """Step correction by change-point segmentation, in one pass.
+
+    The curve is split into straight-line segments (pelt_linear, penalty 3·σ²·log n
+    with σ the robust noise of the second differences). Every boundary is a candidate
+    level shift: its jump is the diff at the boundary minus the local slope (median
+    of the neighbouring non-boundary diffs). Jumps above the usual max(abs_thr, k·disp)
+    threshold are removed with a single cumulative sum. All boundaries come from one
+    global fit, so neighbouring steps cannot hide each other. `iterative` is accepted
+    for a uniform engine signature and ignored. Returns (y_corrected, changed).
+    """
+    y = np.asarray(y, dtype=float).copy()
+    if len(y) < 4 or not np.isfinite(y).all():
+        return y, False
+    thr = _step_threshold(np.diff(y), abs_thr, k, method)
+    if thr is None:
+        return y, False
+    sigma = robust_mad_sigma(np.diff(y, 2)) / np.sqrt(6.0)
+    if not sigma > 0:
+        sigma = max(1e-12, 1e-9 * float(np.ptp(y)))
+    z = (y - float(np.median(y))) / sigma           # escala σ = 1: SSE bien condicionada
+    bounds = [0] + pelt_linear(z, 3.0 * np.log(len(z))) + [len(z)]
+    # salto = diff en la frontera menos la pendiente local (mediana de las diffs
+    # vecinas que no son a su vez frontera)
+    diffs = np.diff(y)
+    step_pos = np.array(bounds[1:-1], dtype=int) - 1
+    smooth_diff = np.ones(len(diffs), dtype=bool)
+    smooth_diff[step_pos] = False
+    adjust = np.zeros(len(y))
+    for i in step_pos:
+        lo, hi = max(0, i - 3), min(len(diffs), i + 4)
+        local = diffs[lo:hi][smooth_diff[lo:hi]]
+        gap = float(diffs[i]) - (float(np.median(local)) if len(local) else 0.0)
+        if abs(gap) > thr:
+            adjust[i + 1] -= gap
+    if not adjust.any():
+        return y, False
+    return y + np.cumsum(adjust), True
+
+
+# Motores de corrección: los de curva entera tienen la firma de multi_jump;
+# "single" corrige salto a salto (single_jump_steps) y se trata aparte.
+ENGINES = ["multi", "single", "changepoint"]
+CURVE_ENGINES = {"multi": multi_jump, "changepoint": changepoint_jump}
+
+
+def single_jump_once(y_full, vis, abs_thr, k, method, op="auto"):
+    """Correct only the largest visible jump (if it is suspect).
+    vis selects the visible points of y_full (slice or boolean mask; None = all).
+    Returns the corrected full curve, or None if nothing was corrected.
+    """
+    y_full = np.asarray(y_full, dtype=float)
+    idxs = np.arange(len(y_full))
+    if vis is not None:
+        idxs = idxs[vis]
+    i_star = scan_well(y_full[idxs], abs_thr, k, method)
+    if i_star is None or len(idxs) <= i_star + 1:
+        return None
+    # Map index in visible data to full index
+    full_idx = idxs[i_star]
+    delta = float(y_full[full_idx+1] - y_full[full_idx])
+    adj = -delta if op in ("auto", "sub") else +delta
+    y_new = y_full.copy()
+    y_new[full_idx+1:] = y_new[full_idx+1:] + adj
+    return y_new
+
+
+def single_jump_steps(y_full, vis, abs_thr, k, method, op="auto", iterative=False):
+    """Successive single_jump_once corrections: one step, or until nothing is left if
+    iterative. Returns the list of corrected full curves, one per step (may be empty).
+    """
+    steps = []
+    y = y_full
+    while True:
+        y_new = single_jump_once(y, vis, abs_thr, k, method, op)
+        if y_new is None:
+            break
+        steps.append(y_new)
+        y = y_new
+        if not iterative:
+            break
+    return steps
+
+
+# ------------------------ auto-trim ------------------------
+class _ArgMaxTable:
+    """Sparse table: leftmost argmax of v[lo:hi+1] in O(1) after O(n log n) setup."""
+
+    def __init__(self, v):
+        self.v = v
+        n = len(v)
+        self.levels = [np.arange(n)]
+        k = 1
+        while (1 << k) <= n:
+            prev, half, cnt = self.levels[-1], 1 << (k - 1), n - (1 << k) + 1
+            a, b = prev[:cnt], prev[half:half + cnt]
+            self.levels.append(np.where(v[b] > v[a], b, a))
+            k += 1
+
+    def query(self, lo, hi):
+        k = (hi - lo + 1).bit_length() - 1
+        a = self.levels[k][lo]
+        b = self.levels[k][hi - (1 << k) + 1]
+        return int(b) if self.v[b] > self.v[a] else int(a)
+
+
+_EDGE_PROJ = {}
+
+
+def _edge_projections(w):
+    """Matrices mapping w samples to the Savitzky–Golay 'interp' edge values
+    (first / last w//2 points of the local cubic/quadratic fit)."""
+    if w not in _EDGE_PROJ:
+        h = w // 2
+        t = (np.arange(w) - h) / max(1, h)          # base centrada: bien condicionada
+        V = np.vander(t, _savgol_order(w) + 1)
+        pinv = np.linalg.pinv(V)
+        _EDGE_PROJ[w] = (V[:h] @ pinv, V[w - h:] @ pinv)
+    return _EDGE_PROJ[w]
+
+
+class _WindowTm:
+    """Tm of sub-windows x[l:r+1] of one sorted curve, equal to
+    compute_tm_for_xy(x[l:r+1], y[l:r+1], strength)[0].
+
+    For each smoothing window w the whole curve is smoothed and differentiated once:
+    the interior of any sub-window is bit-for-bit the same as in that pass, so only
+    its w//2 + 1 points at each end are re-derived, and the interior argmax comes
+    from sparse-table range queries. Decisions within a tolerance of a tie (and any
+    unusual input) use the exact per-window computation instead.
+    """
+
+    def __init__(self, x, y, strength):
+        self.x, self.y, self.strength = x, y, strength
+        self._per_w = {}
+        dx = np.diff(x)
+        self.fast = (_savgol is not None and len(x) >= 5
+                     and bool(np.all(dx > 0)) and bool(np.isfinite(y).all()))
+        if not self.fast:
+            return
+        self.dx = dx
+        self.uniform = bool(np.all(dx == dx[0]))
+        # run_end[i]: último j con dx[i..j] iguales (¿sub-ventana de paso uniforme?)
+        breaks = np.flatnonzero(dx[1:] != dx[:-1])
+        pos = np.searchsorted(breaks, np.arange(len(dx)))
+        self.run_end = np.append(breaks, len(dx) - 1)[pos]
+        # coeficientes de np.gradient (paso no uniforme) para los puntos 1..n-2
+        dx1, dx2 = dx[:-1], dx[1:]
+        self.ca = -(dx2) / (dx1 * (dx1 + dx2))
+        self.cb = (dx2 - dx1) / (dx1 * dx2)
+        self.cc = dx1 / (dx2 * (dx1 + dx2))
+        # margen muy por encima del error de redondeo de los bordes re-derivados
+        self.tol = 1e-7 * (float(np.max(np.abs(y))) + 1.0) / float(dx.min())
+
+    def _exact(self, l, r):
+        return compute_tm_for_xy(self.x[l:r + 1], self.y[l:r + 1], self.strength)[0]
+
+    def _prep(self, w):
+        if w not in self._per_w:
+            ys = self.y.copy() if w is None else _savgol(self.y, window_length=w,
+                                                         polyorder=_savgol_order(w), mode="interp")
+            G = np.gradient(ys, self.x)
+            self._per_w[w] = (ys, G, _ArgMaxTable(np.abs(G)), _ArgMaxTable(G), _ArgMaxTable(-G))
+        return self._per_w[w]
+
+    def _edge_derivs(self, w, h, ys, l, r):
+        """Derivative of the window's smoothed curve at l..l+h and r-h..r (concatenated)."""
+        y, dx, ca, cb, cc = self.y, self.dx, self.ca, self.cb, self.cc
+        left = np.empty(h + 2)
+        right = np.empty(h + 2)
+        left[h:] = ys[l + h:l + h + 2]
+        right[:2] = ys[r - h - 1:r - h + 1]
+        if h:
+            PL, PR = _edge_projections(w)
+            left[:h] = PL @ y[l:l + w]
+            right[2:] = PR @ y[r - w + 1:r + 1]
+        edge = np.empty(2 * h + 2)
+        edge[0] = (left[1] - left[0]) / dx[l]
+        p = slice(l, l + h)                     # ca/cb/cc empiezan en el punto 1
+        edge[1:h + 1] = ca[p] * left[:-2] + cb[p] * left[1:-1] + cc[p] * left[2:]
+        p = slice(r - h - 1, r - 1)
+        edge[h + 1:-1] = ca[p] * right[:-2] + cb[p] * right[1:-1] + cc[p] * right[2:]
+        edge[-1] = (right[-1] - right[-2]) / dx[r - 1]
+        return edge
+
+    def _pick(self, v_in, edge):
+        """Index into edge of a strictly larger value than the interior one, -1 if the
+        interior wins, or None if the call is too close to a tie."""
+        j = int(np.argmax(edge))
+        best = max(edge[j], v_in)
+        second = max(np.partition(edge, -2)[-2], min(edge[j], v_in))
+        if best - second <= self.tol or best <= self.tol:
+            return None
+        return j if edge[j] > v_in else -1
+
+    def tm(self, l, r):
+        m = r - l + 1
+        w = _smooth_window(m, self.strength)
+        h = 0 if w is None else w // 2
+        if (not self.fast or m < 2 * h + 3
+                or (not self.uniform and self.run_end[l] >= r - 1)):
+            return self._exact(l, r)
+        ys, G, t_abs, t_max, t_min = self._prep(w)
+        lo, hi = l + h + 1, r - h - 1
+        edge = self._edge_derivs(w, h, ys, l, r)
+
+        # orientación: signo del máximo de |d|
+        i_in = t_abs.query(lo, hi)
+        j = self._pick(abs(G[i_in]), np.abs(edge))
+        if j is None:
+            return self._exact(l, r)
+        up = (G[i_in] if j < 0 else edge[j]) > 0
+
+        # Tm: máximo de la derivada orientada
+        if up:
+            i_in = t_max.query(lo, hi)
+            j = self._pick(G[i_in], edge)
+        else:
+            i_in = t_min.query(lo, hi)
+            j = self._pick(-G[i_in], -edge)
+        if j is None:
+            return self._exact(l, r)
+        if j < 0:
+            idx = i_in
+        elif j <= h:
+            idx = l + j
+        else:
+            idx = r - h + (j - h - 1)
+        return float(self.x[idx])
+
+
+def auto_trim_proposal(x, y, tm_lo, tm_hi, strength=SMOOTH_BASE):
+    """
+    Propuesta de trimming para una curva (x ordenada):
+    - Sólo actúa si la Tm actual está fuera del rango [tm_lo, tm_hi].
+    - Quita puntos de un lado u otro, de uno en uno, hasta meter la Tm en el rango.
+    - Minimiza el número de puntos eliminados y respeta mínimo 3 puntos.
+    Returns a dict describing the trim, or None.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) < 3:
+        return None
+
+    tm0, _, _ = compute_tm_for_xy(x, y, strength)
+    if tm0 is None or not np.isfinite(tm0):
+        return None
+
+    # Si ya está dentro del rango, no se toca
+    if tm_lo <= tm0 <= tm_hi:
+        return None
+
+    n = len(x)
+    left = 0
+    right = n - 1
+    removed_low = 0
+    removed_high = 0
+    tm_current = tm0
+
+    max_remove = n - 3  # mínimo 3 puntos
+
+    last_good = None
+    window_tm = None            # se crea al primer recorte (casi todos los pozos no lo necesitan)
+    orig_min = float(x[0])
+    orig_max = float(x[-1])
+
+    while (removed_low + removed_high) < max_remove:
+        if tm_current is None or not np.isfinite(tm_current):
+            break
+        if tm_lo <= tm_current <= tm_hi:
+            last_good = (left, right, tm_current, removed_low, removed_high)
+            break
+
+        if tm_current < tm_lo:
+            # Tm demasiado baja -> quitar puntos por abajo
+            if left >= right:
+                break
+            left += 1
+            removed_low += 1
+        elif tm_current > tm_hi:
+            # Tm demasiado alta -> quitar puntos por arriba
+            if right <= left:
+                break
+            right -= 1
+            removed_high += 1
+        else:
+            break
+
+        if (right - left + 1) < 3:
+            break
+
+        if window_tm is None:
+            window_tm = _WindowTm(x, y, strength)
+        tm_current = window_tm.tm(left, right)
+
+        if tm_current is not None and np.isfinite(tm_current) and tm_lo <= tm_current <= tm_hi:
+            last_good = (left, right, tm_current, removed_low, removed_high)
+            break
+
+    if last_good is None:
+        return None
+
+    left, right, tm_final, removed_low, removed_high = last_good
+    total_removed = removed_low + removed_high
+    if total_removed == 0:
+        return None
+
+    new_tmin = float(x[left])
+    new_tmax = float(x[right])
+
+    return {
+        "tm_before": float(tm0),
+        "tm_after": float(tm_final),
+        "removed_low": int(removed_low),
+        "removed_high": int(removed_high),
+        "removed_total": int(total_removed),
+        "new_tmin": new_tmin,
+        "new_tmax": new_tmax,
+        "deg_low": float(max(0.0, new_tmin - orig_min)),
+        "deg_high": float(max(0.0, orig_max - new_tmax)),
+    }
+
+
+# ------------------------ exports ------------------------
+def build_corrected_df(curves):
+    """curves: iterable of (well, x, y) already trimmed; deleted wells excluded."""
+    frames = [
+        pd.DataFrame({"Well": w, "Temperature": x, "Fluorescence": y})
+        for w, x, y in curves if len(x) > 0
+    ]
+    if not frames:
+        return pd.DataFrame(columns=GDSF_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[GDSF_COLUMNS]
+
+
+def build_smoothed_df(curves, strength):
+    """Like build_corrected_df but smoothing each curve at export time."""
+    return build_corrected_df(
+        (w, x, smooth_signal(y, strength)) for w, x, y in curves
+    )
+
+
+def build_tm_table(curves, deriv_strength, strength, tm_raw=None):
+    """Tm table with Tm on the corrected curve and on the curve smoothed at export time.
+    tm_raw: Tm of `curves` (same order) if the caller already has them."""
+    s_export = max(SMOOTH_BASE, int(strength))
+    if tm_raw is None:
+        curves = [(w, x, y) for w, x, y in curves if len(x) > 0]
+        tm_raw = compute_tm_batch([(x, y) for _, x, y in curves], deriv_strength)
+    else:
+        kept = [(c, tm) for c, tm in zip(curves, tm_raw) if len(c[1]) > 0]
+        curves, tm_raw = [c for c, _ in kept], [tm for _, tm in kept]
+    tm_smooth = compute_tm_batch([(x, smooth_signal(y, s_export)) for _, x, y in curves], deriv_strength)
+    rows = [
+        {"Well": w, "Tm_corrected": t_raw, "Tm_smoothed": t_smooth, "Smooth_strength": s_export}
+        for (w, _, _), t_raw, t_smooth in zip(curves, tm_raw, tm_smooth)
+    ]
+    return pd.DataFrame(rows, columns=["Well", "Tm_corrected", "Tm_smoothed", "Smooth_strength"])
@@ -0,0 +1,261 @@
+# Backends de ejecución para el trabajo por pozo (scan, corrección, Tm, auto-trim):
+# serie, hilos o procesos. Los resultados vuelven siempre en orden de placa
+# (salvo stream_wells, que los entrega según van terminando, para la GUI).
+# BackgroundJob saca un trabajo largo del hilo de la GUI: corre en un hilo propio y
+# devuelve sus resultados por una cola que la GUI vacía desde un bucle `after`.
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from dsf_core import well_sortkey
+
+BACKENDS = ["serial", "thread", "process"]
+
+
+def _run_chunk(fn, chunk, extra):
+    return [fn(*args, *extra) for args in chunk]
+
+
+def _run_batch(fn, items, extra):
+    return fn(items, *extra)
+
+
+def _split(items, n_chunks):
+    size = max(1, -(-len(items) // max(1, n_chunks)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class WellStream:
+    """Incremental, cancellable map over wells (see WellExecutor.stream_wells).
+
+    poll() never blocks for long: on a pool it collects the chunks that are already
+    done; on the serial backend it computes the next chunk in the calling thread.
+    Results come as [(well, result)] in completion order; `done`/`total` count wells.
+    """
+
+    def __init__(self, executor, fn, jobs, extra, chunk_size):
+        self.total = len(jobs)
+        self.done = 0
+        self.cancelled = False
+        self._chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        self._fn, self._extra = fn, extra
+        self._pending = []
+        if executor._parallel(len(jobs)):
+            pool = executor._get_pool()
+            self._pending = [(chunk, pool.submit(_run_chunk, fn, [a for _, a in chunk], extra))
+                             for chunk in self._chunks]
+            self._chunks = []
+
+    @property
+    def finished(self):
+        return self.cancelled or (not self._chunks and not self._pending)
+
+    def poll(self):
+        if self.cancelled:
+            return []
+        if self._chunks:
+            chunk = self._chunks.pop(0)
+            out = list(zip([w for w, _ in chunk], _run_chunk(self._fn, [a for _, a in chunk], self._extra)))
+        else:
+            out, still = [], []
+            for chunk, fut in self._pending:
+                if fut.done():
+                    out.extend(zip([w for w, _ in chunk], fut.result()))
+                else:
+                    still.append((chunk, fut))
+            self._pending = still
+        self.done += len(out)
+        return out
+
+    def cancel(self):
+        """Drop outstanding work; chunks already running on a worker finish but are discarded."""
+        self.cancelled = True
+        for _, fut in self._pending:
+            fut.cancel()
+        self._pending = []
+        self._chunks = []
+
+
+class BackgroundJob:
+    """Run `work(job)` on a daemon thread and hand its output to the GUI thread.
+
+    `work` reports with post(item) and advance(n) and should return early once
+    `cancelled` is set. The GUI drains the items with poll() from a Tk `after` loop,
+    so nothing Tk is touched off the main thread; poll()/cancel()/done/total/finished
+    behave like WellStream's. What `work` returns ends up in `result`, an exception
+    it raises in `error`.
+    """
+
+    def __init__(self, work, total=0, name=""):
+        self.name = name
+        self.total = int(total)
+        self.done = 0                       # sólo lo escribe el hilo del trabajo
+        self.result = None
+        self.error = None
+        self.started = None
+        self._work = work
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._ended = threading.Event()
+
+    def start(self):
+        self.started = time.monotonic()
+        threading.Thread(target=self._run, name=f"dsf-job {self.name}", daemon=True).start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self._work(self)
+        except Exception as e:              # se entrega a la GUI, que decide qué hacer
+            self.error = e
+        finally:
+            self._ended.set()
+
+    # ---- desde el trabajo ----
+    def post(self, item):
+        self._queue.put(item)
+
+    def advance(self, n=1):
+        self.done += n
+
+    def iterate(self, items):
+        """Yield `items`, counting one unit of progress each, until cancelled."""
+        for item in items:
+            if self.cancelled:
+                return
+            yield item
+            self.done += 1
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    # ---- desde la GUI ----
+    @property
+    def finished(self):
+        return self.cancelled or (self._ended.is_set() and self._queue.empty())
+
+    def poll(self):
+        """Items posted since the last poll (none once cancelled)."""
+        out = []
+        while not self.cancelled:
+            try:
+                out.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return out
+
+    def eta(self):
+        """Seconds left at the rate so far, or None before the first unit is done."""
+        if self.started is None or self.done <= 0 or self.total <= 0:
+            return None
+        return (time.monotonic() - self.started) * max(0, self.total - self.done) / self.done
+
+    def cancel(self):
+        """Ask the work to stop; whatever it posts from now on is dropped."""
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        """Block until the work has returned (True) or `timeout` seconds pass (False)."""
+        return self._ended.wait(timeout)
+
+
+def stream_job(stream, name=""):
+    """BackgroundJob that drives a WellStream from its own thread, so that even the
+    serial backend computes off the GUI thread. Posts the stream's (well, result) pairs."""
+    def work(job):
+        while not stream.finished:
+            if job.cancelled:
+                stream.cancel()
+                return
+            out = stream.poll()
+            for item in out:
+                job.post(item)
+            job.advance(len(out))
+            if not out:
+                time.sleep(0.005)           # chunks todavía en el pool
+    return BackgroundJob(work, stream.total, name)
+
+
+class WellExecutor:
+    """Dispatch per-well (or per-chunk) jobs to a serial, thread-pool or process-pool backend.
+
+    Functions sent to the process backend must be importable (module level), and their
+    arguments picklable. The pool is created on first use (from whichever thread gets
+    there first) and reused until close().
+    """
+
+    def __init__(self, backend="serial", workers=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})")
+        self.backend = backend
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self._pool = None
+        self._pool_lock = threading.Lock()  # la GUI y un BackgroundJob pueden pedirlo a la vez
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                cls = ThreadPoolExecutor if self.backend == "thread" else ProcessPoolExecutor
+                self._pool = cls(max_workers=self.workers)
+            return self._pool
+
+    def _parallel(self, n_items):
+        return self.backend != "serial" and self.workers > 1 and n_items > 1
+
+    def map(self, fn, arg_tuples, *extra):
+        """[fn(*args, *extra) for args in arg_tuples], in input order."""
+        arg_tuples = list(arg_tuples)
+        if not self._parallel(len(arg_tuples)):
+            return _run_chunk(fn, arg_tuples, extra)
+        pool = self._get_pool()
+        futures = [pool.submit(_run_chunk, fn, chunk, extra)
+                   for chunk in _split(arg_tuples, self.workers * 4)]
+        out = []
+        for fut in futures:
+            out.extend(fut.result())
+        return out
+
+    def map_wells(self, fn, jobs, *extra):
+        """jobs: iterable of (well, args). Returns [(well, fn(*args, *extra))] in plate order
+        (well_sortkey), whatever the backend and the order of `jobs`."""
+        jobs = sorted(jobs, key=lambda j: (well_sortkey(j[0]), j[0]))
+        results = self.map(fn, [args for _, args in jobs], *extra)
+        return [(w, res) for (w, _), res in zip(jobs, results)]
+
+    def stream_wells(self, fn, jobs, *extra, chunk_size=None):
+        """Like map_wells but returns a WellStream: jobs are queued in plate order and
+        results are collected with poll() as they finish, so a GUI can show them
+        progressively and stop early with cancel()."""
+        jobs = sorted(jobs, key=lambda j: (well_sortkey(j[0]), j[0]))
+        if chunk_size is None:
+            chunk_size = max(1, len(jobs) // (self.workers * 8)) if self._parallel(len(jobs)) else 4
+        return WellStream(self, fn, jobs, extra, chunk_size)
+
+    def map_batches(self, fn, items, *extra):
+        """fn(list_of_items, *extra) -> list, run on one block per worker and concatenated.
+        For functions that are already vectorized over many wells (e.g. compute_tm_batch)."""
+        items = list(items)
+        if not self._parallel(len(items)):
+            return list(_run_batch(fn, items, extra))
+        pool = self._get_pool()
+        futures = [pool.submit(_run_batch, fn, chunk, extra) for chunk in _split(items, self.workers)]
+        out = []
+        for fut in futures:
+            out.extend(fut.result())
+        return out
@@ -0,0 +1,117 @@
+# Undo/redo compacto por pozo (sin tkinter). Cada entrada es el estado del pozo
+# (curva como SparseSteps sobre la original + trim + flag de auto-trim), así que
+# ocupa O(saltos) y no O(puntos). Hay un presupuesto de memoria global: si se
+# supera, se descartan las entradas de undo más antiguas de toda la placa.
+
+from collections import deque
+
+# Presupuesto por defecto para todas las pilas de undo/redo de una placa
+UNDO_BUDGET_BYTES = 32 * 1024 * 1024
+
+_ENTRY_OVERHEAD = 200  # bytes aprox. por entrada además de los arrays (tuplas, objetos)
+
+
+class WellState:
+    """Undoable state of one well."""
+
+    __slots__ = ("steps", "trim", "auto_trimmed")
+
+    def __init__(self, steps, trim, auto_trimmed):
+        self.steps = steps                  # SparseSteps sobre store.orig(well)
+        self.trim = trim                    # (tmin, tmax) o None
+        self.auto_trimmed = auto_trimmed
+
+    @property
+    def nbytes(self):
+        return self.steps.nbytes + _ENTRY_OVERHEAD
+
+
+class UndoLog:
+    """Per-well undo/redo stacks of WellState with one memory budget for the plate.
+
+    push() starts a new branch (clears that well's redo). When the total size goes
+    over budget_bytes, the oldest undo entries of the plate are dropped first.
+    """
+
+    def __init__(self, budget_bytes=UNDO_BUDGET_BYTES):
+        self.budget_bytes = int(budget_bytes)
+        self.clear()
+
+    def clear(self):
+        self._undo = {}                     # w -> [(seq, WellState)]
+        self._redo = {}
+        self._order = deque()               # (seq, w) de las entradas de undo, de la más antigua a la más nueva
+        self._seq = 0
+        self.nbytes = 0
+        self.dropped = 0
+
+    def can_undo(self, well):
+        return bool(self._undo.get(well))
+
+    def can_redo(self, well):
+        return bool(self._redo.get(well))
+
+    def _add(self, stacks, well, state):
+        self._seq += 1
+        stacks.setdefault(well, []).append((self._seq, state))
+        self.nbytes += state.nbytes
+        if stacks is self._undo:
+            self._order.append((self._seq, well))
+            if len(self._order) > 1024 and len(self._order) > 4 * self.stats()["undo"]:
+                # quitar de _order las entradas que ya se deshicieron
+                live = {seq for st in self._undo.values() for seq, _ in st}
+                self._order = deque(o for o in self._order if o[0] in live)
+
+    def _pop(self, stacks, well):
+        _, state = stacks[well].pop()
+        self.nbytes -= state.nbytes
+        return state
+
+    def push(self, well, state):
+        """Record `state` (the well before a change) and forget the well's redo."""
+        for _, st in self._redo.pop(well, []):
+            self.nbytes -= st.nbytes
+        self._add(self._undo, well, state)
+        self._enforce_budget()
+
+    def undo(self, well, current):
+        """Previous state of `well` (current goes to redo), or None."""
+        if not self.can_undo(well):
+            return None
+        prev = self._pop(self._undo, well)
+        self._add(self._redo, well, current)
+        return prev
+
+    def redo(self, well, current):
+        """Next state of `well` (current goes back to undo), or None."""
+        if not self.can_redo(well):
+            return None
+        nxt = self._pop(self._redo, well)
+        self._add(self._undo, well, current)
+        self._enforce_budget()
+        return nxt
+
+    def discard(self, well):
+        """Drop the newest undo entry of `well` without a redo (for rolling back a change
+        that is being abandoned). Returns that state, or None."""
+        if not self.can_undo(well):
+            return None
+        return self._pop(self._undo, well)
+
+    def _enforce_budget(self):
+        while self.nbytes > self.budget_bytes and self._order:
+            seq, well = self._order.popleft()
+            stack = self._undo.get(well)
+            # entradas ya deshechas no están en la pila: sólo se quita si sigue siendo la más antigua
+            if stack and stack[0][0] == seq:
+                _, state = stack.pop(0)
+                self.nbytes -= state.nbytes
+                self.dropped += 1
+
+    def stats(self):
+        return {
+            "undo": sum(len(s) for s in self._undo.values()),
+            "redo": sum(len(s) for s in self._redo.values()),
+            "bytes": self.nbytes,
+            "dropped": self.dropped,
+        }
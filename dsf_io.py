@@ -0,0 +1,237 @@
+# Lectura / escritura de ficheros .gdsf (sin tkinter).
+# El lector construye directamente el PlateStore, por bloques si el fichero es grande,
+# para que el pico de memoria se quede cerca del tamaño final de los arrays.
+
+import os
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from dsf_core import GDSF_COLUMNS
+from dsf_store import PlateStore
+
+# pyarrow es opcional: sólo acelera la lectura de ficheros que caben de una vez
+try:
+    import pyarrow  # noqa: F401
+    _FAST_ENGINE = "pyarrow"
+except Exception:
+    _FAST_ENGINE = "c"
+
+# Ficheros mayores que esto se leen por bloques de CHUNK_ROWS filas
+STREAM_THRESHOLD_BYTES = 64 * 1024 * 1024
+CHUNK_ROWS = 1_000_000
+
+_TYPED_OPTS = dict(
+    sep="\t", header=None, names=GDSF_COLUMNS, usecols=[0, 1, 2],
+    dtype={"Well": "category", "Temperature": "float64", "Fluorescence": "float64"},
+)
+
+
+def _count_lines(path, block=1 << 24):
+    """Upper bound on the number of data rows (newlines + a possible last line)."""
+    n = 0
+    with open(path, "rb") as fh:
+        while True:
+            buf = fh.read(block)
+            if not buf:
+                break
+            n += buf.count(b"\n")
+    return n + 1
+
+
+def _normalize_chunk(codes, names, temp, fluo):
+    """Normalize well names (upper/strip) and drop rows without a well name (code -1)
+    or without numeric T/F."""
+    names = [str(nm).upper().strip() for nm in names]
+    ok = (codes >= 0) & ~(np.isnan(temp) | np.isnan(fluo))
+    if not ok.all():
+        codes, temp, fluo = codes[ok], temp[ok], fluo[ok]
+    return codes, names, temp, fluo
+
+
+def _engine_opts(engine):
+    return dict(engine=engine, float_precision="round_trip") if engine == "c" else dict(engine=engine)
+
+
+def _iter_typed_chunks(path, chunksize):
+    """Fast path: typed columns; raises ValueError on non-numeric fields."""
+    # el motor C, con round_trip, da los mismos floats que pyarrow: lo leído (y la Tm)
+    # no depende del tamaño del fichero ni de si pyarrow está instalado
+    if chunksize is None:
+        reader = [pd.read_csv(path, **_engine_opts(_FAST_ENGINE), **_TYPED_OPTS)]
+    else:
+        reader = pd.read_csv(path, chunksize=chunksize, **_engine_opts("c"), **_TYPED_OPTS)
+    for df in reader:
+        well = df["Well"]
+        yield _normalize_chunk(
+            well.cat.codes.to_numpy(), list(well.cat.categories),
+            df["Temperature"].to_numpy(dtype=float), df["Fluorescence"].to_numpy(dtype=float),
+        )
+
+
+def _to_float(col):
+    """Numeric column from strings; non-numeric -> NaN. pd.to_numeric only decides
+    what is a number: its parser is not correctly rounded, astype(float) is (same
+    values as the typed path)."""
+    num = pd.to_numeric(col, errors="coerce")
+    ok = num.notna().to_numpy()
+    out = np.full(len(col), np.nan)
+    try:
+        out[ok] = col[ok].astype(float).to_numpy()
+    except (ValueError, TypeError):
+        out[ok] = num[ok].to_numpy(dtype=float)
+    return out
+
+
+def _iter_tolerant_chunks(path, chunksize):
+    """Slow path for files with headers/garbage: non-numeric values become NaN and are dropped."""
+    opts = dict(sep="\t", header=None, names=GDSF_COLUMNS, usecols=[0, 1, 2], dtype=str)
+    if chunksize is None:
+        reader = [pd.read_csv(path, **opts)]
+    else:
+        reader = pd.read_csv(path, chunksize=chunksize, **opts)
+    for df in reader:
+        codes, names = pd.factorize(df["Well"])     # pozo vacío -> -1, se descarta
+        yield _normalize_chunk(
+            codes, list(names),
+            _to_float(df["Temperature"]), _to_float(df["Fluorescence"]),
+        )
+
+
+def _fill_buffers(chunks, n_max):
+    """Copy chunks into preallocated flat buffers; well codes are made global."""
+    codes = np.empty(n_max, dtype=np.int32)
+    temp = np.empty(n_max, dtype=float)
+    fluo = np.empty(n_max, dtype=float)
+    name_code = {}
+    n = 0
+    for c_codes, c_names, c_temp, c_fluo in chunks:
+        remap = np.array([name_code.setdefault(nm, len(name_code)) for nm in c_names], dtype=np.int32)
+        m = len(c_temp)
+        if n + m > n_max:
+            raise ValueError("Unexpected number of rows while reading file")
+        codes[n:n+m] = remap[c_codes]
+        temp[n:n+m] = c_temp
+        fluo[n:n+m] = c_fluo
+        n += m
+    return codes[:n], list(name_code), temp[:n], fluo[:n]
+
+
+def load_plate(path, chunksize="auto"):
+    """Read a .gdsf (Well, Temperature, Fluorescence; tab-separated, no header)
+    straight into a PlateStore.
+
+    chunksize: rows per block; None reads the file at once and "auto" streams
+    files larger than STREAM_THRESHOLD_BYTES in blocks of CHUNK_ROWS.
+    """
+    if chunksize == "auto":
+        chunksize = CHUNK_ROWS if os.path.getsize(path) > STREAM_THRESHOLD_BYTES else None
+    n_max = _count_lines(path)
+    try:
+        cols = _fill_buffers(_iter_typed_chunks(path, chunksize), n_max)
+    except (ValueError, TypeError):
+        cols = _fill_buffers(_iter_tolerant_chunks(path, chunksize), n_max)
+    return PlateStore.from_codes(*cols)
+
+
+# ------------------------ sidecar cache (.gdsf.npz) ------------------------
+# Guarda los arrays ya ordenados + Tm y estadísticas de saltos por pozo, para que
+# reabrir la misma placa no tenga que parsear ni analizar nada.
+SIDECAR_SUFFIX = ".npz"
+SIDECAR_VERSION = 1
+
+
+def sidecar_path(path):
+    return path + SIDECAR_SUFFIX
+
+
+def _file_hash(path, block=1 << 24):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        while True:
+            buf = fh.read(block)
+            if not buf:
+                break
+            h.update(buf)
+    return h.hexdigest()
+
+
+def source_key(path):
+    """(size, mtime_ns, content hash) of the source file; keys its sidecar."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns, _file_hash(path)
+
+
+def save_sidecar(path, store, key=None):
+    """Write the sidecar of `path` for `store` (original curves only).
+    Best effort: returns False if it cannot be written (e.g. read-only folder).
+    """
+    target = sidecar_path(path)
+    tmp = target + ".tmp"
+    try:
+        size, mtime, digest = key or source_key(path)
+        arrays = dict(
+            version=SIDECAR_VERSION, src_size=size, src_mtime_ns=mtime, src_hash=digest,
+            wells=np.array(store.wells, dtype=str), temperature=store.temperature,
+            fluo_orig=store.fluo_orig, offsets=store.offsets, jump=store.jump_table(),
+        )
+        if store.tm_orig is not None:
+            strength, tms = store.tm_orig
+            arrays["tm_strength"] = strength
+            arrays["tm"] = np.array([np.nan if tms.get(w) is None else tms[w] for w in store.wells], dtype=float)
+        with open(tmp, "wb") as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp, target)
+        return True
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+
+def load_sidecar(path, key=None):
+    """PlateStore from the sidecar of `path`, or None if missing, stale or unreadable."""
+    target = sidecar_path(path)
+    if not os.path.exists(target):
+        return None
+    try:
+        size, mtime, digest = key or source_key(path)
+        with np.load(target, allow_pickle=False) as z:
+            if (int(z["version"]) != SIDECAR_VERSION or int(z["src_size"]) != size
+                    or int(z["src_mtime_ns"]) != mtime or str(z["src_hash"]) != digest):
+                return None
+            store = PlateStore(z["wells"].tolist(), z["temperature"], z["fluo_orig"], z["offsets"], jump=z["jump"])
+            if "tm" in z.files:
+                store.tm_orig = (int(z["tm_strength"]), {
+                    w: (None if np.isnan(tm) else float(tm)) for w, tm in zip(store.wells, z["tm"])
+                })
+        return store
+    except Exception:
+        return None
+
+
+def open_plate(path, cache=True):
+    """load_plate() through the sidecar cache. Returns (store, from_cache).
+    A missing or stale sidecar is rebuilt here (without Tm).
+    """
+    if not cache:
+        return load_plate(path), False
+    key = source_key(path)
+    store = load_sidecar(path, key)
+    if store is not None:
+        return store, True
+    store = load_plate(path)
+    save_sidecar(path, store, key)
+    return store, False
+
+
+def write_gdsf(df, path):
+    df.to_csv(path, sep="\t", header=False, index=False, float_format="%.10g")
+
+
+def write_tm_table(df, path):
+    sep = "\t" if path.lower().endswith(".tsv") else ","
+    df.to_csv(path, sep=sep, index=False, float_format="%.6g")
@@ -0,0 +1,155 @@
+# Diario de sesión (JSON lines) junto al .gdsf: <archivo>.gdsf.journal
+# Cada línea es el estado final de un pozo tras una edición (curva como saltos sobre
+# la original, trim, flags), así que reabrir sólo tiene que aplicar el último estado
+# de cada pozo. Se escribe en append y se hace fsync por lotes.
+
+import os
+import json
+import time
+
+import numpy as np
+
+from dsf_store import SparseSteps
+
+JOURNAL_SUFFIX = ".journal"
+BACKUP_SUFFIX = ".bak"
+JOURNAL_VERSION = 1
+SYNC_EVERY = 64             # registros sin fsync como máximo...
+SYNC_INTERVAL_S = 2.0       # ...o segundos desde el último fsync
+
+
+def journal_path(path):
+    return path + JOURNAL_SUFFIX
+
+
+def encode_state(well, steps, trim, auto_trimmed, deleted, corrected):
+    """JSON-ready record of one well's state (floats round-trip exactly)."""
+    return {
+        "w": well,
+        "idx": steps.idx.tolist(), "lvl": steps.level.tolist(),
+        "fi": steps.fix_idx.tolist(), "fv": steps.fix_val.tolist(),
+        "trim": None if trim is None else [float(trim[0]), float(trim[1])],
+        "auto": bool(auto_trimmed), "del": bool(deleted), "corr": bool(corrected),
+    }
+
+
+def decode_steps(rec, n):
+    """SparseSteps of a record for a well with n points."""
+    return SparseSteps(
+        n, np.asarray(rec["idx"], dtype=np.int32), np.asarray(rec["lvl"], dtype=float),
+        np.asarray(rec["fi"], dtype=np.int32), np.asarray(rec["fv"], dtype=float),
+    )
+
+
+class SessionJournal:
+    """Append-only journal of well states for one .gdsf.
+
+    Best effort, like the sidecar: if the file cannot be written the journal just
+    turns itself off (`enabled` is False) and editing carries on.
+    """
+
+    def __init__(self, path, key):
+        self.path = journal_path(path)
+        self.key = [int(key[0]), str(key[1])]       # (tamaño, hash) del .gdsf
+        self._fh = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @property
+    def enabled(self):
+        return self._fh is not None
+
+    def _header(self):
+        return json.dumps({"journal": JOURNAL_VERSION, "src": self.key}) + "\n"
+
+    def read(self):
+        """Last record per well from an existing journal of the same file (file order),
+        or [] if there is none, it belongs to another version of the file, or is unreadable.
+        A torn last line (crash while writing) is ignored."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                head = json.loads(fh.readline() or "null")
+                if not isinstance(head, dict) or head.get("journal") != JOURNAL_VERSION or head.get("src") != self.key:
+                    return []
+                last = {}
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        break
+                    last.pop(rec["w"], None)
+                    last[rec["w"]] = rec
+                return list(last.values())
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+
+    def start(self, records=()):
+        """(Re)write the journal as header + `records` and keep it open for appends."""
+        self.close()
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(self._header())
+                for rec in records:
+                    fh.write(json.dumps(rec) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp, self.path)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            self._fh = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, rec):
+        if self._fh is None:
+            return
+        try:
+            self._fh.write(json.dumps(rec) + "\n")
+            self._fh.flush()            # al SO enseguida; fsync por lotes
+            self._unsynced += 1
+            if self._unsynced >= SYNC_EVERY or time.monotonic() - self._last_sync >= SYNC_INTERVAL_S:
+                self.sync()
+        except OSError:
+            self.close()
+
+    def sync(self):
+        if self._fh is None or not self._unsynced:
+            return
+        try:
+            os.fsync(self._fh.fileno())
+        except OSError:
+            pass
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def backup(self):
+        """Move the existing journal aside to <journal>.bak (replacing an older one).
+        Returns the backup path, or None if there was nothing to move."""
+        target = self.path + BACKUP_SUFFIX
+        try:
+            os.replace(self.path, target)
+            return target
+        except OSError:
+            return None
+
+    def discard(self):
+        """Close and delete the journal (clean end of the session)."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        if self._fh is not None:
+            self.sync()
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+            self._fh = None
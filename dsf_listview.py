@@ -0,0 +1,201 @@
+# Lista "virtual" para placas grandes (1536 pozos). El modelo guarda todas las filas
+# (texto + colores) y en Tk sólo existen las que se ven; al actualizar el modelo se
+# compara con lo que hay en pantalla y sólo se tocan las filas visibles que cambian.
+# La API (curselection, selection_set, see, get, bind...) usa índices del modelo,
+# como un tk.Listbox, para que el resto de la GUI no tenga que saber nada de esto.
+
+import tkinter as tk
+from tkinter import ttk
+
+_DEFAULT_ROWS = 40      # filas materializadas hasta conocer la altura real del widget
+_WHEEL_ROWS = 3
+
+
+class VirtualListbox(ttk.Frame):
+    """Single-selection list over a row model of (label, bg, fg) tuples.
+
+    Colours may be None (listbox default). Only the rows in view exist in the inner
+    tk.Listbox; set_rows() diffs against them, so a change costs Tk calls only for the
+    visible rows whose label or colour actually changed.
+    """
+
+    def __init__(self, master, **listbox_kw):
+        super().__init__(master)
+        self.listbox = tk.Listbox(self, exportselection=False, **listbox_kw)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.rows = []
+        self.top = 0                        # fila del modelo que se ve arriba del todo
+        self.selected = None                # índice del modelo seleccionado (o None)
+        self._shown = []                    # filas materializadas ahora mismo en el Listbox
+        self._shown_sel = None
+        self._n_visible = _DEFAULT_ROWS
+        self._select_handlers = []
+
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<Configure>", self._on_configure)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.listbox.bind(seq, self._on_wheel)
+        self.listbox.bind("<Up>", lambda e: self._key_move(-1))
+        self.listbox.bind("<Down>", lambda e: self._key_move(+1))
+
+    # ---- modelo ----
+    def set_rows(self, rows, keep_selection=True):
+        """Replace the model. The selection (by index) is kept unless keep_selection is
+        False, like deleting and re-inserting everything in a Listbox would do."""
+        self.rows = list(rows)
+        if not keep_selection or (self.selected is not None and self.selected >= len(self.rows)):
+            self.selected = None
+        self.top = self._clamp_top(self.top)
+        self._render()
+
+    def size(self):
+        return len(self.rows)
+
+    def get(self, i):
+        return self.rows[self._index(i)][0]
+
+    # ---- selección / scroll (índices del modelo) ----
+    def curselection(self):
+        return () if self.selected is None else (self.selected,)
+
+    def selection_set(self, i, *_):
+        i = self._index(i)
+        self.selected = i if 0 <= i < len(self.rows) else None
+        self._sync_selection()
+
+    def selection_clear(self, *_):
+        self.selected = None
+        self._sync_selection()
+
+    def see(self, i):
+        i = self._index(i)
+        n = max(1, self._n_visible - 1)     # la última fila suele verse cortada
+        if i < self.top:
+            self._scroll_to(i)
+        elif i >= self.top + n:
+            self._scroll_to(i - n + 1)
+
+    def nearest(self, y):
+        return min(self.top + self.listbox.nearest(y), max(0, len(self.rows) - 1))
+
+    def yview(self, *args):
+        """Scrollbar protocol ("moveto f" / "scroll n units|pages")."""
+        if not args:
+            total = max(1, len(self.rows))
+            return (self.top / total, min(1.0, (self.top + self._n_visible) / total))
+        if args[0] == "moveto":
+            self._scroll_to(int(round(float(args[1]) * len(self.rows))))
+        elif args[0] == "scroll":
+            n = int(args[1])
+            self._scroll_to(self.top + (n * max(1, self._n_visible - 1) if args[2] == "pages" else n))
+
+    def bind(self, sequence=None, func=None, add=None):
+        if sequence == "<<ListboxSelect>>":
+            self._select_handlers.append(func)
+            return None
+        return self.listbox.bind(sequence, func, add)
+
+    def focus_set(self):
+        self.listbox.focus_set()
+
+    # ---- interno ----
+    def _index(self, i):
+        return len(self.rows) if i == tk.END else int(i)
+
+    def _clamp_top(self, top):
+        return max(0, min(int(top), len(self.rows) - max(1, self._n_visible - 1)))
+
+    def _scroll_to(self, top):
+        top = self._clamp_top(top)
+        d = top - self.top
+        if d == 0:
+            return
+        # desplazar lo que ya está materializado en vez de reescribir todas las filas
+        if 0 < d < len(self._shown):
+            self.listbox.delete(0, d - 1)
+            del self._shown[:d]
+        elif 0 < -d < len(self._shown):
+            new = [self.rows[i][0] for i in range(top, self.top)]
+            self.listbox.insert(0, *new)
+            self._shown[:0] = [(label, None, None) for label in new]
+        self._shown_sel = None
+        self.top = top
+        self._render()
+
+    def _render(self):
+        n = max(0, min(self._n_visible, len(self.rows) - self.top))
+        if len(self._shown) > n:
+            self.listbox.delete(n, tk.END)
+            del self._shown[n:]
+        lb = self.listbox
+        for r in range(n):
+            row = self.rows[self.top + r]
+            if r >= len(self._shown):
+                lb.insert(tk.END, row[0])
+                self._shown.append((row[0], None, None))
+            old = self._shown[r]
+            if old == row:
+                continue
+            if old[0] != row[0]:
+                lb.delete(r)
+                lb.insert(r, row[0])
+                old = (row[0], None, None)          # las opciones de la fila se pierden al reinsertar
+                self._shown_sel = None
+            if old[1:] != row[1:]:
+                lb.itemconfig(r, bg=row[1] or "", fg=row[2] or "")
+            self._shown[r] = row
+        self._sync_selection()
+        total = max(1, len(self.rows))
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + n) / total))
+
+    def _sync_selection(self):
+        r = None if self.selected is None else self.selected - self.top
+        if r is not None and not 0 <= r < len(self._shown):
+            r = None
+        if r == self._shown_sel:
+            return
+        self.listbox.selection_clear(0, tk.END)
+        if r is not None:
+            self.listbox.selection_set(r)
+            self.listbox.activate(r)
+        self._shown_sel = r
+
+    def _fire_select(self, event=None):
+        for fn in self._select_handlers:
+            fn(event)
+
+    def _on_listbox_select(self, event):
+        cur = self.listbox.curselection()
+        if not cur:
+            return
+        self.selected = self.top + int(cur[0])
+        self._shown_sel = int(cur[0])
+        self._fire_select(event)
+
+    def _key_move(self, step):
+        if not self.rows:
+            return "break"
+        i = 0 if self.selected is None else max(0, min(len(self.rows) - 1, self.selected + step))
+        self.selection_set(i)
+        self.see(i)
+        self._fire_select()
+        return "break"
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self.top - _WHEEL_ROWS)
+        else:
+            self._scroll_to(self.top + _WHEEL_ROWS)
+        return "break"
+
+    def _on_configure(self, event):
+        bbox = self.listbox.bbox(0) if self._shown else None
+        row_h = bbox[3] + 1 if bbox else 18
+        n = max(1, event.height // max(1, row_h) + 1)
+        if n != self._n_visible:
+            self._n_visible = n
+            self.top = self._clamp_top(self.top)
+            self._render()
@@ -0,0 +1,474 @@
+# Vista de un pozo (curva + derivada) con artists persistentes: se crean una vez y
+# después sólo se actualizan con set_data. El cursor del índice (línea + punto +
+# entrada de la leyenda) es "animated" y se pinta con blitting sobre un fondo
+# guardado, así que mover el slider no vuelve a dibujar la figura entera.
+# PlateMap: vista de la placa entera como una sola imagen (un píxel por pozo).
+# PlateGrid: "small multiples", la curva de cada pozo en su celda, un LineCollection por capa.
+# Las curvas densas se dibujan diezmadas (min/max por píxel, sólo puntos reales) y el
+# resultado se guarda por pozo y versión de datos; el cursor y la Tm usan la curva entera.
+
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.collections import LineCollection
+from matplotlib.colors import Normalize, to_rgba
+from matplotlib.patches import Rectangle
+
+from dsf_core import well_position
+
+_NAN2 = [np.nan, np.nan]
+
+# formatos de placa estándar (filas, columnas); si no cabe, se usa el tamaño justo
+PLATE_FORMATS = [(8, 12), (16, 24), (32, 48)]
+
+DECIMATE_CACHE_ENTRIES = 96         # trazas diezmadas guardadas (3 por pozo visitado)
+
+
+def minmax_decimate(x, y, n_bins):
+    """Shape-preserving subset of (x, y) for plotting at about n_bins pixels wide.
+
+    The points are cut into n_bins consecutive chunks and the min and max of each chunk
+    are kept in their original order, plus the first and last point, so spikes and
+    steps survive and every point drawn is a real data point. Curves that already have
+    no more than 2·n_bins points are returned as they are.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    n_bins = max(1, int(n_bins))
+    if n <= 2 * n_bins:
+        return x, y
+    k = -(-n // n_bins)                     # puntos por trozo
+    m = (n // k) * k
+    yb = y[:m].reshape(-1, k)
+    base = np.arange(0, m, k)
+    i_min = base + np.nanargmin(yb, axis=1)
+    i_max = base + np.nanargmax(yb, axis=1)
+    parts = [i_min, i_max, [0, n - 1]]
+    if m < n:
+        tail = y[m:]
+        parts.append([m + int(np.nanargmin(tail)), m + int(np.nanargmax(tail))])
+    idx = np.unique(np.concatenate(parts))
+    return x[idx], y[idx]
+
+
+class CurvePlot:
+    """Persistent artists for the main and derivative axes of the well view.
+
+    update() sets every layer and asks for one full redraw; move_cursor() only
+    changes the index cursor and blits it when the saved background is current.
+    """
+
+    def __init__(self, canvas, ax, axd):
+        self.canvas, self.ax, self.axd = canvas, ax, axd
+        self.fig = ax.figure
+
+        self.orig_line, = ax.plot([], [], color="C0", alpha=0.5, linewidth=1, label="Original")
+        self.corr_line, = ax.plot([], [], color="C1", linewidth=1.6, label="Corrected")
+        self.deriv_line, = axd.plot([], [], color="C0", linewidth=1)
+        self.tm_lines = [ax.axvline(0, color="C0", linestyle=":", alpha=0.4),
+                         axd.axvline(0, color="C0", linestyle=":", alpha=0.8)]
+        self.range_lines = [a.axvline(0, color="C0", linestyle="--", alpha=0.3) for a in (ax, ax, axd, axd)]
+        self.tm_text = ax.text(
+            0.02, 0.95, "", transform=ax.transAxes, ha="left", va="top", fontsize=10,
+            bbox=dict(boxstyle="round,pad=0.25", fc="#ffffff", ec="none", alpha=0.75),
+        )
+        # cursor (animated: fuera del dibujo normal, se pinta en _draw_animated)
+        self.cursor_line = ax.axvline(0, color="C0", linestyle="--", alpha=0.6, animated=True)
+        self.cursor_pt, = ax.plot([], [], "o", color="C0", markersize=6.3, zorder=5, label="i=0", animated=True)
+        self.legend = None
+        self._legend_key = None
+
+        ax.set_ylabel("Fluorescence")
+        axd.set_xlabel("Temperature")
+        axd.set_ylabel("-dF/dT (oriented up)")
+
+        self._cx = self._cy = None          # curva en la que se mueve el cursor (sin diezmar)
+        self._decimated = OrderedDict()     # (clave, capa, ancho) -> (x, y) diezmados
+        self._bg = None                     # fondo sin artists animados (tras el último draw)
+        self._full_pending = False
+        canvas.mpl_connect("draw_event", self._on_draw)
+        self.clear()
+
+    # ---- helpers ----
+    @staticmethod
+    def _set_xy(line, xy):
+        if xy is None:
+            line.set_data([], [])
+            line.set_visible(False)
+        else:
+            line.set_data(xy[0], xy[1])
+            line.set_visible(True)
+
+    @staticmethod
+    def _set_vline(line, x):
+        ok = x is not None and np.isfinite(x)
+        line.set_xdata([x, x] if ok else _NAN2)
+        line.set_visible(ok)
+
+    def _animated(self):
+        arts = [self.corr_line] if self.corr_line.get_animated() else []
+        arts += [self.cursor_line, self.cursor_pt]
+        if self.legend is not None:
+            arts.append(self.legend)
+        return arts
+
+    def _update_legend(self):
+        handles = [h for h in (self.orig_line, self.corr_line, self.cursor_pt) if h.get_visible()]
+        key = tuple(id(h) for h in handles)
+        if key != self._legend_key:
+            if self.legend is not None:
+                self.legend.remove()
+            self.legend = self.ax.legend(handles=handles, loc="upper right") if handles else None
+            if self.legend is not None:
+                self.legend.set_animated(True)
+            self._legend_key = key
+        if self.legend is not None and self.cursor_pt.get_visible():
+            self.legend.get_texts()[-1].set_text(self.cursor_pt.get_label())
+
+    @property
+    def cursor_span(self):
+        """Number of points the cursor can move over (0 if there is no corrected trace)."""
+        return 0 if self._cx is None else len(self._cx)
+
+    # ---- layers ----
+    def clear(self):
+        for line in (self.orig_line, self.corr_line, self.deriv_line, self.cursor_pt):
+            self._set_xy(line, None)
+        for line in self.tm_lines + self.range_lines + [self.cursor_line]:
+            self._set_vline(line, None)
+        self.tm_text.set_visible(False)
+        self._cx = self._cy = None
+        self._update_legend()
+        self.redraw()
+
+    def _pixels(self):
+        return max(50, int(self.ax.bbox.width))
+
+    def _display(self, xy, key=None):
+        """Decimated copy of a layer for drawing; cached when the caller gives a key
+        that changes with the data (e.g. well + version)."""
+        if xy is None:
+            return None
+        px = self._pixels()
+        if len(xy[0]) <= 2 * px:
+            return xy
+        if key is None:
+            return minmax_decimate(xy[0], xy[1], px)
+        ck = (key, px)
+        hit = self._decimated.get(ck)
+        if hit is None:
+            hit = self._decimated[ck] = minmax_decimate(xy[0], xy[1], px)
+            if len(self._decimated) > DECIMATE_CACHE_ENTRIES:
+                self._decimated.popitem(last=False)
+        else:
+            self._decimated.move_to_end(ck)
+        return hit
+
+    def forget_decimated(self):
+        """Drop the cached decimated traces (a new plate was loaded)."""
+        self._decimated.clear()
+
+    def update(self, orig, corrected=None, deriv=None, tm=None, tm_on_deriv=True, t_range=None,
+               range_on_deriv=True, cursor=None, tm_color="#111111", keys=None):
+        """Set every layer and redraw. orig/corrected/deriv are (x, y) or None; cursor is an
+        index into `corrected` (None hides it). `keys` ({"orig"|"corrected"|"deriv": key})
+        lets the decimated traces be reused while the key stays the same."""
+        keys = keys or {}
+        for line, layer, xy in ((self.orig_line, "orig", orig), (self.corr_line, "corrected", corrected),
+                                (self.deriv_line, "deriv", deriv)):
+            key = keys.get(layer)
+            self._set_xy(line, self._display(xy, None if key is None else (layer, key)))
+        self._set_vline(self.tm_lines[0], tm)
+        self._set_vline(self.tm_lines[1], tm if tm_on_deriv else None)
+        lo, hi = t_range if t_range is not None else (None, None)
+        if lo is None or hi is None or not lo < hi:
+            lo = hi = None
+        for k, line in enumerate(self.range_lines):
+            self._set_vline(line, None if (k >= 2 and not range_on_deriv) else (lo, hi)[k % 2])
+        if tm is not None and np.isfinite(tm):
+            self.tm_text.set_text(f"Tm = {tm:.2f} °C")
+            self.tm_text.set_color(tm_color)
+            self.tm_text.set_visible(True)
+        else:
+            self.tm_text.set_visible(False)
+        self._cx, self._cy = (None, None) if corrected is None else corrected
+        self._set_cursor(cursor)
+        self._update_legend()
+        for a in (self.ax, self.axd):
+            a.relim(visible_only=True)
+            a.autoscale_view()
+        self.redraw()
+
+    # ---- transición (animación de una corrección) ----
+    def start_transition(self):
+        """Make the corrected trace animated: frames then only blit that line."""
+        if not self.corr_line.get_animated():
+            self.corr_line.set_animated(True)
+            self.redraw()
+
+    def transition_frame(self, corrected):
+        """Show one frame of the corrected trace (no rescale, no full redraw)."""
+        self._set_xy(self.corr_line, self._display(corrected))
+        self._blit()
+
+    def end_transition(self):
+        if self.corr_line.get_animated():
+            self.corr_line.set_animated(False)
+            self.redraw()
+
+    def _set_cursor(self, i):
+        if i is None or self._cx is None or len(self._cx) < 2:
+            self._set_vline(self.cursor_line, None)
+            self._set_xy(self.cursor_pt, None)
+            return
+        i = max(0, min(int(i), len(self._cx) - 1))
+        x, y = self._cx[i], self._cy[i]
+        self._set_vline(self.cursor_line, x)
+        self._set_xy(self.cursor_pt, ([x], [y]))
+        self.cursor_pt.set_label(f"i={i}")
+
+    # ---- dibujo ----
+    def redraw(self):
+        self._full_pending = True
+        self.canvas.draw_idle()
+
+    def move_cursor(self, i):
+        """Move the index cursor; blitted on top of the last full draw."""
+        shown = self.cursor_pt.get_visible()
+        self._set_cursor(i)
+        if shown != self.cursor_pt.get_visible():
+            self._update_legend()
+            self.redraw()
+            return
+        self._update_legend()
+        self._blit()
+
+    def _blit(self):
+        if self._bg is None or self._full_pending:
+            return                          # el draw pendiente ya pinta el estado nuevo
+        self.canvas.restore_region(self._bg)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    def _draw_animated(self):
+        for a in self._animated():
+            if a.get_visible():
+                self.fig.draw_artist(a)
+
+    def _on_draw(self, event):
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._full_pending = False
+        self._draw_animated()
+
+
+def plate_layout(wells):
+    """({well: (row, col)}, n_rows, n_cols) of a plate, snapped to PLATE_FORMATS when it fits."""
+    pos = {w: p for w, p in ((w, well_position(w)) for w in wells) if p is not None}
+    nr = max((p[0] for p in pos.values()), default=0) + 1
+    nc = max((p[1] for p in pos.values()), default=0) + 1
+    for fr, fc in PLATE_FORMATS:
+        if nr <= fr and nc <= fc:
+            return pos, fr, fc
+    return pos, nr, nc
+
+
+def _row_name(r):
+    name = ""
+    r += 1
+    while r:
+        r, k = divmod(r - 1, 26)
+        name = chr(ord("A") + k) + name
+    return name
+
+
+def _plate_ticks(ax, nr, nc, offset=0.0):
+    rstep = max(1, nr // 8)
+    cstep = max(1, nc // 12)
+    ax.set_yticks([r + offset for r in range(0, nr, rstep)], [_row_name(r) for r in range(0, nr, rstep)])
+    ax.set_xticks([c + offset for c in range(0, nc, cstep)], [str(c + 1) for c in range(0, nc, cstep)])
+
+
+class PlateMap:
+    """Plate-layout overview drawn as one image (one pixel per well).
+
+    update() takes {well: (tm, state)} and recolours only the cells whose value
+    changed since the last call; mode "tm" colours by Tm (deleted wells grey),
+    mode "qc" by state with `palette` (state -> colour).
+    """
+
+    def __init__(self, canvas, ax, palette, cmap="viridis"):
+        self.canvas, self.ax = canvas, ax
+        self.palette = {k: to_rgba(c) for k, c in palette.items()}
+        self.cmap = colormaps[cmap]
+        self.norm = Normalize(0.0, 1.0)
+        self.mode = "tm"
+        self.empty = to_rgba("#ffffff")
+        self.pos = {}                       # pozo -> (fila, columna)
+        self._at = {}                       # (fila, columna) -> pozo
+        self._shown = {}                    # pozo -> (tm, estado) pintado ahora
+        self._rgba = np.ones((1, 1, 4))
+        self.image = ax.imshow(self._rgba, interpolation="nearest", aspect="auto")
+        self.marker = Rectangle((0, 0), 1, 1, fill=False, edgecolor="#d00000", linewidth=1.5, visible=False)
+        ax.add_patch(self.marker)
+        ax.tick_params(labelsize=7, length=0)
+
+    def set_wells(self, wells):
+        """Lay out the plate for `wells` (wells with unparsable names are left out)."""
+        self.pos, nr, nc = plate_layout(wells)
+        self._at = {p: w for w, p in self.pos.items()}
+        self._rgba = np.ones((nr, nc, 4))
+        self._shown = {}
+        self.image.set_data(self._rgba)
+        self.image.set_extent((-0.5, nc - 0.5, nr - 0.5, -0.5))
+        _plate_ticks(self.ax, nr, nc)
+        self.marker.set_visible(False)
+        self.canvas.draw_idle()
+
+    def set_mode(self, mode):
+        if mode != self.mode:
+            self.mode = mode
+            self._shown = {}                # hay que repintar todo
+
+    def set_tm_range(self, lo, hi):
+        if not (np.isfinite(lo) and np.isfinite(hi)):
+            lo, hi = 0.0, 1.0
+        if hi <= lo:
+            lo, hi = lo - 0.5, hi + 0.5
+        if (lo, hi) != (self.norm.vmin, self.norm.vmax):
+            self.norm = Normalize(lo, hi)
+            if self.mode == "tm":
+                self._shown = {}
+
+    def _colour(self, tm, state):
+        if self.mode == "qc" or state == "deleted":
+            return self.palette.get(state, self.empty)
+        if tm is None or not np.isfinite(tm):
+            return self.empty
+        return self.cmap(self.norm(tm))
+
+    def update(self, cells):
+        """Recolour the cells of {well: (tm, state)} that changed; returns how many did."""
+        changed = 0
+        for w, val in cells.items():
+            p = self.pos.get(w)
+            if p is None or self._shown.get(w) == val:
+                continue
+            self._rgba[p[0], p[1]] = self._colour(*val)
+            self._shown[w] = val
+            changed += 1
+        if changed:
+            self.image.set_data(self._rgba)
+            self.canvas.draw_idle()
+        return changed
+
+    def well_at(self, x, y):
+        if x is None or y is None:
+            return None
+        return self._at.get((int(round(y)), int(round(x))))
+
+    def mark(self, well):
+        """Outline the cell of `well` (None hides the outline)."""
+        p = self.pos.get(well)
+        vis = p is not None
+        if vis:
+            self.marker.set_xy((p[1] - 0.5, p[0] - 0.5))
+        if vis or self.marker.get_visible():
+            self.marker.set_visible(vis)
+            self.canvas.draw_idle()
+
+
+class PlateGrid:
+    """Small multiples: every well's curve (and optionally derivative) in its plate cell.
+
+    Each layer is one LineCollection for the whole plate. Curves are scaled into their
+    cell (x over the plate T range, y min-max per well). update() fetches data only for
+    wells whose key changed and recolours by state with `palette`.
+    """
+
+    PAD = 0.1                               # margen dentro de cada celda
+
+    def __init__(self, canvas, ax, palette):
+        self.canvas, self.ax = canvas, ax
+        self.palette = {k: to_rgba(c) for k, c in palette.items()}
+        self.curves = LineCollection([], linewidths=0.7)
+        self.derivs = LineCollection([], linewidths=0.6, alpha=0.45)
+        ax.add_collection(self.derivs)
+        ax.add_collection(self.curves)
+        ax.tick_params(labelsize=7, length=0)
+        self.show_deriv = False
+        self.pos = {}
+        self.order = []
+        self.t_range = (0.0, 1.0)
+        self._at = {}
+        self._keys = {}                     # pozo -> (clave curva, clave derivada, estado)
+        self._curve = {}                    # pozo -> segmento en coordenadas de la rejilla
+        self._deriv = {}
+
+    def set_wells(self, wells, t_range):
+        self.pos, nr, nc = plate_layout(wells)
+        self.order = [w for w in wells if w in self.pos]
+        self._at = {p: w for w, p in self.pos.items()}
+        lo, hi = t_range
+        self.t_range = (lo, hi) if hi > lo else (lo - 0.5, lo + 0.5)
+        self._keys, self._curve, self._deriv = {}, {}, {}
+        self.ax.set_xlim(0, nc)
+        self.ax.set_ylim(nr, 0)
+        _plate_ticks(self.ax, nr, nc, offset=0.5)
+        self.ax.set_xticks(range(nc + 1), minor=True)
+        self.ax.set_yticks(range(nr + 1), minor=True)
+        self.ax.grid(True, which="minor", color="#dddddd", linewidth=0.4)
+        self.ax.grid(False, which="major")
+
+    def _to_cell(self, well, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if len(x) < 2:
+            return np.empty((0, 2))
+        r, c = self.pos[well]
+        lo, hi = self.t_range
+        span = 1.0 - 2 * self.PAD
+        ymin, ymax = np.nanmin(y), np.nanmax(y)
+        yn = (y - ymin) / (ymax - ymin) if ymax > ymin else np.full_like(y, 0.5)
+        return np.column_stack((c + self.PAD + span * (x - lo) / (hi - lo),
+                                r + 1 - self.PAD - span * yn))
+
+    def update(self, cells, fetch_curve, fetch_deriv):
+        """cells: {well: (curve_key, deriv_key, state)}. fetch_curve(w) -> (x, y) and
+        fetch_deriv(w) -> (x, d) or None are called only for keys that changed.
+        Returns the number of wells whose cell changed."""
+        changed = 0
+        for w, (ck, dk, st) in cells.items():
+            if w not in self.pos:
+                continue
+            old = self._keys.get(w, (None, None, None))
+            dk = dk if self.show_deriv else None
+            if old == (ck, dk, st) and w in self._curve:
+                continue
+            if old[0] != ck or w not in self._curve:
+                self._curve[w] = self._to_cell(w, *fetch_curve(w))
+            if self.show_deriv and (old[1] != dk or w not in self._deriv):
+                d = fetch_deriv(w)
+                self._deriv[w] = self._to_cell(w, *d) if d is not None else np.empty((0, 2))
+            self._keys[w] = (ck, dk, st)
+            changed += 1
+        if changed:
+            colours = [self.palette.get(self._keys[w][2], self.palette["ok"]) for w in self.order]
+            self.curves.set_segments([self._curve.get(w, np.empty((0, 2))) for w in self.order])
+            self.curves.set_color(colours)
+            if self.show_deriv:
+                self.derivs.set_segments([self._deriv.get(w, np.empty((0, 2))) for w in self.order])
+                self.derivs.set_color(colours)
+            self.canvas.draw_idle()
+        return changed
+
+    def set_show_deriv(self, show):
+        """Toggle the derivative layer (its data is fetched by the next update())."""
+        self.show_deriv = bool(show)
+        self.derivs.set_visible(self.show_deriv)
+
+    def well_at(self, x, y):
+        if x is None or y is None:
+            return None
+        return self._at.get((int(np.floor(y)), int(np.floor(x))))
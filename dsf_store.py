@@ -0,0 +1,209 @@
+# Almacén columnar de la placa: un único array contiguo de temperatura y de
+# fluorescencia (original + trabajo) con offsets por pozo (estilo CSR).
+# Los accesos por pozo devuelven vistas (sin copias).
+
+import numpy as np
+import pandas as pd
+
+from dsf_core import well_sortkey, jump_stats_batch
+
+
+class SparseSteps:
+    """A working curve stored as offsets over the original: work = orig + level, where
+    the level is piecewise constant and only kept at the points where it changes
+    (idx[j] -> level[j] up to the next change). Step corrections give a handful of
+    changes per well, so this is O(steps) instead of O(points).
+
+    Decoding is exact: the few points where orig + level does not reproduce the
+    stored value bit for bit (float rounding) are kept in fix_idx / fix_val.
+    """
+
+    __slots__ = ("n", "idx", "level", "fix_idx", "fix_val")
+
+    def __init__(self, n, idx, level, fix_idx, fix_val):
+        self.n = n
+        self.idx, self.level = idx, level
+        self.fix_idx, self.fix_val = fix_idx, fix_val
+
+    @classmethod
+    def encode(cls, orig, work):
+        orig = np.asarray(orig, dtype=float)
+        work = np.asarray(work, dtype=float)
+        off = work - orig
+        # cambios de nivel reales (no los de redondeo de work - orig, que quedan en fix_*)
+        tol = 16 * np.finfo(float).eps * (np.abs(orig) + np.abs(work))
+        change = np.flatnonzero(np.abs(np.diff(off, prepend=0.0)) > tol)
+        idx = change.astype(np.int32)
+        level = off[change]
+        decoded = cls(len(orig), idx, level, np.empty(0, np.int32), np.empty(0))._expand(orig)
+        bad = np.flatnonzero(decoded != work) if len(idx) else np.empty(0, np.int64)
+        return cls(len(orig), idx, level, bad.astype(np.int32), work[bad])
+
+    def _expand(self, orig):
+        if not len(self.idx):
+            return np.array(orig, dtype=float)
+        seg = np.searchsorted(self.idx, np.arange(self.n), side="right") - 1
+        off = np.where(seg >= 0, self.level[np.maximum(seg, 0)], 0.0)
+        return orig + off
+
+    def decode(self, orig):
+        """The working curve these steps describe over `orig`."""
+        y = self._expand(orig)
+        y[self.fix_idx] = self.fix_val
+        return y
+
+    @property
+    def is_identity(self):
+        return not len(self.idx) and not len(self.fix_idx)
+
+    @property
+    def nbytes(self):
+        return self.idx.nbytes + self.level.nbytes + self.fix_idx.nbytes + self.fix_val.nbytes
+
+
+class PlateStore:
+    """Plate-level store with CSR-style per-well offsets.
+
+    Well i owns rows offsets[i]:offsets[i+1] of `temperature`, `fluo_orig`
+    and `fluo_work`, sorted by temperature. Wells may have different lengths.
+    """
+
+    def __init__(self, wells, temperature, fluorescence, offsets, jump=None):
+        self.wells = list(wells)
+        self.index = {w: i for i, w in enumerate(self.wells)}
+        self.temperature = np.ascontiguousarray(temperature, dtype=float)
+        self.fluo_orig = np.ascontiguousarray(fluorescence, dtype=float)
+        self.fluo_work = self.fluo_orig.copy()
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        # Resultados de análisis de las curvas ORIGINALES (los rellena el sidecar o se calculan al pedirlos)
+        self._jump = jump                   # array (n_wells, 4): i_star, maxjump, disp MAD, disp STD
+        self.tm_orig = None                 # (strength, {well: Tm}) o None
+
+    @classmethod
+    def from_columns(cls, well, temperature, fluorescence):
+        """Build from flat columns (well names already normalized)."""
+        codes, names = pd.factorize(np.asarray(well), sort=False)
+        return cls.from_codes(codes, list(names), temperature, fluorescence)
+
+    @classmethod
+    def from_codes(cls, codes, names, temperature, fluorescence):
+        """Build from integer well codes into `names`, in one pass: a single stable
+        sort by (well, T) plus boundary detection. Wells whose fluorescence is all
+        zero are dropped. Already grouped & sorted input is used without copying.
+        """
+        temperature = np.asarray(temperature, dtype=float)
+        fluorescence = np.asarray(fluorescence, dtype=float)
+
+        # rank de cada pozo en orden de placa (A1, A2, ... B1 ...)
+        order_names = sorted(range(len(names)), key=lambda i: (well_sortkey(names[i]), names[i]))
+        rank = np.empty(len(names), dtype=np.int32)
+        rank[order_names] = np.arange(len(names))
+        key = rank[codes]
+
+        # Los .gdsf suelen venir ya agrupados y ordenados: en ese caso no hay que permutar
+        new_well = np.diff(key) != 0
+        presorted = (
+            bool(np.all(np.diff(key) >= 0))
+            and bool(np.all((np.diff(temperature) >= 0) | new_well))
+        )
+        if not presorted:
+            perm = np.lexsort((temperature, key))
+            key = key[perm]
+            temperature = temperature[perm]
+            fluorescence = fluorescence[perm]
+            del perm
+
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]]) if len(key) else np.empty(0, dtype=np.int64)
+        offsets = np.r_[starts, len(key)].astype(np.int64)
+        wells = [names[order_names[r]] for r in key[starts]]
+
+        # Elegimos wells que tengan alguna fluorescencia distinta de 0
+        keep = np.add.reduceat(fluorescence != 0, starts) > 0 if len(starts) else np.empty(0, dtype=bool)
+        if not keep.all():
+            rows = np.repeat(keep, np.diff(offsets))
+            temperature = temperature[rows]
+            fluorescence = fluorescence[rows]
+            wells = [w for w, k in zip(wells, keep) if k]
+            offsets = np.r_[0, np.cumsum(np.diff(offsets)[keep])].astype(np.int64)
+        return cls(wells, temperature, fluorescence, offsets)
+
+    # ------------------------ per-well views ------------------------
+    def __contains__(self, well):
+        return well in self.index
+
+    def __len__(self):
+        return len(self.wells)
+
+    def span(self, well):
+        i = self.index[well]
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def n_points(self, well):
+        a, b = self.span(well)
+        return b - a
+
+    def temp(self, well):
+        a, b = self.span(well)
+        return self.temperature[a:b]
+
+    def orig(self, well):
+        a, b = self.span(well)
+        return self.fluo_orig[a:b]
+
+    def work(self, well):
+        a, b = self.span(well)
+        return self.fluo_work[a:b]
+
+    def set_work(self, well, y):
+        """Overwrite the working curve of `well` in place (same length)."""
+        a, b = self.span(well)
+        self.fluo_work[a:b] = y
+
+    def get_steps(self, well):
+        """Working curve of `well` as SparseSteps over its original."""
+        return SparseSteps.encode(self.orig(well), self.work(well))
+
+    def set_steps(self, well, steps):
+        self.set_work(well, steps.decode(self.orig(well)))
+
+    def is_original(self, well):
+        return np.array_equal(self.work(well), self.orig(well))
+
+    def jump_table(self):
+        """Per-well jump_stats of the original curves as a (n_wells, 4) array
+        (NaN rows for wells with fewer than 2 points). Computed once."""
+        if self._jump is None:
+            table = np.full((len(self.wells), 4), np.nan)
+            curves = [self.fluo_orig[self.offsets[i]:self.offsets[i + 1]] for i in range(len(self.wells))]
+            for i, st in enumerate(jump_stats_batch(curves)):
+                if st is not None:
+                    table[i] = st
+            self._jump = table
+        return self._jump
+
+    def original_jump_stats(self, well):
+        """jump_stats(orig(well)) from the plate table, or None."""
+        row = self.jump_table()[self.index[well]]
+        if np.isnan(row[0]):
+            return None
+        return (int(row[0]), float(row[1]), float(row[2]), float(row[3]))
+
+    def visible_slice(self, well, trim_range):
+        """Slice of the well rows inside trim_range (x is sorted, so it is contiguous).
+        Overly aggressive trims (fewer than 3 points left) fall back to the full curve.
+        """
+        n = self.n_points(well)
+        if trim_range is None:
+            return slice(0, n)
+        x = self.temp(well)
+        tmin, tmax = trim_range
+        lo = int(np.searchsorted(x, tmin, side="left"))
+        hi = int(np.searchsorted(x, tmax, side="right"))
+        if hi - lo < 3:
+            return slice(0, n)
+        return slice(lo, hi)
+
+    def visible(self, well, trim_range=None):
+        """(x, y) views of the working curve restricted to trim_range."""
+        sl = self.visible_slice(well, trim_range)
+        return self.temp(well)[sl], self.work(well)[sl]
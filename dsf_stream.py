@@ -0,0 +1,221 @@
+# Detección en línea (sin tkinter) para placas que todavía se están midiendo:
+# las filas (Well, Temperature, Fluorescence) llegan de una en una y, por cada punto
+# nuevo, se hace un trabajo acotado (ventana fija), sin volver a recorrer la curva.
+#
+#   > > > python3 dsf_cli.py watch run.gdsf --follow --abort-fraction 0.3 < < <
+
+import os
+import time
+from bisect import insort, bisect_left
+from collections import deque
+
+from dsf_core import well_sortkey, is_suspect_jump
+
+
+def _kth_abs_dev(s, med, k):
+    """k-th smallest (0-based) |v - med| over the sorted list s, in O(log len(s)).
+    The distances below and above med are two sorted runs; this is a selection over
+    both without building them."""
+    p = bisect_left(s, med)
+    a, b = p, len(s) - p                    # a: distancias por debajo (s[p-1], s[p-2], ...)
+    lo, hi = max(0, k + 1 - b), min(k + 1, a)
+    while lo < hi:
+        i = (lo + hi) // 2
+        if med - s[p - 1 - i] < s[p + k - i] - med:
+            lo = i + 1
+        else:
+            hi = i
+    below = med - s[p - lo] if lo > 0 else float("-inf")
+    above = s[p + k - lo] - med if k - lo >= 0 else float("-inf")
+    return max(below, above)
+
+
+class OnlineStepDetector:
+    """Online counterpart of scan_well + multi_jump for one well.
+
+    Each new diff is first detrended: the local slope (median of the last
+    `slope_window` non-step diffs) is subtracted, so the steep part of a melt
+    transition is not mistaken for a step. The residual is compared with
+    max(abs_thr, k·disp), where disp is the MAD or STD of the last `window` non-step
+    residuals (the k rule waits for `warmup` of them). A flagged residual is a step:
+    it is subtracted from every later point, as the change-point engine does.
+    The provisional Tm is the temperature of the steepest local slope (least squares
+    over `deriv_window` corrected points), i.e. the Tm of compute_tm_for_xy without
+    the global smoothing. The window is kept sorted as points arrive, so the MAD
+    costs O(log window) per point; the whole update is O(window + deriv_window)
+    in the worst case (list insertion), with no re-sorting.
+    """
+
+    def __init__(self, abs_thr=0.0, k=6.0, method="MAD", window=32, warmup=16, deriv_window=9, slope_window=5):
+        self.abs_thr, self.k, self.method = abs_thr, k, method
+        self.warmup = max(2, int(warmup))
+        self._slope = deque(maxlen=max(1, int(slope_window)))  # últimas diffs sin salto (pendiente local)
+        self._diffs = deque(maxlen=max(self.warmup, int(window)))  # residuos sin salto
+        self._sorted = []                   # mismos residuos, ordenados (mediana y MAD sin reordenar)
+        self._sum = 0.0
+        self._sum2 = 0.0
+        self._recent = deque(maxlen=max(3, int(deriv_window)))  # (T, F corregida)
+        self.n = 0
+        self.offset = 0.0                   # corrección acumulada de los saltos vistos
+        self.steps = []                     # [(índice del punto tras el salto, T, salto)]
+        self.tm = None
+        self._best_slope = 0.0
+        self._last_raw = None
+
+    # ---- dispersión de la ventana ----
+    def _push_diff(self, d):
+        if len(self._diffs) == self._diffs.maxlen:
+            old = self._diffs[0]
+            del self._sorted[bisect_left(self._sorted, old)]
+            self._sum -= old
+            self._sum2 -= old * old
+        self._diffs.append(d)
+        insort(self._sorted, d)
+        self._sum += d
+        self._sum2 += d * d
+
+    def dispersion(self):
+        """MAD sigma or sample STD of the residuals in the window (0 before warm-up)."""
+        m = len(self._sorted)
+        if m < self.warmup:
+            return 0.0
+        if self.method == "MAD":
+            s = self._sorted
+            med = 0.5 * (s[(m - 1) // 2] + s[m // 2])
+            return 1.4826 * 0.5 * (_kth_abs_dev(s, med, (m - 1) // 2) + _kth_abs_dev(s, med, m // 2))
+        var = (self._sum2 - self._sum * self._sum / m) / (m - 1)
+        return var ** 0.5 if var > 0 else 0.0
+
+    # ---- Tm provisional ----
+    def _update_tm(self):
+        pts = self._recent
+        if len(pts) < pts.maxlen:
+            return
+        tm_ = sum(t for t, _ in pts) / len(pts)
+        fm = sum(f for _, f in pts) / len(pts)
+        stt = sum((t - tm_) ** 2 for t, _ in pts)
+        if stt <= 0:
+            return
+        slope = sum((t - tm_) * (f - fm) for t, f in pts) / stt
+        if abs(slope) > abs(self._best_slope):
+            self._best_slope = slope
+            self.tm = pts[len(pts) // 2][0]
+
+    def _local_slope(self):
+        s = sorted(self._slope)
+        m = len(s)
+        return 0.5 * (s[(m - 1) // 2] + s[m // 2]) if m else 0.0
+
+    def add(self, t, f):
+        """Feed one point (temperatures must increase). Returns the step (idx, T, jump)
+        if this point starts a new level, else None; jump is the diff minus the local slope."""
+        t, f = float(t), float(f)
+        step = None
+        if self._last_raw is not None:
+            d = f - self._last_raw
+            r = d - self._local_slope()
+            if is_suspect_jump(abs(r), self.dispersion(), self.abs_thr, self.k):
+                self.offset -= r
+                step = (self.n, t, r)
+                self.steps.append(step)
+            else:
+                self._slope.append(d)
+                self._push_diff(r)
+        self._last_raw = f
+        self._recent.append((t, f + self.offset))
+        self.n += 1
+        self._update_tm()
+        return step
+
+
+class PlateMonitor:
+    """One OnlineStepDetector per well, fed with rows in any interleaving.
+
+    The number of wells with steps (`n_suspects`) and of wells with at least
+    `min_points` points (`n_ready`) are counted as rows arrive, so checking them
+    costs O(1) per point.
+    """
+
+    def __init__(self, min_points=0, **detector_kw):
+        self.min_points = int(min_points)
+        self.detector_kw = detector_kw
+        self.wells = {}
+        self.n_suspects = 0
+        self.n_ready = 0
+
+    def feed(self, well, t, f):
+        """Add one row; returns (well, idx, T, jump) if it is a step, else None."""
+        det = self.wells.get(well)
+        if det is None:
+            det = self.wells[well] = OnlineStepDetector(**self.detector_kw)
+            if self.min_points <= 0:
+                self.n_ready += 1
+        step = det.add(t, f)
+        if det.n == self.min_points:
+            self.n_ready += 1
+        if step is None:
+            return None
+        if len(det.steps) == 1:
+            self.n_suspects += 1
+        return (well,) + step
+
+    def suspect_fraction(self, n_wells):
+        """Fraction of a plate of n_wells wells that has steps, or None until every one
+        of them (wells not seen yet included) has min_points points."""
+        n = max(int(n_wells), len(self.wells))
+        if n <= 0 or self.n_ready < n:
+            return None
+        return self.n_suspects / n
+
+    def suspects(self):
+        return sorted((w for w, d in self.wells.items() if d.steps), key=lambda w: (well_sortkey(w), w))
+
+    def provisional_tm(self):
+        return {w: self.wells[w].tm for w in sorted(self.wells, key=lambda w: (well_sortkey(w), w))}
+
+    def points(self):
+        return sum(d.n for d in self.wells.values())
+
+
+def parse_gdsf_line(line):
+    """(well, T, F) from one .gdsf line, or None for headers / incomplete lines."""
+    parts = line.rstrip("\r\n").split("\t")
+    if len(parts) < 3:
+        return None
+    try:
+        return parts[0].upper().strip(), float(parts[1]), float(parts[2])
+    except ValueError:
+        return None
+
+
+def follow_gdsf(path, follow=False, interval=1.0, idle_timeout=None):
+    """Yield (well, T, F) rows of a .gdsf; with follow=True keep waiting for rows the
+    instrument appends (like `tail -f`) until idle_timeout seconds pass without data.
+    A last line without newline is kept until it is complete."""
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        pending = ""
+        idle_since = time.monotonic()
+        while True:
+            chunk = fh.readline()
+            if chunk:
+                pending += chunk
+                if not pending.endswith("\n"):
+                    continue
+                row = parse_gdsf_line(pending)
+                pending = ""
+                idle_since = time.monotonic()
+                if row is not None:
+                    yield row
+                continue
+            if not follow:
+                if pending:
+                    row = parse_gdsf_line(pending)
+                    if row is not None:
+                        yield row
+                return
+            if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                return
+            if os.path.getsize(path) < fh.tell():
+                # el fichero se ha truncado / reescrito: empezar de nuevo no tiene sentido aquí
+                return
+            time.sleep(interval)
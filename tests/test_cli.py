@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from dsf_cli import main, output_paths
+from dsf_core import compute_tm_batch, derivative_strength, scan_well
+from dsf_io import load_plate, sidecar_path
+
+WELLS = ["A1", "A2", "B1", "B2"]
+
+
+def _write_plate(path, n=80, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(25.0, 95.0, n)
+    lines = []
+    for i, w in enumerate(WELLS):
+        y = 20.0 / (1.0 + np.exp(-(x - 50.0 - 3 * i) / 2.0)) + rng.normal(0, 0.5, n)
+        if i % 2 == 0:
+            y[30 + i:] += 30.0                       # un salto por pozo en A1 y B1
+        lines += [f"{w}\t{t:.10g}\t{f:.10g}" for t, f in zip(x, y)]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_batch_round_trip(tmp_path, capsys):
+    src = _write_plate(tmp_path / "plate.gdsf")
+    out = tmp_path / "out"
+    assert main(["batch", src, "-o", str(out), "-j", "1"]) == 0
+    text = capsys.readouterr().out
+    assert "wells=4 suspected=2 corrected=2" in text and "Processed 1 plates (0 failed)." in text
+
+    outs = output_paths(src, str(out))
+    assert all(os.path.exists(p) for p in outs.values())
+    orig, corrected = load_plate(src), load_plate(outs["corrected"])
+    assert corrected.wells == orig.wells == WELLS
+    for w in WELLS:
+        np.testing.assert_allclose(corrected.temp(w), orig.temp(w))
+        assert scan_well(corrected.orig(w), 0.0, 6.0, "MAD") is None
+        if w in ("A2", "B2"):                       # sin saltos: se exportan tal cual
+            np.testing.assert_allclose(corrected.orig(w), orig.orig(w), rtol=1e-9)
+
+    table = pd.read_csv(outs["tm_table"], sep="\t")
+    assert list(table["Well"]) == WELLS
+    tms = compute_tm_batch([(corrected.temp(w), corrected.orig(w)) for w in WELLS], derivative_strength(False, 35))
+    np.testing.assert_allclose(table["Tm_corrected"], tms, rtol=1e-5)
+
+
+def test_batch_with_cache_gives_same_outputs(tmp_path, capsys):
+    src = _write_plate(tmp_path / "plate.gdsf")
+    results = []
+    for run in ("a", "b"):
+        out = tmp_path / run
+        assert main(["batch", src, "-o", str(out), "-j", "1", "--cache", "--tm-range", "52", "56"]) == 0
+        results.append({k: open(p).read() for k, p in output_paths(src, str(out)).items()})
+    assert os.path.exists(sidecar_path(src))
+    assert results[0] == results[1]
+    assert "auto_trimmed=" in capsys.readouterr().out
+
+
+def test_batch_reports_failed_plate(tmp_path, capsys):
+    src = _write_plate(tmp_path / "plate.gdsf")
+    assert main(["batch", src, str(tmp_path / "missing.gdsf"), "-j", "1", "-o", str(tmp_path)]) == 1
+    out = capsys.readouterr().out
+    assert out.count("OK") == 1 and out.count("FAILED") == 1 and "Processed 2 plates (1 failed)." in out
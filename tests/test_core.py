@@ -0,0 +1,177 @@
+import numpy as np
+import pytest
+
+from dsf_core import (
+    JumpIndex, auto_trim_proposal, build_tm_table, changepoint_jump, compute_tm_batch, compute_tm_for_xy,
+    jump_stats, jump_stats_batch, pelt_linear, scan_from_stats, scan_well,
+)
+
+
+def _melt(x, tm=55.0, rng=None):
+    y = 1.0 / (1.0 + np.exp(-(x - tm) / 2.0))
+    return y if rng is None else y + rng.normal(0, 0.01, len(x))
+
+
+def _curves(seed=0):
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(25.0, 95.0, 120)
+    curves = [(ramp, _melt(ramp, rng.uniform(40, 70), rng)) for _ in range(12)]   # rampa compartida
+    own = np.sort(rng.uniform(25, 95, 80))
+    curves.append((own, _melt(own, 60.0, rng)))                                     # rampa propia
+    curves.append((ramp[:70], _melt(ramp[:70], 50.0, rng)))                         # recortada
+    dup = np.repeat(np.linspace(25, 95, 40), 2)
+    curves.append((dup, _melt(dup, 52.0, rng)))                                     # x duplicadas
+    rev = ramp[::-1].copy()
+    curves.append((rev, _melt(rev, 58.0, rng)))                                     # sin ordenar
+    curves.append((ramp[:2], ramp[:2]))                                             # < 3 puntos
+    curves.append((ramp, np.full(len(ramp), 1.0)))                                  # plana: Tm indefinida
+    return curves
+
+
+@pytest.mark.parametrize("strength", [0, 25, 70])
+def test_compute_tm_batch_matches_per_curve(strength):
+    curves = _curves()
+    assert compute_tm_batch(curves, strength) == [compute_tm_for_xy(x, y, strength)[0] for x, y in curves]
+
+
+def test_build_tm_table_reuses_given_tm():
+    ramp = np.linspace(25.0, 95.0, 100)
+    curves = [("A1", ramp, _melt(ramp, 50.0)), ("A2", ramp[:0], ramp[:0]), ("A3", ramp, _melt(ramp, 60.0))]
+    tms = compute_tm_batch([(x, y) for _, x, y in curves], 25)
+    fresh = build_tm_table(curves, 25, 35)
+    assert list(fresh["Well"]) == ["A1", "A3"]
+    assert fresh.equals(build_tm_table(curves, 25, 35, tm_raw=tms))
+
+
+def _naive_trim(x, y, lo, hi, strength):
+    """Quita puntos de uno en uno recalculando la Tm de la ventana desde cero."""
+    tm = compute_tm_for_xy(x, y, strength)[0]
+    left, right = 0, len(x) - 1
+    while tm is not None and not lo <= tm <= hi and right - left + 1 > 3:
+        if tm < lo:
+            left += 1
+        else:
+            right -= 1
+        tm = compute_tm_for_xy(x[left:right + 1], y[left:right + 1], strength)[0]
+    if tm is None or not lo <= tm <= hi or (left, right) == (0, len(x) - 1):
+        return None
+    return left, right, tm
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_auto_trim_matches_naive_scan(seed):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(25.0, 95.0, 90)
+    # dos transiciones: la dominante fuera del rango esperado, la otra dentro
+    y = 0.6 * _melt(x, 80.0 if seed % 2 else 35.0) + 0.4 * _melt(x, 56.0) + rng.normal(0, 0.005, len(x))
+    for strength in (0, 25):
+        res = auto_trim_proposal(x, y, 50.0, 62.0, strength)
+        naive = _naive_trim(x, y, 50.0, 62.0, strength)
+        if naive is None:
+            assert res is None
+            continue
+        left, right, tm = naive
+        assert (res["new_tmin"], res["new_tmax"], res["tm_after"]) == (x[left], x[right], tm)
+        assert res["removed_total"] == left + len(x) - 1 - right
+
+
+def test_auto_trim_leaves_curve_in_range_alone():
+    x = np.linspace(25.0, 95.0, 90)
+    assert auto_trim_proposal(x, _melt(x, 55.0), 50.0, 62.0) is None
+
+
+def _noisy_plate(seed=0, n_wells=200):
+    rng = np.random.default_rng(seed)
+    curves = []
+    for i in range(n_wells):
+        y = np.cumsum(rng.normal(0, 1, 60 - (i % 3)))      # longitudes distintas
+        if i % 4 == 0:
+            y[rng.integers(5, 50):] += rng.uniform(2, 12)
+        curves.append(y)
+    curves += [np.array([1.0]), np.full(30, 2.0)]           # sin diffs y dispersión 0
+    return curves
+
+
+def test_jump_stats_batch_matches_per_curve():
+    curves = _noisy_plate()
+    batch = jump_stats_batch(curves)
+    for y, st in zip(curves, batch):
+        ref = jump_stats(y)
+        assert (st is None) == (ref is None)
+        if ref is not None:
+            assert st[:2] == ref[:2]
+            np.testing.assert_allclose(st[2:], ref[2:], rtol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["MAD", "STD"])
+@pytest.mark.parametrize("abs_thr,k", [(0.0, 3.0), (4.0, 0.0), (3.0, 5.0), (0.0, 0.0)])
+def test_jump_index_matches_per_well_decision(method, abs_thr, k):
+    curves = _noisy_plate()
+    stats = jump_stats_batch(curves)
+    index = JumpIndex([[np.nan] * 4 if st is None else st for st in stats])
+    expected = [i for i, st in enumerate(stats) if scan_from_stats(st, abs_thr, k, method) is not None]
+    assert index.query(abs_thr, k, method).tolist() == expected
+    assert expected == [i for i, y in enumerate(curves) if scan_well(y, abs_thr, k, method) is not None]
+
+
+def test_jump_index_k_exactly_at_a_ratio():
+    stats = [(1, 6.0, 2.0, 2.0), (2, 6.000000001, 2.0, 2.0), (3, 5.999999999, 2.0, 2.0)]
+    index = JumpIndex(stats)
+    assert index.query(0.0, 3.0, "MAD").tolist() == [1]
+
+
+def _segment_cost(z, a, b):
+    t = np.arange(a, b, dtype=float)
+    seg = z[a:b]
+    if b - a < 3:
+        return float(np.sum((seg - seg.mean()) ** 2))
+    coef = np.polyfit(t, seg, 1)
+    return float(np.sum((seg - np.polyval(coef, t)) ** 2))
+
+
+def _optimal_partition(z, penalty):
+    """Partición óptima por programación dinámica O(n²), sin poda."""
+    n = len(z)
+    F = [-penalty] + [np.inf] * n
+    last = [0] * (n + 1)
+    for t in range(1, n + 1):
+        for s in range(t):
+            c = F[s] + _segment_cost(z, s, t) + penalty
+            if c < F[t]:
+                F[t], last[t] = c, s
+    starts, t = [], n
+    while t > 0:
+        t = last[t]
+        if t > 0:
+            starts.append(t)
+    return starts[::-1], F[n]
+
+
+def _partition_cost(z, starts, penalty):
+    bounds = [0] + list(starts) + [len(z)]
+    return sum(_segment_cost(z, a, b) + penalty for a, b in zip(bounds[:-1], bounds[1:])) - penalty
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_pelt_finds_the_optimal_partition(seed):
+    rng = np.random.default_rng(seed)
+    z = np.concatenate([0.1 * np.arange(25), 8 + 0.1 * np.arange(20), -3 - 0.2 * np.arange(15)])
+    z = z + rng.normal(0, 1, len(z))
+    penalty = 3.0 * np.log(len(z))
+    starts = pelt_linear(z, penalty)
+    best, best_cost = _optimal_partition(z, penalty)
+    assert _partition_cost(z, starts, penalty) == pytest.approx(best_cost, rel=1e-9)
+    assert starts == best
+
+
+def test_changepoint_jump_removes_level_shifts():
+    rng = np.random.default_rng(1)
+    clean = 0.5 * np.arange(200) + rng.normal(0, 1, 200)
+    y = clean.copy()
+    y[60:] += 80.0
+    y[140:] -= 50.0
+    y_new, changed = changepoint_jump(y, 0.0, 6.0, "MAD")
+    assert changed
+    # los saltos se quitan (queda sólo un desplazamiento por la pendiente local estimada)
+    assert np.max(np.abs(np.diff(y_new - clean))) < 5.0
+    assert changepoint_jump(clean, 0.0, 6.0, "MAD")[1] is False
@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from dsf_exec import BackgroundJob, WellExecutor, stream_job
+
+
+def _square(v, offset):
+    return v * v + offset
+
+
+def _sum_batch(items, offset):
+    return [v + offset for v in items]
+
+
+WELLS = [f"{r}{c}" for r in "BA" for c in (12, 2, 1, 10)]
+
+
+@pytest.mark.parametrize("backend", ["serial", "thread", "process"])
+def test_map_wells_returns_plate_order(backend):
+    jobs = [(w, (i,)) for i, w in enumerate(WELLS)]
+    with WellExecutor(backend, workers=3) as ex:
+        out = ex.map_wells(_square, jobs, 1)
+        assert [w for w, _ in out] == ["A1", "A2", "A10", "A12", "B1", "B2", "B10", "B12"]
+        assert dict(out) == {w: i * i + 1 for i, w in enumerate(WELLS)}
+        assert ex.map_batches(_sum_batch, range(50), 2) == [v + 2 for v in range(50)]
+
+
+@pytest.mark.parametrize("backend", ["serial", "thread"])
+def test_stream_job_delivers_every_well_once(backend):
+    jobs = [(w, (i,)) for i, w in enumerate(WELLS)]
+    with WellExecutor(backend, workers=2) as ex:
+        job = stream_job(ex.stream_wells(_square, jobs, 0, chunk_size=3), "test").start()
+        assert job.wait(10)
+        items = job.poll()
+    assert sorted(items) == sorted((w, i * i) for i, w in enumerate(WELLS))
+    assert job.finished and job.done == job.total == len(WELLS)
+
+
+def test_background_job_keeps_post_order_and_result():
+    def work(job):
+        for i in job.iterate(range(100)):
+            job.post(i)
+        return "ok"
+
+    job = BackgroundJob(work, 100, "order").start()
+    assert job.wait(10)
+    assert job.poll() == list(range(100))
+    assert job.result == "ok" and job.error is None and job.done == 100 and job.finished
+
+
+def test_background_job_cancel_stops_work_and_drops_items():
+    gate, stopped = threading.Event(), threading.Event()
+
+    def work(job):
+        for i in job.iterate(range(10 ** 6)):
+            job.post(i)
+            if i == 10:
+                gate.set()
+        stopped.set()
+
+    job = BackgroundJob(work, 10 ** 6, "cancel").start()
+    assert gate.wait(10)
+    job.cancel()
+    assert job.finished and job.poll() == []
+    assert job.wait(10) and stopped.is_set()
+    assert job.done < 10 ** 6
+
+
+def test_background_job_reports_error():
+    def work(job):
+        job.post(1)
+        raise ValueError("boom")
+
+    job = BackgroundJob(work, 1, "error").start()
+    assert job.wait(10)
+    assert job.poll() == [1]
+    assert isinstance(job.error, ValueError) and job.finished
+
+
+def test_pool_is_created_once_from_many_threads():
+    ex = WellExecutor("thread", workers=2)
+    pools, barrier = [], threading.Barrier(8)
+
+    def get():
+        barrier.wait()
+        pools.append(ex._get_pool())
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    ex.close()
+    assert len({id(p) for p in pools}) == 1
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from dsf_history import UndoLog, WellState
+from dsf_store import SparseSteps
+
+
+def _steps(seed, n=200, n_steps=3):
+    rng = np.random.default_rng(seed)
+    orig = np.cumsum(rng.normal(0, 1, n)) * 1e3
+    work = orig.copy()
+    for i in rng.integers(1, n, n_steps):
+        work[i:] -= rng.normal(0, 50)
+    return orig, work
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_sparse_steps_round_trip_is_exact(seed):
+    orig, work = _steps(seed)
+    steps = SparseSteps.encode(orig, work)
+    np.testing.assert_array_equal(steps.decode(orig), work)
+    assert len(steps.idx) <= 3 and not steps.is_identity
+
+
+def test_sparse_steps_of_untouched_curve():
+    orig, _ = _steps(0)
+    steps = SparseSteps.encode(orig, orig.copy())
+    assert steps.is_identity and steps.nbytes == 0
+    np.testing.assert_array_equal(steps.decode(orig), orig)
+
+
+def test_sparse_steps_arbitrary_edit():
+    orig, _ = _steps(1)
+    work = orig + np.random.default_rng(2).normal(0, 1, len(orig))   # no es escalonada: todo cambia
+    np.testing.assert_array_equal(SparseSteps.encode(orig, work).decode(orig), work)
+
+
+def _state(seed):
+    orig, work = _steps(seed)
+    return WellState(SparseSteps.encode(orig, work), None, False)
+
+
+def test_undo_redo_per_well():
+    log = UndoLog()
+    a, b, c = _state(0), _state(1), _state(2)
+    log.push("A1", a)
+    log.push("A1", b)
+    assert log.undo("A1", c) is b
+    assert log.undo("A1", b) is a
+    assert not log.can_undo("A1") and log.can_redo("A1")
+    assert log.redo("A1", a) is b
+    log.push("A1", c)                       # rama nueva: se pierde el redo
+    assert not log.can_redo("A1")
+    assert log.stats()["undo"] == 2 and not log.can_undo("A2")
+
+
+def test_budget_drops_oldest_entries_of_the_plate():
+    one = _state(0).nbytes
+    log = UndoLog(budget_bytes=3 * one)
+    for w in ["A1", "A2", "A1", "A3", "A2"]:
+        log.push(w, _state(0))
+    st = log.stats()
+    assert st["undo"] == 3 and st["dropped"] == 2 and st["bytes"] <= 3 * one
+    # quedan las tres más nuevas: A1 (3ª), A3 y A2 (5ª)
+    assert [log.can_undo(w) for w in ("A1", "A2", "A3")] == [True, True, True]
+    log.undo("A1", _state(1))
+    assert not log.can_undo("A1")
+
+
+def test_discard_does_not_create_redo():
+    log = UndoLog()
+    s = _state(0)
+    log.push("A1", s)
+    assert log.discard("A1") is s
+    assert not log.can_undo("A1") and not log.can_redo("A1") and log.nbytes == 0
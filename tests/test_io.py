@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pytest
+
+import dsf_io
+from dsf_io import _count_lines, _fill_buffers, _iter_tolerant_chunks, _iter_typed_chunks, load_plate
+from dsf_store import PlateStore
+
+
+def _write_plate(path, wells=("A1", "A2", "B1"), n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    lines = []
+    for w in wells:
+        x = np.linspace(25.0, 95.0, n) + rng.normal(0, 1e-3, n)
+        y = 1.0 / (1.0 + np.exp(-(x - 55.0) / 2.0)) + rng.normal(0, 0.01, n)
+        lines += [f"{w}\t{t:.17g}\t{f:.17g}" for t, f in zip(x, y)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def _read(reader, path, chunksize):
+    return PlateStore.from_codes(*_fill_buffers(reader(str(path), chunksize), _count_lines(str(path))))
+
+
+def _assert_same(a, b):
+    assert a.wells == b.wells
+    for w in a.wells:
+        np.testing.assert_array_equal(a.temp(w), b.temp(w))
+        np.testing.assert_array_equal(a.orig(w), b.orig(w))
+
+
+@pytest.mark.parametrize("reader", [_iter_typed_chunks, _iter_tolerant_chunks])
+@pytest.mark.parametrize("chunksize", [None, 7, 1000])
+def test_readers_agree_bit_for_bit(tmp_path, reader, chunksize):
+    path = _write_plate(tmp_path / "p.gdsf")
+    _assert_same(load_plate(str(path), chunksize=None), _read(reader, path, chunksize))
+
+
+def test_c_engine_matches_fast_engine(tmp_path, monkeypatch):
+    path = _write_plate(tmp_path / "p.gdsf")
+    fast = load_plate(str(path), chunksize=None)
+    monkeypatch.setattr(dsf_io, "_FAST_ENGINE", "c")
+    _assert_same(fast, load_plate(str(path), chunksize=None))
+
+
+@pytest.mark.parametrize("reader", [_iter_typed_chunks, _iter_tolerant_chunks])
+@pytest.mark.parametrize("chunksize", [None, 2])
+def test_rows_without_well_name_are_dropped(tmp_path, reader, chunksize):
+    path = tmp_path / "e.gdsf"
+    path.write_text("A1\t25\t1\nA2\t25\t1\n\t25\t4\nA2\t26\t2\nA1\t26\t3\n")
+    store = _read(reader, path, chunksize)
+    assert store.wells == ["A1", "A2"]
+    np.testing.assert_array_equal(store.temp("A2"), [25.0, 26.0])
+    np.testing.assert_array_equal(store.orig("A2"), [1.0, 2.0])
+
+
+def test_tolerant_path_skips_header_and_garbage(tmp_path):
+    path = tmp_path / "h.gdsf"
+    path.write_text("Well\tTemperature\tFluorescence\na1 \t26\t2\nA1\t25\t1\nA1\tx\t3\n")
+    store = load_plate(str(path))
+    assert store.wells == ["A1"]
+    np.testing.assert_array_equal(store.temp("A1"), [25.0, 26.0])
+    np.testing.assert_array_equal(store.orig("A1"), [1.0, 2.0])
+
+
+def test_sidecar_round_trip_keeps_curves_and_tm(tmp_path):
+    path = str(_write_plate(tmp_path / "p.gdsf"))
+    store = load_plate(path)
+    store.tm_orig = (25, {"A1": 55.0, "A2": None, "B1": 54.5})
+    assert dsf_io.save_sidecar(path, store)
+    cached = dsf_io.load_sidecar(path)
+    _assert_same(store, cached)
+    np.testing.assert_array_equal(cached.jump_table(), store.jump_table())
+    assert cached.tm_orig == store.tm_orig
+
+
+def test_open_plate_uses_and_rebuilds_sidecar(tmp_path):
+    path = str(_write_plate(tmp_path / "p.gdsf"))
+    store, from_cache = dsf_io.open_plate(path)
+    assert not from_cache and os.path.exists(dsf_io.sidecar_path(path))
+    again, from_cache = dsf_io.open_plate(path)
+    assert from_cache
+    _assert_same(store, again)
+    _write_plate(tmp_path / "p.gdsf", wells=("C1",))
+    store, from_cache = dsf_io.open_plate(path)
+    assert not from_cache and store.wells == ["C1"]
+
+
+def test_sidecar_key_covers_content_size_and_mtime(tmp_path):
+    path = str(_write_plate(tmp_path / "p.gdsf"))
+    dsf_io.save_sidecar(path, load_plate(path))
+    st = os.stat(path)
+    # mismo tamaño y misma fecha, otro contenido: sólo lo detecta el hash
+    data = bytearray(open(path, "rb").read())
+    data[-3:-1] = b"99" if data[-3:-1] != b"99" else b"11"
+    open(path, "wb").write(bytes(data))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert os.stat(path).st_size == st.st_size and dsf_io.load_sidecar(path) is None
+
+    dsf_io.save_sidecar(path, load_plate(path))
+    assert dsf_io.load_sidecar(path) is not None
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert dsf_io.load_sidecar(path) is None
+
+
+def test_sidecar_of_another_version_or_corrupt_is_ignored(tmp_path, monkeypatch):
+    path = str(_write_plate(tmp_path / "p.gdsf"))
+    dsf_io.save_sidecar(path, load_plate(path))
+    monkeypatch.setattr(dsf_io, "SIDECAR_VERSION", dsf_io.SIDECAR_VERSION + 1)
+    assert dsf_io.load_sidecar(path) is None
+    monkeypatch.undo()
+    open(dsf_io.sidecar_path(path), "wb").write(b"not an npz")
+    assert dsf_io.load_sidecar(path) is None
+    assert dsf_io.open_plate(path)[0].wells == ["A1", "A2", "B1"]
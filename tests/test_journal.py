@@ -0,0 +1,83 @@
+import json
+import os
+
+import numpy as np
+
+from dsf_journal import SessionJournal, decode_steps, encode_state, journal_path
+from dsf_store import PlateStore, SparseSteps
+
+KEY = (1234, "abcd")
+
+
+def _record(well, seed):
+    rng = np.random.default_rng(seed)
+    orig = rng.normal(0, 1, 50)
+    work = orig.copy()
+    work[20:] += 0.1 + seed
+    return orig, work, encode_state(well, SparseSteps.encode(orig, work), (30.0, 80.0), seed % 2 == 0, False, True)
+
+
+def test_record_round_trip_is_exact():
+    orig, work, rec = _record("A1", 3)
+    rec = json.loads(json.dumps(rec))
+    np.testing.assert_array_equal(decode_steps(rec, len(orig)).decode(orig), work)
+    assert rec["trim"] == [30.0, 80.0] and rec["corr"] and not rec["del"]
+
+
+def test_read_keeps_last_state_per_well_and_ignores_torn_line(tmp_path):
+    path = str(tmp_path / "p.gdsf")
+    j = SessionJournal(path, KEY)
+    j.start([_record("A1", 0)[2]])
+    j.append(_record("A2", 1)[2])
+    j.append(_record("A1", 2)[2])
+    j.close()
+    with open(journal_path(path), "a", encoding="utf-8") as fh:
+        fh.write('{"w": "A3", "idx"')            # escritura cortada por un crash
+    recs = SessionJournal(path, KEY).read()
+    assert [r["w"] for r in recs] == ["A2", "A1"]
+    assert recs[1] == json.loads(json.dumps(_record("A1", 2)[2]))
+
+
+def test_journal_of_another_file_version_is_ignored(tmp_path):
+    path = str(tmp_path / "p.gdsf")
+    j = SessionJournal(path, KEY)
+    j.start([_record("A1", 0)[2]])
+    j.close()
+    assert SessionJournal(path, (1234, "other")).read() == []
+
+
+def test_backup_and_discard(tmp_path):
+    path = str(tmp_path / "p.gdsf")
+    j = SessionJournal(path, KEY)
+    j.start([_record("A1", 0)[2]])
+    j.close()
+    old = open(journal_path(path)).read()
+    assert j.backup() == journal_path(path) + ".bak"
+    assert open(journal_path(path) + ".bak").read() == old
+    j.start()
+    assert j.read() == []
+    j.discard()
+    assert not os.path.exists(journal_path(path))
+    assert j.backup() is None
+
+
+def test_replay_restores_edited_plate(tmp_path):
+    rng = np.random.default_rng(5)
+    wells = np.repeat(["A1", "A2", "B1"], 40)
+    temp = np.tile(np.linspace(25.0, 95.0, 40), 3)
+    edited = PlateStore.from_columns(wells, temp, rng.normal(100, 5, len(temp)))
+    fresh = PlateStore.from_columns(wells, temp, edited.fluo_orig.copy())
+    y = edited.work("A2").copy()
+    y[15:] -= 12.345
+    edited.set_work("A2", y)
+    edited.set_work("B1", edited.work("B1") * 1.5)      # edición que no es escalonada
+
+    path = str(tmp_path / "p.gdsf")
+    j = SessionJournal(path, KEY)
+    j.start()
+    for w in ("A2", "B1"):
+        j.append(encode_state(w, edited.get_steps(w), None, False, False, True))
+    j.close()
+    for rec in SessionJournal(path, KEY).read():
+        fresh.set_steps(rec["w"], decode_steps(json.loads(json.dumps(rec)), fresh.n_points(rec["w"])))
+    np.testing.assert_array_equal(fresh.fluo_work, edited.fluo_work)
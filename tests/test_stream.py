@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from dsf_cli import main
+from dsf_stream import OnlineStepDetector, PlateMonitor
+
+
+def _rows(wells=("A1", "A2", "A3", "A4"), n=40, step_wells=("A2",), well_major=True):
+    rng = np.random.default_rng(0)
+    x = np.linspace(25.0, 95.0, n)
+    curves = {}
+    for w in wells:
+        y = 10.0 - 0.01 * np.arange(n) + rng.normal(0, 0.01, n)
+        if w in step_wells:
+            y[n // 2:] += 5.0
+        curves[w] = y
+    if well_major:
+        return [(w, t, f) for w in wells for t, f in zip(x, curves[w])]
+    return [(w, x[i], curves[w][i]) for i in range(n) for w in wells]
+
+
+def test_counters_match_a_full_recount():
+    monitor = PlateMonitor(min_points=10, abs_thr=1.0, k=0.0)
+    for well, t, f in _rows(well_major=False):
+        monitor.feed(well, t, f)
+        assert monitor.n_suspects == len(monitor.suspects())
+        assert monitor.n_ready == sum(d.n >= 10 for d in monitor.wells.values())
+
+
+def test_fraction_waits_for_wells_not_seen_yet():
+    monitor = PlateMonitor(min_points=5, abs_thr=1.0, k=0.0)
+    rows = _rows(step_wells=("A1",))
+    for well, t, f in rows[:40]:                    # sólo A1, completo y con salto
+        monitor.feed(well, t, f)
+    assert monitor.n_suspects == 1
+    assert monitor.suspect_fraction(4) is None
+    for well, t, f in rows[40:]:
+        monitor.feed(well, t, f)
+    assert monitor.suspect_fraction(4) == 0.25
+
+
+def test_watch_does_not_abort_after_the_first_well(tmp_path, capsys):
+    path = tmp_path / "p0.gdsf"
+    path.write_text("".join(f"{w}\t{float(t)!s}\t{float(f)!s}\n" for w, t, f in _rows(step_wells=("A1",))))
+    opts = ["--abs-thr", "1", "--kdisp", "0", "--min-points", "5"]
+    assert main(["watch", str(path), "--abort-fraction", "0.5"] + opts) == 0
+    assert "ABORT" not in capsys.readouterr().out
+    assert main(["watch", str(path), "--abort-fraction", "0.25"] + opts) == 3
+    assert main(["watch", str(path), "--follow", "--abort-fraction", "0.25"] + opts) == 2
+
+
+def _melt(width, seed, step_at=None):
+    rng = np.random.default_rng(seed)
+    t = np.linspace(20.0, 95.0, 400)
+    y = 10000 + 8000 / (1 + np.exp(-(t - 55.0) / width)) - 20 * (t - 20) + rng.normal(0, 60, len(t))
+    if step_at is not None:
+        y[step_at:] += 1500.0
+    return t, y
+
+
+@pytest.mark.parametrize("width", [1.5, 3.0])
+@pytest.mark.parametrize("seed", range(10))
+def test_melt_transition_is_not_a_step(width, seed):
+    det = OnlineStepDetector()
+    for t, f in zip(*_melt(width, seed)):
+        assert det.add(t, f) is None
+    assert abs(det.tm - 55.0) < 3.0          # Tm provisional: sólo la pendiente local
+
+
+def test_step_inside_the_transition_is_found():
+    det = OnlineStepDetector()
+    steps = [s for t, f in zip(*_melt(1.5, 0, step_at=190)) if (s := det.add(t, f)) is not None]
+    assert [s[0] for s in steps] == [190]
+    assert abs(steps[0][2] - 1500.0) < 300.0
+
+
+def test_mad_of_the_sorted_window_matches_a_full_sort():
+    rng = np.random.default_rng(3)
+    det = OnlineStepDetector(window=21, warmup=2, k=0.0)
+    for i, f in enumerate(np.cumsum(rng.standard_t(2, 200))):
+        det.add(float(i), f)
+        res = np.array(det._diffs)
+        if len(res) >= 2:
+            mad = 1.4826 * np.median(np.abs(res - np.median(res)))
+            assert det.dispersion() == pytest.approx(mad, rel=1e-12, abs=1e-12)